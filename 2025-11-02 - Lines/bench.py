@@ -0,0 +1,873 @@
+"""
+Benchmarks for the tramway flow map pipeline
+
+    python bench.py loader --rows 500000
+    python bench.py cache --rows 500000
+    python bench.py geometry
+    python bench.py lookup --stations 200
+    python bench.py resample --rows 500000
+    python bench.py cube --rows 500000 --chunksize 100000
+    python bench.py batch --figures 12 --workers 1 4
+    python bench.py imports
+    python bench.py export --rounds 3
+    python bench.py stages --modes timers,memory
+
+Each subcommand prints a small table; heavy modes run in a fresh interpreter
+so their peak memory is measured on their own.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+DATA_CSV = HERE / 'data.csv'
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def print_table(headers, rows):
+    widths = [max(len(str(c)) for c in col) for col in zip(headers, *rows)]
+    print('  '.join(h.ljust(w) for h, w in zip(headers, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in rows:
+        print('  '.join(str(c).ljust(w) for c, w in zip(row, widths)))
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_worker(*args):
+    result = subprocess.run(
+        [sys.executable, __file__, *map(str, args)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def synthetic_history(n_rows):
+    """
+    Scale data.csv up to roughly n_rows by cloning every week for made-up
+    stations. Copy 0 keeps the real station IDs, so the tram answer is unchanged
+    """
+    path = Path(tempfile.gettempdir()) / f'30dom_fares_{n_rows}.csv'
+    if path.exists():
+        return path
+
+    print(f'Writing synthetic {n_rows}-row fare history to {path} ...')
+    header, *lines = DATA_CSV.read_text(encoding='utf-8-sig').splitlines()
+    copies = max(1, -(-n_rows // len(lines)))
+    with path.open('w', encoding='utf-8') as f:
+        f.write(header + '\n')
+        for k in range(copies):
+            for line in lines:
+                if k:
+                    for station in ('R468', 'R469', 'R259'):
+                        line = line.replace(f',{station},', f',S{k:04d}{station[1:]},')
+                f.write(line + '\n')
+    return path
+
+
+# ============================================================================
+# loader: read-everything-then-clean vs column/row pushdown
+# ============================================================================
+
+def legacy_tram_df(filepath):
+    """The pre-loader path: every column as object, filter, then clean"""
+    import pandas as pd
+
+    df = pd.read_csv(filepath)
+    df['From Date'] = pd.to_datetime(df['From Date'], format='%m/%d/%y')
+    df['To Date'] = pd.to_datetime(df['To Date'], format='%m/%d/%y')
+    df = df[(df['From Date'].dt.year >= 2019) & (df['From Date'].dt.year <= 2020)]
+    tram_df = df[df['Remote Station ID'].isin(['R468', 'R469'])].copy()
+    for col in tram_df.columns:
+        if tram_df[col].dtype == 'object' or pd.api.types.is_string_dtype(tram_df[col]):
+            try:
+                tram_df[col] = pd.to_numeric(tram_df[col].str.replace(',', ''))
+            except (ValueError, TypeError):
+                # What errors='ignore' used to do
+                pass
+    return tram_df
+
+
+def loader_tram_df(filepath, chunksize):
+    import tramway
+
+    return tramway.load_fare_data(
+        filepath,
+        columns=['Total Ridership', 'Full Fare'],
+        start='2019-01-01',
+        end='2020-12-31',
+        stations=tramway.TRAM_STATIONS,
+        chunksize=chunksize,
+    )
+
+
+def loader_worker(args):
+    # Import cost (pandas, matplotlib) is the same for both paths; keep it out of the timing
+    import tramway  # noqa: F401
+
+    start = time.perf_counter()
+    if args.mode == 'legacy':
+        tram_df = legacy_tram_df(args.path)
+    else:
+        tram_df = loader_tram_df(args.path, args.chunksize or None)
+    seconds = time.perf_counter() - start
+
+    monthly = (
+        tram_df.assign(YearMonth=tram_df['From Date'].dt.strftime('%Y-%m'))
+        .groupby(['YearMonth', 'Remote Station ID'])[['Total Ridership', 'Full Fare']]
+        .sum()
+    )
+    print(json.dumps({
+        'seconds': seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'rows': len(tram_df),
+        'monthly': monthly.astype(float).round(6).to_dict(orient='split')['data'],
+    }))
+    return 0
+
+
+def bench_loader(args):
+    path = synthetic_history(args.rows)
+    modes = [
+        ('legacy', 0),
+        ('loader', 0),
+        (f'loader (chunks of {args.chunksize:,})', args.chunksize),
+    ]
+
+    rows = []
+    results = []
+    for label, chunksize in modes:
+        mode = 'legacy' if label == 'legacy' else 'loader'
+        stats = run_worker('_loader-worker', mode, path, chunksize)
+        results.append(stats)
+        rows.append([
+            label, f"{stats['rows']}", f"{stats['seconds']:.2f}", f"{stats['peak_rss_mb']:.0f}",
+        ])
+
+    if any(r['monthly'] != results[0]['monthly'] for r in results[1:]):
+        print('Monthly totals differ between loaders')
+        return 1
+
+    print(f'\nFare CSV, {args.rows:,} rows ({path.stat().st_size / 1e6:.0f} MB) '
+          '-> tram stations 2019-2020; monthly totals identical\n')
+    print_table(['mode', 'rows kept', 'wall s', 'peak RSS MB'], rows)
+    return 0
+
+
+# ============================================================================
+# cache: Parquet cache cold / warm / invalidated vs parsing the CSV
+# ============================================================================
+
+def cache_worker(args):
+    import tramway
+
+    query = dict(
+        columns=['Total Ridership', 'Full Fare'],
+        start='2019-01-01',
+        end='2020-12-31',
+        stations=tramway.TRAM_STATIONS,
+    )
+    start = time.perf_counter()
+    if args.mode == 'csv':
+        tram_df = tramway.load_fare_data(args.path, **query)
+    else:
+        tram_df = tramway.load_fare_data_cached(args.path, **query)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'rows': len(tram_df),
+        'checksum': float(tram_df[['Total Ridership', 'Full Fare']].to_numpy().sum()),
+    }))
+    return 0
+
+
+def bench_cache(args):
+    import os
+    import shutil
+
+    source = synthetic_history(args.rows)
+    work_dir = Path(tempfile.mkdtemp(prefix='30dom_fare_cache_'))
+    path = work_dir / source.name
+
+    def touch():
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def edit():
+        # A trailing blank line changes the bytes but not the parsed table
+        with path.open('a', encoding='utf-8') as f:
+            f.write('\n')
+
+    scenarios = [
+        # (label, mode, prepare)
+        ('parse CSV (no cache)', 'csv', None),
+        ('cold (build cache)', 'cache', None),
+        ('warm', 'cache', None),
+        ('warm, CSV touched', 'cache', touch),
+        ('CSV edited (rebuild)', 'cache', edit),
+        ('warm after rebuild', 'cache', None),
+    ]
+
+    rows = []
+    checksums = set()
+    try:
+        shutil.copyfile(source, path)
+        for label, mode, prepare in scenarios:
+            if prepare:
+                prepare()
+            stats = run_worker('_cache-worker', mode, path)
+            checksums.add((stats['rows'], stats['checksum']))
+            rows.append([label, f"{stats['seconds']:.3f}", f"{stats['peak_rss_mb']:.0f}"])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if len(checksums) != 1:
+        print('Cached and CSV loads returned different tram rows')
+        return 1
+
+    print(f'\nFare cache, {args.rows:,} rows ({source.stat().st_size / 1e6:.0f} MB CSV) '
+          '-> tram stations 2019-2020; results identical\n')
+    print_table(['scenario', 'load s', 'peak RSS MB'], rows)
+    return 0
+
+
+# ============================================================================
+# geometry: per-month Python loops vs band_geometry
+# ============================================================================
+
+def legacy_flow_geometry(values, x_positions, y_bases, elevation_scale=1.5):
+    """The loop-based geometry create_covid_impact_map() used before band_geometry"""
+    import numpy as np
+
+    x_mid = (x_positions[0] + x_positions[-1]) / 2
+    elevation = []
+    for x in x_positions:
+        normalized_dist = (x - x_mid) / (len(x_positions) / 2)
+        elevation.append(1 - normalized_dist**2)
+    elevation_arc = np.array(elevation)
+
+    max_ridership = max(flow[0].max() for flow in values)
+
+    def normalize_thickness(ridership, max_thickness=2.0, min_thickness=0.1):
+        if max_ridership == 0:
+            return min_thickness
+        normalized = ridership / max_ridership
+        return min_thickness + (max_thickness - min_thickness) * normalized
+
+    outlines = []
+    for (total, tourist), y_base in zip(values, y_bases):
+        y_center = y_base + elevation_arc * elevation_scale
+        half_thickness = np.array([normalize_thickness(t) for t in total])
+        resident_top, resident_bottom, tourist_top, tourist_bottom = [], [], [], []
+        for i, (x, y, thickness) in enumerate(zip(x_positions, y_center, half_thickness)):
+            resident_top.append([x, y + thickness])
+            resident_bottom.insert(0, [x, y - thickness])
+            ratio = tourist[i] / total[i] if total[i] > 0 else 0
+            tourist_top.append([x, y + thickness])
+            tourist_bottom.insert(0, [x, y + thickness - thickness * ratio])
+        outlines.append((resident_top + resident_bottom, tourist_top + tourist_bottom))
+    return outlines
+
+
+def best_of(func, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_geometry(args):
+    import numpy as np
+    from tramway import band_geometry
+
+    rng = np.random.default_rng(30)
+    rows = []
+    for n_points in args.points:
+        x_positions = np.arange(1, n_points + 1)
+        totals = rng.integers(0, 150_000, size=(args.flows, n_points)).astype(float)
+        totals[:, ::17] = 0  # months without records
+        tourists = np.floor(totals * rng.uniform(0.1, 0.4, size=totals.shape))
+        values = np.stack([totals, tourists], axis=1)
+        y_bases = [2.0 + 6.0 * (args.flows - 1 - i) for i in range(args.flows)]
+
+        legacy = legacy_flow_geometry(values, x_positions, y_bases)
+        bands = band_geometry.flow_bands(values, x_positions, y_bases)
+        for i, (resident, tourist) in enumerate(legacy):
+            if not (np.array_equal(np.array(resident), bands['resident'][i])
+                    and np.array_equal(np.array(tourist), bands['tourist'][i])):
+                print(f'Vertex mismatch at {n_points} points, flow {i}')
+                return 1
+
+        rounds = max(3, min(200, 200_000 // n_points))
+        loop_s = best_of(lambda: legacy_flow_geometry(values, x_positions, y_bases), rounds)
+        numpy_s = best_of(lambda: band_geometry.flow_bands(values, x_positions, y_bases), rounds)
+        rows.append([
+            f'{n_points:,}', f'{loop_s * 1000:.3f}', f'{numpy_s * 1000:.3f}', f'{loop_s / numpy_s:.1f}x',
+        ])
+
+    print(f'\nBand geometry for {args.flows} flows (best of up to 200 rounds); vertices identical\n')
+    print_table(['points', 'loops ms', 'numpy ms', 'speedup'], rows)
+    return 0
+
+
+# ============================================================================
+# lookup: per-period boolean masks vs one dense reindex
+# ============================================================================
+
+def synthetic_monthly(n_stations, periods, gap_every=23):
+    """Long monthly table shaped like the loader's groupby output, with gaps"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(30)
+    stations = [f'R{i:03d}' for i in range(n_stations)]
+    index = pd.MultiIndex.from_product([stations, periods], names=['Remote Station ID', 'YearMonth'])
+    monthly = pd.DataFrame(index=index).reset_index()
+    monthly['Total Ridership'] = rng.integers(1, 150_000, len(monthly)).astype(float)
+    monthly['Tourist'] = np.floor(monthly['Total Ridership'] * 0.25)
+    monthly['Resident'] = monthly['Total Ridership'] - monthly['Tourist']
+    # Missing weeks / months, and the loader's (period, station) row order
+    monthly = monthly[np.arange(len(monthly)) % gap_every != 0]
+    return stations, monthly.sample(frac=1, random_state=30).reset_index(drop=True)
+
+
+def legacy_flow_arrays(monthly, stations, periods):
+    """Separate each station with a mask, then one mask per period for each value"""
+    import numpy as np
+
+    arrays = []
+    for station in stations:
+        frame = monthly[monthly['Remote Station ID'] == station].sort_values('YearMonth')
+        stacked = np.zeros((2, len(periods)))
+        for i, period in enumerate(periods):
+            month_data = frame[frame['YearMonth'] == period]
+            if len(month_data) > 0:
+                stacked[0, i] = month_data['Total Ridership'].values[0]
+                stacked[1, i] = month_data['Tourist'].values[0]
+        arrays.append(stacked)
+    return arrays
+
+
+def dense_flow_arrays(monthly, stations, periods):
+    import tramway
+
+    by_station = tramway.dense_monthly(monthly, stations, periods)
+    return [tramway.flow_array(by_station[station], periods) for station in stations]
+
+
+def bench_lookup(args):
+    import numpy as np
+    import pandas as pd
+    import tramway  # noqa: F401  (import cost stays out of the timings)
+
+    rows = []
+    for n_periods in args.periods:
+        periods = pd.period_range('2010-01', periods=n_periods, freq=args.freq)
+        stations, monthly = synthetic_monthly(args.stations, periods)
+
+        start = time.perf_counter()
+        legacy = legacy_flow_arrays(monthly, stations, periods)
+        mask_s = time.perf_counter() - start
+        start = time.perf_counter()
+        dense = dense_flow_arrays(monthly, stations, periods)
+        dense_s = time.perf_counter() - start
+
+        if not all(np.array_equal(a, b) for a, b in zip(legacy, dense)):
+            print(f'Flow arrays differ at {n_periods} periods')
+            return 1
+        rows.append([
+            f'{n_periods}', f'{len(monthly):,}', f'{mask_s:.3f}', f'{dense_s:.4f}', f'{mask_s / dense_s:,.0f}x',
+        ])
+
+    print(f'\nFlow arrays for {args.stations} stations, freq {args.freq}; arrays identical\n')
+    print_table(['periods', 'rows', 'masks s', 'reindex s', 'speedup'], rows)
+    return 0
+
+
+# ============================================================================
+# resample: From Date bucketing vs day-fraction week splitting, whole history
+# ============================================================================
+
+def resample_worker(args):
+    import tramway
+
+    counts = ['Total Ridership', 'Full Fare']
+    fare_df = tramway.load_fare_data(args.path, columns=['To Date'] + counts)
+    start = time.perf_counter()
+    if args.mode == 'from-date':
+        booked = fare_df['From Date'].dt.to_period(tramway.RESAMPLE_FREQS[args.freq]).rename('Period')
+        sums = fare_df.groupby([fare_df['Remote Station ID'], booked])[counts].sum()
+    else:
+        sums = tramway.apportion_weeks(fare_df, counts, args.freq)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': seconds,
+        'records': len(fare_df),
+        'groups': len(sums),
+        'total': float(sums['Total Ridership'].sum()),
+        'source_total': float(fare_df['Total Ridership'].sum()),
+    }))
+    return 0
+
+
+def bench_resample(args):
+    source = synthetic_history(args.rows)
+    rows = []
+    conserved = True
+    for freq in args.freqs:
+        for mode in ('from-date', 'split'):
+            stats = run_worker('_resample-worker', mode, freq, source)
+            conserved &= abs(stats['total'] - stats['source_total']) <= 1e-6 * stats['source_total']
+            rows.append([freq, mode, f"{stats['records']:,}", f"{stats['groups']:,}",
+                         f"{stats['seconds']:.3f}", f"{stats['records'] / stats['seconds'] / 1e6:.1f}"])
+
+    print(f"\nWeekly -> calendar periods, all stations, {args.rows:,}-row history; "
+          f"totals {'conserved' if conserved else 'NOT conserved'}\n")
+    print_table(['freq', 'mode', 'records', 'groups', 's', 'M records/s'], rows)
+    return 0 if conserved else 1
+
+
+# ============================================================================
+# cube: whole-table resample vs streamed cube build, then cube queries vs rescans
+# ============================================================================
+
+def cube_worker(args):
+    import numpy as np
+    import tramway
+
+    start = time.perf_counter()
+    if args.mode == 'full':
+        fares = tramway.fare_count_columns(tramway.read_fare_header(args.path))
+        fare_df = tramway.load_fare_data(args.path, columns=['To Date'] + fares)
+        totals = tramway.apportion_weeks(fare_df, fares, 'M').sum().to_numpy()
+        cells = None
+    else:
+        cube = tramway.build_fare_cube(args.path, 'M', chunksize=args.chunksize)
+        totals = cube.totals().to_numpy()
+        cells = list(cube.values.shape)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'cells': cells,
+        'totals': np.nan_to_num(totals).tolist(),
+    }))
+    return 0
+
+
+def bench_cube(args):
+    import numpy as np
+    import pandas as pd
+    import tramway
+
+    source = synthetic_history(args.rows)
+    full = run_worker('_cube-worker', 'full', source, 0)
+    streamed = run_worker('_cube-worker', 'stream', source, args.chunksize)
+    same = np.allclose(full['totals'], streamed['totals'], rtol=1e-9)
+
+    print(f"\nPer-station monthly sums of every fare column, {args.rows:,}-row history; "
+          f"totals {'match' if same else 'DIFFER'}\n")
+    print_table(['mode', 'chunksize', 's', 'peak RSS MB'], [
+        ['read all + resample', '-', f"{full['seconds']:.2f}", f"{full['peak_rss_mb']:.0f}"],
+        ['streamed cube', f"{args.chunksize:,}", f"{streamed['seconds']:.2f}", f"{streamed['peak_rss_mb']:.0f}"],
+    ])
+    n_stations, n_periods, n_fares = streamed['cells']
+    print(f"\ncube: {n_stations} stations x {n_periods} months x {n_fares} fares = "
+          f"{n_stations * n_periods * n_fares * 8 / 2**20:.1f} MB")
+
+    cube = tramway.build_fare_cube(source, 'M', chunksize=args.chunksize)
+    stations = list(cube.stations[::max(1, len(cube.stations) // args.stations)][:args.stations])
+    queries = [
+        ('tram, 2019-2020 ridership', tramway.TRAM_STATIONS, tramway.COVID_PERIODS),
+        (f'{len(stations)} stations, 2015-2020', stations,
+         pd.period_range('2015-01', '2020-12', freq='M')),
+    ]
+    rows = []
+    for name, query_stations, periods in queries:
+        rescan = best_of(lambda: tramway.load_monthly_ridership(
+            source, query_stations, periods, use_cache=False), args.rounds)
+        from_cube = best_of(lambda: tramway.cube_monthly_ridership(cube, query_stations, periods), args.rounds)
+        expected = tramway.load_monthly_ridership(source, query_stations, periods, use_cache=False)
+        answer = tramway.cube_monthly_ridership(cube, query_stations, periods)
+        match = all(np.allclose(expected[s][tramway.RIDERSHIP_COLUMNS], answer[s][tramway.RIDERSHIP_COLUMNS])
+                    for s in query_stations)
+        rows.append([name, f'{rescan * 1e3:.1f}', f'{from_cube * 1e3:.2f}',
+                     f'{rescan / from_cube:.0f}x', 'yes' if match else 'NO'])
+        same &= match
+
+    print(f"\nDense monthly ridership, best of {args.rounds}\n")
+    print_table(['query', 'CSV rescan ms', 'cube ms', 'speedup', 'same'], rows)
+    return 0 if same else 1
+
+
+# ============================================================================
+# batch: create_covid_impact_map() in a loop vs the batch renderer
+# ============================================================================
+
+def covid_job(m_to_i, i_to_m, output_file, targets=('png',)):
+    from tramway import batch
+    import tramway as d
+
+    flows = d.make_flows({'R468': m_to_i, 'R469': i_to_m}, d.COVID_PERIODS)
+    return batch.flow_map_job(
+        flows,
+        d.COVID_PERIODS,
+        output_file,
+        title='Roosevelt Island Tramway\nThe COVID-19 Impact on Ridership  2019-2020',
+        subtitle='Watch ridership collapse in March 2020  |  Line thickness = monthly ridership  |  Light tones = tourists',
+        key_periods=d.COVID_KEY_PERIODS,
+        timeline=d.get_covid_timeline(),
+        timeline_events=d.COVID_KEY_EVENTS,
+        timeline_captions=d.COVID_TIMELINE_CAPTIONS,
+        targets=targets,
+        # Benchmarks time the rendering, not copies out of the export cache
+        use_cache=False,
+    )
+
+
+def bench_batch(args):
+    import os
+    import shutil
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    from tramway import batch
+    import tramway as d
+
+    out_dir = Path(tempfile.mkdtemp(prefix='30dom_batch_'))
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    rows = []
+    try:
+        with quiet:
+            m_to_i, i_to_m = d.load_covid_period_data(DATA_CSV, use_cache=False)
+            all_periods = pd.period_range('2011-01', '2020-12', freq='M')
+            by_station = d.load_monthly_ridership(DATA_CSV, ['R468', 'R469', 'R259'], all_periods,
+                                                  use_cache=False)
+
+        def timed(label, n_figures, func):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+            seconds = time.perf_counter() - start
+            rows.append([label, f'{n_figures}', f'{seconds:.1f}', f'{n_figures / seconds * 60:.1f}'])
+
+        def covid_loop():
+            for k in range(args.figures):
+                fig = d.create_covid_impact_map(m_to_i, i_to_m, output_file=out_dir / f'loop_{k}.png',
+                                                use_cache=False)
+                plt.close(fig)
+
+        covid_jobs = [covid_job(m_to_i, i_to_m, out_dir / f'batch_{k}.png') for k in range(args.figures)]
+        timed('create_covid_impact_map() loop', args.figures, covid_loop)
+        for workers in args.workers:
+            batch._templates.clear()
+            timed(f'batch, {workers} worker(s)', args.figures,
+                  lambda: batch.render_batch(covid_jobs, workers=workers))
+
+        if any((out_dir / f'loop_{k}.png').read_bytes() != (out_dir / f'batch_{k}.png').read_bytes()
+               for k in range(args.figures)):
+            print('Batch output differs from create_covid_impact_map()')
+            return 1
+
+        # A report-style mix: station groups x single years (+ 2019-2020) x fare splits
+        period_ranges = [pd.period_range(f'{y}-01', f'{y}-12', freq='M') for y in range(2011, 2021)]
+        period_ranges.append(d.COVID_PERIODS)
+        report_jobs = batch.flow_map_jobs(
+            by_station, [('R468', 'R469'), ('R259',)], period_ranges, out_dir / 'report',
+        )
+        for job in report_jobs:
+            job['use_cache'] = False
+        for workers in args.workers:
+            batch._templates.clear()
+            timed(f'report mix, {workers} worker(s)', len(report_jobs),
+                  lambda: batch.render_batch(report_jobs, workers=workers))
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    print(f'\nFlow map rendering at 300 dpi, {os.cpu_count()} CPU(s); '
+          'batch PNGs byte-identical to create_covid_impact_map()\n')
+    print_table(['mode', 'figures', 'wall s', 'figures/min'], rows)
+    return 0
+
+
+# ============================================================================
+# imports: what a loader-only process pays to import the package
+# ============================================================================
+
+IMPORT_SCENARIOS = {
+    'loader only': 'import tramway',
+    'loader + render': 'import tramway.render',
+}
+
+
+def imports_worker(args):
+    start = time.perf_counter()
+    exec(IMPORT_SCENARIOS[args.scenario])
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': seconds,
+        'modules': len(sys.modules),
+        'matplotlib': 'matplotlib' in sys.modules,
+        'peak_rss_mb': peak_rss_mb(),
+    }))
+    return 0
+
+
+def bench_imports(args):
+    rows = []
+    for scenario in IMPORT_SCENARIOS:
+        stats = [run_worker('_imports-worker', scenario) for _ in range(args.rounds)]
+        best = min(stats, key=lambda s: s['seconds'])
+        rows.append([scenario, f"{best['seconds']:.3f}", best['modules'],
+                     'yes' if best['matplotlib'] else 'no', f"{best['peak_rss_mb']:.0f}"])
+
+    print(f'\nFresh-interpreter import cost, best of {args.rounds}\n')
+    print_table(['import', 's', 'modules', 'matplotlib', 'peak RSS MB'], rows)
+    return 0
+
+
+# ============================================================================
+# export: per-target export time and file size
+# ============================================================================
+
+def bench_export(args):
+    import shutil
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    from tramway import batch
+    import tramway as d
+    from tramway import export
+
+    out_dir = Path(tempfile.mkdtemp(prefix='30dom_export_'))
+    rows = []
+
+    def add_row(label, seconds, paths=()):
+        size = sum(Path(path).stat().st_size for path in paths)
+        rows.append([label, f'{seconds:.3f}', f'{size / 1024:,.0f}' if paths else ''])
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            m_to_i, i_to_m = d.load_covid_period_data(DATA_CSV, use_cache=False)
+            fig = d.create_covid_impact_map(m_to_i, i_to_m, output_file=None)
+        # Text metrics are cached per process; warm them so the first row is not penalised
+        fig.savefig(out_dir / 'warmup.png', dpi=72)
+
+        legacy = out_dir / 'legacy.png'
+        seconds = best_of(lambda: fig.savefig(legacy, dpi=300, bbox_inches='tight',
+                                              facecolor=export.FACECOLOR), args.rounds)
+        add_row("savefig(bbox_inches='tight'), 300 dpi", seconds, [legacy])
+
+        seconds = best_of(lambda: export.tight_bbox(fig, 300), args.rounds)
+        add_row('tight_bbox() (layout-only draw)', seconds)
+        bbox = export.tight_bbox(fig, 300)
+
+        for target in args.targets:
+            spec = export.EXPORT_TARGETS[target]
+            path = export.target_path(out_dir / 'covid.png', target)
+            seconds = best_of(lambda: export.save_target(fig, path, target, bbox), args.rounds)
+            add_row(f"{target} ({spec['format']}, {spec['dpi']} dpi)", seconds, [path])
+        identical = legacy.read_bytes() == export.target_path(out_dir / 'covid.png', 'png').read_bytes() \
+            if 'png' in args.targets else None
+        plt.close(fig)
+
+        # End to end through the batch renderer: cold, then served from the cache
+        job = covid_job(m_to_i, i_to_m, out_dir / 'job' / 'covid.png', targets=args.targets)
+        job['use_cache'] = True
+        for label in ('all targets, cold cache', 'all targets, cache hit'):
+            start = time.perf_counter()
+            paths = batch.render_job(job)
+            add_row(f'render_job(): {label}', time.perf_counter() - start, paths.values())
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    note = '' if identical is None else \
+        f"; png target {'byte-identical to' if identical else 'DIFFERS from'} the tight savefig"
+    print(f'\nCOVID flow map exports, best of {args.rounds}{note}\n')
+    print_table(['export', 's', 'KB'], rows)
+    return 0 if identical is not False else 1
+
+
+# ============================================================================
+# stages: where the time goes in one production figure build
+# ============================================================================
+
+def stages_worker(args):
+    import matplotlib
+    matplotlib.use('Agg')
+
+    from tramway import instrument
+    import tramway as d
+
+    instrument.configure(args.modes, args.profile_dir)
+    Path(args.profile_dir).mkdir(parents=True, exist_ok=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        m_to_i, i_to_m = d.load_covid_period_data(DATA_CSV, use_cache=args.cache == 'cache')
+        d.create_covid_impact_map(m_to_i, i_to_m,
+                                  output_file=Path(args.profile_dir) / 'roosevelt_tramway_covid_impact.png',
+                                  use_cache=False)
+    print(json.dumps({'report': str(instrument.write_report())}))
+    return 0
+
+
+def bench_stages(args):
+    import shutil
+
+    profile_dir = Path(args.profile_dir or tempfile.mkdtemp(prefix='30dom_stages_'))
+    try:
+        report_path = run_worker('_stages-worker', args.modes, args.cache, profile_dir)['report']
+        report = json.loads(Path(report_path).read_text(encoding='utf-8'))
+    finally:
+        if args.profile_dir is None:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    # Top-level stages partition the build; nested ones are shown indented
+    build_seconds = sum(s['seconds'] for s in report['stages'] if '/' not in s['stage'])
+    rows = []
+    for s in report['stages']:
+        depth = s['stage'].count('/')
+        rows.append([
+            '  ' * depth + s['stage'].rsplit('/', 1)[-1],
+            s['calls'],
+            f"{s['seconds']:.3f}",
+            f"{s['seconds'] / build_seconds * 100:.0f}%",
+            f"{s['rss_peak_mb']:.0f}",
+        ] + ([f"{s['py_peak_mb']:.1f}"] if 'py_peak_mb' in s else []))
+
+    print(f"\nCOVID flow map build ({args.cache} read), modes: {', '.join(report['modes'])}; "
+          f"{build_seconds:.2f} s in stages, process peak RSS {report['rss_peak_mb']:.0f} MB\n")
+    headers = ['stage', 'calls', 's', 'share', 'RSS peak MB']
+    if 'memory' in report['modes']:
+        headers.append('py peak MB')
+    print_table(headers, rows)
+    if args.profile_dir is not None:
+        print(f'\nReport and any cProfile dumps kept in {profile_dir}')
+    return 0
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks for the tramway flow map.')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    p = subparsers.add_parser('loader', help='Fare CSV: read-all-then-clean vs pushdown loader')
+    p.add_argument('--rows', type=int, default=500_000)
+    p.add_argument('--chunksize', type=int, default=100_000)
+    p.set_defaults(func=bench_loader)
+
+    p = subparsers.add_parser('cache', help='Parquet cache: cold, warm and invalidated loads')
+    p.add_argument('--rows', type=int, default=500_000)
+    p.set_defaults(func=bench_cache)
+
+    p = subparsers.add_parser('geometry', help='Band outlines: per-month loops vs NumPy')
+    p.add_argument('--points', type=int, nargs='+', default=[24, 520, 10_000])
+    p.add_argument('--flows', type=int, default=2)
+    p.set_defaults(func=bench_geometry)
+
+    p = subparsers.add_parser('lookup', help='Per-period values: boolean masks vs one dense reindex')
+    p.add_argument('--stations', type=int, default=200)
+    p.add_argument('--periods', type=int, nargs='+', default=[24, 144, 520])
+    p.add_argument('--freq', default='W', help="Period frequency, e.g. 'W' or 'M'")
+    p.set_defaults(func=bench_lookup)
+
+    p = subparsers.add_parser('resample', help='Weeks to months / quarters / years: From Date vs split')
+    p.add_argument('--rows', type=int, default=500_000)
+    p.add_argument('--freqs', nargs='+', default=['M', 'Q', 'Y'])
+    p.set_defaults(func=bench_resample)
+
+    p = subparsers.add_parser('cube', help='Station x month x fare cube: build memory and query time')
+    p.add_argument('--rows', type=int, default=500_000)
+    p.add_argument('--chunksize', type=int, default=100_000)
+    p.add_argument('--stations', type=int, default=50, help='stations in the wide query')
+    p.add_argument('--rounds', type=int, default=3)
+    p.set_defaults(func=bench_cube)
+
+    p = subparsers.add_parser('batch', help='Figures per minute: render loop vs batch renderer')
+    p.add_argument('--figures', type=int, default=12)
+    p.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    p.set_defaults(func=bench_batch)
+
+    p = subparsers.add_parser('imports', help='Import cost with and without the renderer')
+    p.add_argument('--rounds', type=int, default=5)
+    p.set_defaults(func=bench_imports)
+
+    p = subparsers.add_parser('export', help='Export time and file size per target')
+    p.add_argument('--targets', nargs='+', default=['preview', 'png', 'svg', 'pdf', 'webp'])
+    p.add_argument('--rounds', type=int, default=3)
+    p.set_defaults(func=bench_export)
+
+    p = subparsers.add_parser('stages', help='Stage timing report for one COVID figure build')
+    p.add_argument('--modes', default='timers', help='timers, memory, cprofile or all')
+    p.add_argument('--cache', choices=['csv', 'cache'], default='csv',
+                   help='read the fare CSV directly or through the Parquet cache')
+    p.add_argument('--profile-dir', help='keep report.json and .prof dumps here')
+    p.set_defaults(func=bench_stages)
+
+    p = subparsers.add_parser('_loader-worker')
+    p.add_argument('mode', choices=['legacy', 'loader'])
+    p.add_argument('path')
+    p.add_argument('chunksize', type=int)
+    p.set_defaults(func=loader_worker)
+
+    p = subparsers.add_parser('_cache-worker')
+    p.add_argument('mode', choices=['csv', 'cache'])
+    p.add_argument('path')
+    p.set_defaults(func=cache_worker)
+
+    p = subparsers.add_parser('_resample-worker')
+    p.add_argument('mode', choices=['from-date', 'split'])
+    p.add_argument('freq')
+    p.add_argument('path')
+    p.set_defaults(func=resample_worker)
+
+    p = subparsers.add_parser('_cube-worker')
+    p.add_argument('mode', choices=['full', 'stream'])
+    p.add_argument('path')
+    p.add_argument('chunksize', type=int)
+    p.set_defaults(func=cube_worker)
+
+    p = subparsers.add_parser('_imports-worker')
+    p.add_argument('scenario', choices=list(IMPORT_SCENARIOS))
+    p.set_defaults(func=imports_worker)
+
+    p = subparsers.add_parser('_stages-worker')
+    p.add_argument('modes')
+    p.add_argument('cache', choices=['csv', 'cache'])
+    p.add_argument('profile_dir')
+    p.set_defaults(func=stages_worker)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
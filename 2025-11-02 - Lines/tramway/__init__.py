@@ -0,0 +1,176 @@
+"""
+Roosevelt Island Tramway flow maps (#30DayMapChallenge 2025 - Flow Lines)
+
+    import tramway
+    by_station = tramway.load_monthly_ridership('edited.csv', ['R468', 'R469'], tramway.COVID_PERIODS)
+
+Loading, aggregation and flow geometry need only pandas and NumPy. The
+rendering names (create_flow_map, export_figure, render_batch, ...) are
+imported on first use, so a process that never draws never loads matplotlib.
+Run the full figure with `python -m tramway`.
+"""
+
+from importlib import import_module
+
+from .cube import (
+    FARE_CUBE_VERSION,
+    FareCube,
+    build_fare_cube,
+    fare_cube_path,
+    load_fare_cube,
+)
+from .flows import (
+    ELEVATION_SCALE,
+    FLOW_BOTTOM,
+    FLOW_COLORS,
+    FLOW_SPACING,
+    flow_array,
+    flow_geometry,
+    get_elevation_arc,
+    make_flows,
+    month_label_stride,
+)
+from .loader import (
+    FARE_CACHE_DIRNAME,
+    FARE_CACHE_VERSION,
+    FARE_CALENDAR_COLUMNS,
+    FARE_DATE_COLUMNS,
+    FARE_DATE_DTYPE,
+    FARE_DATE_FORMAT,
+    FARE_RATIO_COLUMNS,
+    FARE_ROW_COLUMN,
+    FARE_TEXT_COLUMNS,
+    FARE_YEAR_PARTITION,
+    TRAM_STATIONS,
+    build_fare_cache,
+    ensure_fare_cache,
+    fare_cache_dir,
+    fare_count_columns,
+    fare_dtypes,
+    fare_partition_files,
+    fare_partitioning,
+    filter_fare_rows,
+    hive_partitions,
+    iter_fare_data,
+    load_fare_data,
+    load_fare_data_cached,
+    read_cache_fingerprint,
+    read_fare_header,
+    sha256_file,
+    source_fingerprint,
+    write_cache_fingerprint,
+)
+from .resample import (
+    RESAMPLE_FREQS,
+    apportion_weeks,
+    apportion_weights,
+    record_spans,
+)
+from .ridership import (
+    COVID_PERIODS,
+    RIDERSHIP_COLUMNS,
+    STATION_LABELS,
+    cube_monthly_ridership,
+    dense_monthly,
+    load_covid_period_data,
+    load_monthly_ridership,
+    ridership_frame,
+    station_label,
+)
+from .timeline import (
+    COVID_KEY_EVENTS,
+    COVID_KEY_PERIODS,
+    COVID_TIMELINE_CAPTIONS,
+    get_covid_timeline,
+)
+
+# name -> submodule, imported on first attribute access (PEP 562)
+_LAZY = {
+    'FLOW_MAP_STYLE': 'render',
+    'flow_map_style': 'render',
+    'layout_flow_map': 'render',
+    'draw_flow_template': 'render',
+    'draw_flow_layers': 'render',
+    'create_flow_map': 'render',
+    'create_covid_impact_map': 'render',
+    'EXPORT_TARGETS': 'export',
+    'export_figure': 'export',
+    'tight_bbox': 'export',
+    'flow_map_job': 'batch',
+    'flow_map_jobs': 'batch',
+    'render_batch': 'batch',
+}
+
+# Star-imports stay matplotlib-free; the rendering names are reachable as attributes
+__all__ = [
+    'FARE_CUBE_VERSION',
+    'FareCube',
+    'build_fare_cube',
+    'fare_cube_path',
+    'load_fare_cube',
+    'ELEVATION_SCALE',
+    'FLOW_BOTTOM',
+    'FLOW_COLORS',
+    'FLOW_SPACING',
+    'flow_array',
+    'flow_geometry',
+    'get_elevation_arc',
+    'make_flows',
+    'month_label_stride',
+    'FARE_CACHE_DIRNAME',
+    'FARE_CACHE_VERSION',
+    'FARE_CALENDAR_COLUMNS',
+    'FARE_DATE_COLUMNS',
+    'FARE_DATE_DTYPE',
+    'FARE_DATE_FORMAT',
+    'FARE_RATIO_COLUMNS',
+    'FARE_ROW_COLUMN',
+    'FARE_TEXT_COLUMNS',
+    'FARE_YEAR_PARTITION',
+    'TRAM_STATIONS',
+    'build_fare_cache',
+    'ensure_fare_cache',
+    'fare_cache_dir',
+    'fare_count_columns',
+    'fare_dtypes',
+    'fare_partition_files',
+    'fare_partitioning',
+    'filter_fare_rows',
+    'hive_partitions',
+    'iter_fare_data',
+    'load_fare_data',
+    'load_fare_data_cached',
+    'read_cache_fingerprint',
+    'read_fare_header',
+    'source_fingerprint',
+    'write_cache_fingerprint',
+    'RESAMPLE_FREQS',
+    'apportion_weeks',
+    'apportion_weights',
+    'record_spans',
+    'COVID_PERIODS',
+    'RIDERSHIP_COLUMNS',
+    'STATION_LABELS',
+    'cube_monthly_ridership',
+    'dense_monthly',
+    'load_covid_period_data',
+    'load_monthly_ridership',
+    'ridership_frame',
+    'station_label',
+    'COVID_KEY_EVENTS',
+    'COVID_KEY_PERIODS',
+    'COVID_TIMELINE_CAPTIONS',
+    'get_covid_timeline',
+]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(import_module(f'.{_LAZY[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
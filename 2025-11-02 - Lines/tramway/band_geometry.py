@@ -0,0 +1,88 @@
+"""
+Band geometry for the tramway flow map
+
+Builds the elevation arc, band thickness and the resident / tourist outlines
+of every flow in one pass over (n_flows, n_points) arrays. The vertices are
+the same floats the original per-month loops produced.
+"""
+
+import numpy as np
+
+
+def elevation_arc(x_positions):
+    """
+    Elevation arc mimicking the tram path: 1 at the midpoint, 0 at a
+    half-length away
+    """
+    x_positions = np.asarray(x_positions)
+    x_mid = (x_positions[0] + x_positions[-1]) / 2
+    normalized_dist = (x_positions - x_mid) / (len(x_positions) / 2)
+    return 1 - normalized_dist**2
+
+
+def half_thickness(ridership, max_ridership, max_thickness=2.0, min_thickness=0.1):
+    """
+    Ridership to half-thickness on an ABSOLUTE scale shared by all flows
+    """
+    ridership = np.asarray(ridership, dtype=float)
+    if max_ridership == 0:
+        return np.full(ridership.shape, min_thickness)
+    normalized = ridership / max_ridership
+    return min_thickness + (max_thickness - min_thickness) * normalized
+
+
+def tourist_ratio(total, tourist):
+    """Tourist share of each total; 0 where there were no riders"""
+    total = np.asarray(total, dtype=float)
+    tourist = np.asarray(tourist, dtype=float)
+    return np.divide(tourist, total, out=np.zeros_like(total), where=total > 0)
+
+
+def band_outlines(x_positions, y_centers, half_thicknesses, tourist_ratios):
+    """
+    Outlines for all flows at once
+
+    y_centers, half_thicknesses, tourist_ratios - (n_flows, n_points)
+    Returns (resident, tourist), each (n_flows, 2 * n_points, 2): the top edge
+    left to right followed by the bottom edge right to left. The tourist band
+    hangs down from the top edge by thickness * tourist ratio
+    """
+    y = np.asarray(y_centers, dtype=float)
+    h = np.asarray(half_thicknesses, dtype=float)
+    x = np.broadcast_to(np.asarray(x_positions, dtype=float), y.shape)
+
+    top_y = y + h
+    top = np.stack([x, top_y], axis=-1)
+    resident_bottom = np.stack([x, y - h], axis=-1)[:, ::-1]
+    tourist_bottom = np.stack([x, top_y - h * tourist_ratios], axis=-1)[:, ::-1]
+
+    resident = np.concatenate([top, resident_bottom], axis=1)
+    tourist = np.concatenate([top, tourist_bottom], axis=1)
+    return resident, tourist
+
+
+def flow_bands(values, x_positions, y_bases, elevation_scale=1.5,
+               max_thickness=2.0, min_thickness=0.1):
+    """
+    Everything the renderer needs for a stack of flows
+
+    values  - (n_flows, 2, n_points): total and tourist ridership per flow
+    y_bases - baseline of each flow before the elevation arc is added
+    """
+    values = np.asarray(values, dtype=float).reshape(-1, 2, len(x_positions))
+    totals = values[:, 0]
+    tourists = values[:, 1]
+    max_ridership = totals.max() if totals.size else 0
+
+    arc = elevation_arc(x_positions)
+    y_centers = np.asarray(y_bases, dtype=float)[:, None] + arc * elevation_scale
+    thickness = half_thickness(totals, max_ridership, max_thickness, min_thickness)
+    resident, tourist = band_outlines(x_positions, y_centers, thickness,
+                                      tourist_ratio(totals, tourists))
+    return {
+        'max_ridership': max_ridership,
+        'y_centers': y_centers,
+        'half_thickness': thickness,
+        'resident': resident,
+        'tourist': tourist,
+    }
@@ -0,0 +1,190 @@
+"""
+Batch rendering of many tramway flow maps
+
+Each worker process builds the static scaffolding of a figure (gridspec,
+year / month labels, timeline strip, credit) once per layout and keeps it.
+Every job then only swaps in its band polygons, annotations and titles,
+exports, and removes them again. Workers run on the headless Agg backend.
+Figures whose exports are all in the export cache are not drawn at all.
+
+    jobs = flow_map_jobs(by_station, [('R468', 'R469')], [COVID_PERIODS], 'out/')
+    render_batch(jobs, workers=4)
+"""
+
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from . import export, instrument
+from .flows import make_flows
+from .render import draw_flow_layers, draw_flow_template, flow_map_style, layout_flow_map
+
+# Layouts kept alive per worker; each holds one open figure
+MAX_TEMPLATES = 8
+
+LIGHT_TONE_LABELS = {
+    'Tourist': 'Light tones = tourists',
+    'Resident': 'Light tones = residents',
+}
+
+_templates = OrderedDict()
+
+
+# ============================================================================
+# Jobs
+# ============================================================================
+
+def flow_map_job(flows, periods, output_file, title=None, subtitle=None, key_periods=None,
+                 timeline=None, timeline_events=None, timeline_captions=None,
+                 timeline_title='NYC COVID-19 Timeline & Interventions',
+                 targets=('png',), use_cache=True):
+    """Everything one figure needs, as a picklable dict; see export.EXPORT_TARGETS"""
+    if subtitle is None:
+        subtitle = 'Line thickness = ridership per period  |  Light tones = tourists'
+    return {
+        'flows': flows,
+        'periods': periods,
+        'output_file': str(output_file),
+        'title': title,
+        'subtitle': subtitle,
+        'key_periods': key_periods,
+        'timeline': timeline,
+        'timeline_events': timeline_events,
+        'timeline_captions': timeline_captions,
+        'timeline_title': timeline_title,
+        'targets': list(export.check_targets(targets)),
+        'use_cache': use_cache,
+    }
+
+
+def flow_map_jobs(by_station, station_groups, period_ranges, output_dir,
+                  splits=('Tourist', 'Resident'), timeline=None, targets=('png',)):
+    """
+    One job per station group x period range x fare split
+
+    by_station     - {station: dense monthly frame} covering every period range
+    station_groups - e.g. [('R468', 'R469'), ('R259',)]; first station = top band
+    period_ranges  - monthly PeriodIndexes
+    splits         - light-band column of each map ('Tourist' or 'Resident')
+    """
+    output_dir = Path(output_dir)
+    jobs = []
+    for stations in station_groups:
+        for periods in period_ranges:
+            for split in splits:
+                frames = {station: by_station[station].loc[periods] for station in stations}
+                flows = make_flows(frames, periods, light_column=split)
+                name = f"{'-'.join(stations)}_{periods[0]}_{periods[-1]}_{split.lower()}.png"
+                labels = ' / '.join(flow['label'] for flow in flows)
+                jobs.append(flow_map_job(
+                    flows,
+                    periods,
+                    output_dir / name,
+                    title=f"{labels}\n{periods[0].strftime('%b %Y')} – {periods[-1].strftime('%b %Y')}",
+                    subtitle=f'Line thickness = ridership per period  |  {LIGHT_TONE_LABELS[split]}',
+                    timeline=timeline,
+                    targets=targets,
+                ))
+    return jobs
+
+
+# ============================================================================
+# Rendering
+# ============================================================================
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# The job fields a figure is drawn from; they key the export cache
+FIGURE_INPUTS = ['flows', 'periods', 'title', 'subtitle', 'key_periods', 'timeline',
+                 'timeline_events', 'timeline_captions', 'timeline_title']
+
+
+def template_key(job):
+    return (
+        tuple(job['periods']),
+        job['periods'].freqstr,
+        len(job['flows']),
+        _freeze(job['timeline']),
+        _freeze(job['timeline_events']),
+        _freeze(job['timeline_captions']),
+        job['timeline_title'],
+    )
+
+
+def get_template(job):
+    key = template_key(job)
+    template = _templates.get(key)
+    if template is not None:
+        _templates.move_to_end(key)
+        return template
+
+    template = draw_flow_template(
+        job['periods'],
+        len(job['flows']),
+        timeline=job['timeline'],
+        timeline_events=job['timeline_events'],
+        timeline_captions=job['timeline_captions'],
+        timeline_title=job['timeline_title'],
+        use_pyplot=False,
+    )
+    # Layout depends only on the scaffolding, so it is solved once per template
+    layout_flow_map(template['fig'])
+    _templates[key] = template
+    if len(_templates) > MAX_TEMPLATES:
+        _templates.popitem(last=False)
+    return template
+
+
+@flow_map_style()
+def render_job(job):
+    """Render one job onto its cached template; returns {target: path}"""
+    inputs = {field: job[field] for field in FIGURE_INPUTS}
+    if job['use_cache']:
+        paths = export.cached_exports(job['output_file'], job['targets'], inputs)
+        if paths is not None:
+            return paths
+
+    template = get_template(job)
+    artists = draw_flow_layers(
+        template,
+        job['flows'],
+        title=job['title'],
+        subtitle=job['subtitle'],
+        key_periods=job['key_periods'],
+    )
+    try:
+        with instrument.stage('export'):
+            return export.export_figure(template['fig'], job['output_file'], job['targets'],
+                                        inputs=inputs, use_cache=job['use_cache'])
+    finally:
+        for artist in artists:
+            artist.remove()
+
+
+def init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_batch(jobs, workers=None, chunksize=None):
+    """
+    Render every job; returns {target: path} dicts in job order
+    workers=1 renders in this process (still reusing templates)
+    """
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return [render_job(job) for job in jobs]
+
+    if chunksize is None:
+        # Big enough chunks that each worker reuses its templates
+        chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        return list(pool.map(render_job, jobs, chunksize=chunksize))
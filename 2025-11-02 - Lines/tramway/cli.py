@@ -0,0 +1,88 @@
+"""
+Command line entry point: python -m tramway [--targets png svg] [--show]
+"""
+
+import argparse
+import os
+
+from . import instrument
+from .ridership import load_covid_period_data
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='tramway',
+                                     description='Roosevelt Island Tramway COVID-19 flow map')
+    parser.add_argument('--data', default='edited.csv',
+                        help='MetroCard fare history CSV (default: edited.csv)')
+    parser.add_argument('--output', default='roosevelt_tramway_covid_impact.png',
+                        help='base name of the exported files')
+    # Same names as export.EXPORT_TARGETS, spelled out so --help does not import matplotlib
+    parser.add_argument('--targets', nargs='+', default=['png'],
+                        choices=['preview', 'png', 'svg', 'pdf', 'webp'],
+                        help='files to write (default: png)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='parse the CSV and re-render instead of using .fare_cache / .export_cache')
+    parser.add_argument('--show', action='store_true',
+                        help='also open the figure in a window (default: headless)')
+    parser.add_argument('--profile', metavar='MODES',
+                        help=f"stage report: timers, memory, cprofile or all "
+                             f"(default: ${instrument.PROFILE_ENV})")
+    parser.add_argument('--profile-dir', metavar='DIR',
+                        help=f"where the report goes (default: ${instrument.PROFILE_DIR_ENV} "
+                             f"or {instrument.DEFAULT_PROFILE_DIR})")
+    return parser
+
+
+def main(argv=None):
+    # parse_known_args: Colab / Jupyter pass their own kernel arguments
+    args, _ = build_parser().parse_known_args(argv)
+    if args.profile is not None or args.profile_dir is not None:
+        modes = args.profile if args.profile is not None else os.environ.get(instrument.PROFILE_ENV, '')
+        instrument.configure(modes, args.profile_dir)
+    
+    print("\n" + "="*70)
+    print("Roosevelt Island Tramway - COVID-19 Impact Visualization")
+    print("="*70)
+    
+    print("\n📊 Loading 2019-2020 data...")
+    
+    try:
+        m_to_i, i_to_m = load_covid_period_data(args.data, use_cache=not args.no_cache)
+    except FileNotFoundError:
+        print(f"ERROR: '{args.data}' not found. Please ensure the data file is available.")
+        return 1
+    
+    print(f"✅ Data loaded: {len(i_to_m)} months of ridership data")
+    print(f"   Period: 2019-2020")
+    print(f"   Stations: R468 (Manhattan→Island), R469 (Island→Manhattan)")
+    
+    print("\n🎨 Creating COVID-19 impact visualization...")
+    print("   Watch for the DRAMATIC crash in March 2020!")
+    
+    # Only now is matplotlib imported; without --show it never needs a display
+    import matplotlib
+    if not args.show:
+        matplotlib.use('Agg')
+    from .render import create_covid_impact_map, flow_map_style
+    
+    create_covid_impact_map(m_to_i, i_to_m, output_file=args.output,
+                                  targets=args.targets, use_cache=not args.no_cache,
+                                  draw_cached=args.show)
+    
+    print("\n" + "="*70)
+    print("✅ DONE! Your COVID impact map is ready!")
+    print("   The visualization shows:")
+    print("   • Thick flows in 2019 (normal operations)")
+    print("   • DRAMATIC crash in March 2020 (lockdown)")
+    print("   • Thin flows through rest of 2020 (reduced ridership)")
+    print("="*70 + "\n")
+    
+    report_path = instrument.write_report()
+    if report_path:
+        print(f"⏱  Stage report written to {report_path}")
+    
+    if args.show:
+        import matplotlib.pyplot as plt
+        with flow_map_style():
+            plt.show()
+    return 0
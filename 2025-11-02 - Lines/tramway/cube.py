@@ -0,0 +1,218 @@
+"""
+Station x period x fare type cube of summed fare counts
+
+Built in one streaming pass over the fare CSV: each block is resampled onto
+calendar periods (see resample.py) and added into a running per-(station,
+period) table, so memory is bounded by the block size plus the cube itself,
+never the full weekly history. Queries then index a dense float64 array
+instead of re-reading and re-grouping the raw records.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+from .loader import (
+    fare_cache_dir,
+    fare_count_columns,
+    iter_fare_data,
+    read_fare_header,
+    source_fingerprint,
+)
+from .resample import PERIOD_COLUMN, RESAMPLE_FREQS, STATION_COLUMN, apportion_weeks
+
+# Bump when the saved cube layout changes so old files are rebuilt
+FARE_CUBE_VERSION = 1
+
+
+class FareCube:
+    """
+    Summed fare counts in a dense (station, period, fare) float64 array
+    Pairs without records are 0, like the dense monthly frames
+
+    stations - Index of Remote Station IDs (axis 0)
+    periods  - contiguous PeriodIndex (axis 1)
+    fares    - Index of fare count columns (axis 2)
+    """
+
+    def __init__(self, values, stations, periods, fares):
+        self.values = np.asarray(values, dtype=float)
+        self.stations = pd.Index(stations, name=STATION_COLUMN)
+        self.periods = pd.PeriodIndex(periods, name=PERIOD_COLUMN)
+        self.fares = pd.Index(fares)
+        expected = (len(self.stations), len(self.periods), len(self.fares))
+        if self.values.shape != expected:
+            raise ValueError(f"Cube values have shape {self.values.shape}, axes need {expected}")
+
+    def __repr__(self):
+        return (f"FareCube({len(self.stations)} stations x {len(self.periods)} "
+                f"{self.periods.freqstr} periods x {len(self.fares)} fares)")
+
+    @property
+    def freq(self):
+        return self.periods.freqstr
+
+    def sel(self, stations=None, periods=None, fares=None):
+        """
+        Sub-cube for the given labels (None = the whole axis), in the order asked
+        Stations or periods the cube has never seen come back as 0
+        """
+        stations = self.stations if stations is None else pd.Index(list(stations))
+        if periods is None:
+            periods = self.periods
+        elif pd.PeriodIndex(periods).freqstr != self.freq:
+            raise ValueError(f"Periods are {pd.PeriodIndex(periods).freqstr}, cube is {self.freq}")
+        fares = self.fares if fares is None else pd.Index(list(fares))
+        missing = fares[self.fares.get_indexer(fares) < 0]
+        if len(missing):
+            raise KeyError(f"Fare columns not in cube: {list(missing)}")
+
+        # -1 marks a label the cube has no records for
+        station_pos = self.stations.get_indexer(stations)
+        period_pos = self.periods.get_indexer(periods)
+        fare_pos = self.fares.get_indexer(fares)
+
+        values = np.zeros((len(stations), len(periods), len(fares)))
+        found_stations, found_periods = station_pos >= 0, period_pos >= 0
+        values[np.ix_(found_stations, found_periods)] = self.values[
+            np.ix_(station_pos[found_stations], period_pos[found_periods], fare_pos)]
+        return FareCube(values, stations, periods, fares)
+
+    def sums(self, stations=None, periods=None, fares=None):
+        """
+        Long frame indexed by (station, Period) with one column per fare,
+        the same shape apportion_weeks() returns but dense over the selection
+        """
+        cube = self.sel(stations, periods, fares)
+        index = pd.MultiIndex.from_product([cube.stations, cube.periods],
+                                           names=[STATION_COLUMN, PERIOD_COLUMN])
+        return pd.DataFrame(cube.values.reshape(-1, len(cube.fares)), index=index, columns=cube.fares)
+
+    def station_frame(self, station, periods=None, fares=None):
+        """One station as a frame indexed by period, one column per fare"""
+        cube = self.sel([station], periods, fares)
+        return pd.DataFrame(cube.values[0], index=cube.periods, columns=cube.fares)
+
+    def totals(self, fares=None):
+        """Per-fare totals over every station and period"""
+        cube = self.sel(fares=fares)
+        return pd.Series(cube.values.sum(axis=(0, 1)), index=cube.fares)
+
+    def save(self, path, **meta):
+        """Write the cube as an uncompressed .npz; `meta` is stored as JSON beside it"""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                values=self.values,
+                stations=self.stations.to_numpy(dtype=str),
+                periods=self.periods.asi8,
+                fares=self.fares.to_numpy(dtype=str),
+                freq=np.array(self.freq),
+                meta=np.array(json.dumps(meta)),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a cube written by save(); returns (cube, meta)"""
+        with np.load(path) as data:
+            periods = pd.PeriodIndex.from_ordinals(data['periods'], freq=str(data['freq']))
+            cube = cls(data['values'], data['stations'].tolist(), periods, data['fares'].tolist())
+            return cube, json.loads(str(data['meta']))
+
+
+def booked_sums(fare_df, columns, freq):
+    """Per-(station, period) sums with every week booked to its From Date's period"""
+    period = fare_df['From Date'].dt.to_period(freq).rename(PERIOD_COLUMN)
+    return fare_df.groupby([fare_df[STATION_COLUMN], period])[columns].sum(min_count=1)
+
+
+@instrument.stage('cube_build')
+def build_fare_cube(filepath, freq='M', fares=None, stations=None, chunksize=250_000,
+                    split_weeks=True):
+    """
+    Stream the fare CSV once and sum every fare column per station and period
+
+    freq        - 'M', 'Q' or 'Y' (or any pandas period alias)
+    fares       - count columns to include (None = every summable column;
+                  ratios such as '% of Non-Full Fare' are never summed)
+    stations    - Remote Station IDs to keep (None = all)
+    chunksize   - rows parsed per block; peak memory grows with this, not the file
+    split_weeks - share a week that spans two periods by day fraction
+    """
+    freq = RESAMPLE_FREQS.get(freq, freq)
+    if fares is None:
+        fares = fare_count_columns(read_fare_header(filepath))
+    fares = list(fares)
+    # The week split needs both ends of every record
+    columns = ['To Date'] + fares if split_weeks else fares
+
+    running = None
+    n_blocks = n_records = 0
+    for block in iter_fare_data(filepath, columns=columns, stations=stations, chunksize=chunksize):
+        if split_weeks:
+            part = apportion_weeks(block, fares, freq)
+        else:
+            part = booked_sums(block, fares, freq)
+        # A (station, period) present on one side only keeps its value; blank stays blank
+        running = part if running is None else running.add(part, fill_value=0)
+        n_blocks += 1
+        n_records += len(block)
+
+    if running is None or running.empty:
+        return FareCube(np.zeros((0, 0, len(fares))), [], pd.PeriodIndex([], freq=freq), fares)
+
+    period_level = running.index.get_level_values(PERIOD_COLUMN)
+    all_stations = running.index.get_level_values(STATION_COLUMN).unique().sort_values()
+    periods = pd.period_range(period_level.min(), period_level.max(), freq=freq)
+    index = pd.MultiIndex.from_product([all_stations, periods], names=[STATION_COLUMN, PERIOD_COLUMN])
+    values = (
+        running.reindex(index)
+        .fillna(0)
+        .to_numpy(dtype=float)
+        .reshape(len(all_stations), len(periods), len(fares))
+    )
+
+    if instrument.enabled():
+        instrument.note(blocks=n_blocks, records=n_records, cube_shape=list(values.shape),
+                        cube_mb=round(values.nbytes / 2**20, 2))
+    return FareCube(values, all_stations, periods, fares)
+
+
+def fare_cube_path(filepath, freq='M', split_weeks=True):
+    """Saved cubes sit in the fare cache: .fare_cache/<csv name>.cube-<freq>[-booked].npz"""
+    freq = RESAMPLE_FREQS.get(freq, freq)
+    cache_dir = fare_cache_dir(filepath)
+    suffix = '' if split_weeks else '-booked'
+    return cache_dir.with_name(f"{cache_dir.name}.cube-{freq}{suffix}.npz")
+
+
+def load_fare_cube(filepath, freq='M', split_weeks=True, chunksize=250_000):
+    """
+    The full cube (all stations, all count columns) for `filepath`, built once
+    and reloaded from the fare cache until the CSV changes
+    """
+    path = fare_cube_path(filepath, freq, split_weeks)
+    with instrument.stage('cube_check'):
+        known = None
+        if path.exists():
+            try:
+                cube, known = FareCube.load(path)
+            except (OSError, ValueError, KeyError):
+                known = None
+        current = source_fingerprint(filepath, (known or {}).get('source'))
+        # A touched-but-identical CSV still matches on its hash
+        if (known and known.get('version') == FARE_CUBE_VERSION
+                and known['source'].get('sha256') == current['sha256']):
+            return cube
+
+    cube = build_fare_cube(filepath, freq, chunksize=chunksize, split_weeks=split_weeks)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cube.save(path, version=FARE_CUBE_VERSION, source=current)
+    return cube
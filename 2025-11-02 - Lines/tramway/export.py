@@ -0,0 +1,216 @@
+"""
+Export targets for the tramway flow maps
+
+    export_figure(fig, 'out/covid.png', targets=('preview', 'png', 'svg'))
+
+writes out/covid_preview.png, out/covid.png and out/covid.svg. The tight
+bounding box is worked out once, with a layout-only draw, and handed to every
+savefig() as an explicit box. Matplotlib then rasterises each target once,
+instead of drawing the whole figure a second time just to measure it.
+
+Exports are cached under .export_cache/ next to the output. The cache key
+hashes the figure inputs, the target settings, the drawing code and the
+matplotlib version and rcParams. An unchanged figure is copied from the cache
+instead of being encoded again.
+"""
+
+import hashlib
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import matplotlib
+from matplotlib import rcParams
+
+from . import instrument
+
+HERE = Path(__file__).resolve().parent
+
+EXPORT_CACHE_DIRNAME = '.export_cache'
+EXPORT_CACHE_VERSION = 1
+FACECOLOR = '#f8f8f0'
+
+# name -> savefig settings; 'suffix' is appended to the output file's stem
+EXPORT_TARGETS = {
+    # Small, quickly encoded PNG for review and web cards
+    'preview': {'suffix': '_preview', 'format': 'png', 'dpi': 72,
+                'pil_kwargs': {'compress_level': 1}},
+    # The print-resolution PNG the script has always written
+    'png': {'suffix': '', 'format': 'png', 'dpi': 300},
+    # Vector output; fixed metadata so unchanged figures give identical bytes
+    'svg': {'suffix': '', 'format': 'svg', 'dpi': 72, 'metadata': {'Date': None}},
+    'pdf': {'suffix': '', 'format': 'pdf', 'dpi': 300, 'metadata': {'CreationDate': None}},
+    # Lossy raster at about a third of the PNG's size; method=0 is libwebp's fastest
+    'webp': {'suffix': '', 'format': 'webp', 'dpi': 200,
+             'pil_kwargs': {'quality': 85, 'method': 0}},
+}
+
+# Modules whose code decides what a flow map looks like
+DRAWING_SOURCES = ['render.py', 'flows.py', 'band_geometry.py', 'export.py']
+
+
+def target_path(output_file, target):
+    """out/covid.png + 'preview' -> out/covid_preview.png"""
+    spec = EXPORT_TARGETS[target]
+    output_file = Path(output_file)
+    return output_file.with_name(f"{output_file.stem}{spec['suffix']}.{spec['format']}")
+
+
+def check_targets(targets):
+    targets = list(targets)
+    unknown = [target for target in targets if target not in EXPORT_TARGETS]
+    if unknown:
+        raise ValueError(f"Unknown export targets {unknown}, expected some of {list(EXPORT_TARGETS)}")
+    return targets
+
+
+# ============================================================================
+# Bounding box
+# ============================================================================
+
+def tight_bbox(fig, dpi=300, pad_inches=None):
+    """
+    The box bbox_inches='tight' would crop to, in inches
+    Text is measured at `dpi` (the save resolution, as savefig does) with a
+    layout-only draw, so nothing is rasterised
+    """
+    if pad_inches is None:
+        pad_inches = rcParams['savefig.pad_inches']
+    figure_dpi = fig.dpi
+    fig.dpi = dpi
+    try:
+        fig.draw_without_rendering()
+        bbox = fig.get_tightbbox()
+    finally:
+        fig.dpi = figure_dpi
+    return bbox.padded(pad_inches)
+
+
+# ============================================================================
+# Cache keys
+# ============================================================================
+
+def _feed(h, value):
+    # Deterministic, type-tagged hashing of the nested dicts / arrays a job holds
+    if isinstance(value, dict):
+        h.update(b'd%d' % len(value))
+        for key in sorted(value, key=repr):
+            _feed(h, key)
+            _feed(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(b'l%d' % len(value))
+        for item in value:
+            _feed(h, item)
+    elif isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        h.update(f'a{array.dtype.str}{array.shape}'.encode())
+        h.update(array.tobytes())
+    elif isinstance(value, pd.Index):
+        h.update(f'i{value.dtype}'.encode())
+        _feed(h, [str(item) for item in value])
+    else:
+        h.update(f'{type(value).__name__}:{value!r};'.encode())
+
+
+@lru_cache(maxsize=None)
+def drawing_fingerprint():
+    """Drawing code + matplotlib version; fixed for the life of the process"""
+    h = hashlib.sha256(f'v{EXPORT_CACHE_VERSION} mpl{matplotlib.__version__}'.encode())
+    for name in DRAWING_SOURCES:
+        h.update((HERE / name).read_bytes())
+    return h.hexdigest()
+
+
+def figure_key(inputs, target):
+    """
+    Cache key for one target of one figure
+    inputs - everything the figure is drawn from (flows, periods, titles, timeline ...)
+    """
+    h = hashlib.sha256(drawing_fingerprint().encode())
+    # Fonts, sizes and savefig defaults all change the output; the backend does not
+    _feed(h, {key: value for key, value in rcParams.items() if not key.startswith('backend')})
+    _feed(h, inputs)
+    _feed(h, EXPORT_TARGETS[target])
+    return h.hexdigest()
+
+
+def export_cache_dir(output_file):
+    return Path(output_file).parent / EXPORT_CACHE_DIRNAME
+
+
+def cached_path(cache_dir, key, target):
+    return Path(cache_dir) / f"{key}.{EXPORT_TARGETS[target]['format']}"
+
+
+# ============================================================================
+# Export
+# ============================================================================
+
+def save_target(fig, path, target, bbox):
+    spec = {k: v for k, v in EXPORT_TARGETS[target].items() if k != 'suffix'}
+    with instrument.stage(f'export_{target}'):
+        fig.savefig(path, bbox_inches=bbox, facecolor=FACECOLOR, **spec)
+
+
+def export_figure(fig, output_file, targets=('png',), bbox=None, inputs=None, use_cache=True):
+    """
+    Write `fig` once per target; returns {target: path}
+
+    bbox   - crop box in inches (default: tight_bbox() at the highest raster dpi)
+    inputs - what the figure was drawn from; with use_cache, targets whose
+             key is already cached are copied instead of rendered
+    """
+    targets = check_targets(targets)
+    use_cache = use_cache and inputs is not None
+    cache_dir = export_cache_dir(output_file)
+
+    paths = {}
+    todo = []
+    for target in targets:
+        path = target_path(output_file, target)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        paths[target] = path
+        if use_cache:
+            cached = cached_path(cache_dir, figure_key(inputs, target), target)
+            if cached.exists():
+                shutil.copyfile(cached, path)
+                instrument.note(export_cache_hit=target)
+                continue
+        todo.append(target)
+
+    if todo and bbox is None:
+        with instrument.stage('bbox'):
+            bbox = tight_bbox(fig, max(EXPORT_TARGETS[target]['dpi'] for target in todo))
+
+    for target in todo:
+        save_target(fig, paths[target], target, bbox)
+        if use_cache:
+            cached = cached_path(cache_dir, figure_key(inputs, target), target)
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_name(cached.name + f'.{os.getpid()}.tmp')
+            shutil.copyfile(paths[target], tmp)
+            os.replace(tmp, cached)
+    return paths
+
+
+def cached_exports(output_file, targets, inputs):
+    """
+    Copy every target out of the cache and return {target: path}, or None
+    (copying nothing) unless all of them are cached
+    """
+    targets = check_targets(targets)
+    cache_dir = export_cache_dir(output_file)
+    cached = {target: cached_path(cache_dir, figure_key(inputs, target), target)
+              for target in targets}
+    if not all(path.exists() for path in cached.values()):
+        return None
+    paths = {}
+    for target, path in cached.items():
+        paths[target] = target_path(output_file, target)
+        paths[target].parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, paths[target])
+    instrument.note(export_cache_hit=targets)
+    return paths
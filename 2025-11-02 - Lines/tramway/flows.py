@@ -0,0 +1,100 @@
+"""
+Flow specs and band geometry for the flow map; NumPy only, no plotting
+"""
+
+import numpy as np
+
+from . import band_geometry
+from .ridership import station_label
+
+# ============================================================================
+# Elevation Arc Function
+# ============================================================================
+
+def get_elevation_arc(x_positions):
+    """
+    Create elevation arc mimicking tram path
+    Peak at midpoint
+    """
+    return band_geometry.elevation_arc(x_positions)
+
+# ============================================================================
+# Flows
+# ============================================================================
+
+# (resident, tourist) colours, assigned to flows top to bottom
+FLOW_COLORS = [
+    ('#554F3F', '#A99E81'),  # Charcoal gray / light gray
+    ('#4F3E36', '#9A7E71'),  # Saddle brown / tan
+    ('#3F4F55', '#819EA9'),  # Slate / mist
+    ('#4A553F', '#9AA981'),  # Moss / sage
+    ('#553F4F', '#A9819E'),  # Plum / mauve
+    ('#3F4455', '#8189A9'),  # Ink / periwinkle
+]
+
+FLOW_SPACING = 6.0    # vertical distance between flow baselines
+FLOW_BOTTOM = 2.0     # baseline of the lowest flow
+ELEVATION_SCALE = 1.5
+
+
+def flow_array(monthly, periods, light_column='Tourist'):
+    """
+    One stacked array per flow: row 0 = total ridership, row 1 = the light
+    band (tourists by default, or 'Resident'), one column per period.
+    Periods with no records are 0
+    Dense frames from dense_monthly() are used as-is; anything else with a
+    YearMonth column is reindexed onto `periods` once
+    """
+    if not monthly.index.equals(periods):
+        monthly = monthly.set_index('YearMonth').reindex(periods, fill_value=0)
+    return monthly[['Total Ridership', light_column]].to_numpy(dtype=float).T
+
+
+def make_flows(monthly_by_station, periods, labels=None, colors=None, light_column='Tourist'):
+    """
+    Flow specs for create_flow_map(), in the order the stations are given
+    (first = top band). light_column picks the fare split drawn in light tones
+    """
+    labels = labels or {}
+    colors = colors or FLOW_COLORS
+    flows = []
+    for i, (station, monthly) in enumerate(monthly_by_station.items()):
+        resident_color, tourist_color = colors[i % len(colors)]
+        flows.append({
+            'station': station,
+            'label': labels.get(station, station_label(station)),
+            'values': flow_array(monthly, periods, light_column),
+            'resident_color': resident_color,
+            'tourist_color': tourist_color,
+        })
+    return flows
+
+
+def flow_geometry(flows, x_positions):
+    """
+    Band geometry for every flow: baseline, half-thickness and both outlines
+    All flows share one absolute thickness scale (see band_geometry)
+    """
+    n_flows = len(flows)
+    y_bases = [FLOW_BOTTOM + FLOW_SPACING * (n_flows - 1 - i) for i in range(n_flows)]
+    values = np.array([flow['values'] for flow in flows]).reshape(n_flows, 2, len(x_positions))
+    bands = band_geometry.flow_bands(values, x_positions, y_bases, ELEVATION_SCALE)
+    
+    geometry = [
+        {
+            'y_center': bands['y_centers'][i],
+            'half_thickness': bands['half_thickness'][i],
+            'resident': bands['resident'][i],
+            'tourist': bands['tourist'][i],
+        }
+        for i in range(n_flows)
+    ]
+    return geometry, bands['max_ridership']
+
+
+def month_label_stride(n_periods):
+    """Label every stride-th month so labels never crowd; 24 months -> every other"""
+    for stride in [1, 2, 3, 4, 6, 12]:
+        if n_periods <= 12 * stride:
+            return stride
+    return 12
@@ -0,0 +1,276 @@
+"""
+Stage timing report for the tramway flow map pipeline
+
+Code marks its stages with `stage()` (a context manager or decorator) and
+records diagnostics with `note()`. Both are no-ops until a report is
+configured, either from the environment or by the caller:
+
+    TRAMWAY_PROFILE=timers            wall time + process memory high-water mark
+    TRAMWAY_PROFILE=timers,memory     + peak Python allocations per stage (tracemalloc)
+    TRAMWAY_PROFILE=all               + one cProfile dump per top-level stage
+    TRAMWAY_PROFILE_DIR=tramway_profile  where report.json and the .prof files go
+
+Nested stages are reported by path ('read/csv_parse'); repeated stages add up.
+The report is written as JSON when the process exits, or via write_report().
+"""
+
+import atexit
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import warnings
+from contextlib import ContextDecorator
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_ENV = 'TRAMWAY_PROFILE'
+PROFILE_DIR_ENV = 'TRAMWAY_PROFILE_DIR'
+DEFAULT_PROFILE_DIR = 'tramway_profile'
+REPORT_NAME = 'report.json'
+REPORT_VERSION = 1
+
+MODES = ('timers', 'memory', 'cprofile')
+MODE_ALIASES = {
+    '1': ('timers',),
+    'on': ('timers',),
+    'true': ('timers',),
+    'all': MODES,
+}
+
+
+def parse_modes(text, strict=True):
+    """
+    'timers,cprofile' -> ('timers', 'cprofile'); every mode implies timers
+    Unknown modes raise, or only warn and are skipped when strict is False
+    """
+    modes = set()
+    for part in (text or '').lower().replace(' ', '').split(','):
+        if not part or part in ('0', 'off', 'false'):
+            continue
+        if part in MODE_ALIASES:
+            modes.update(MODE_ALIASES[part])
+        elif part in MODES:
+            modes.add(part)
+        else:
+            message = f"Unknown profile mode {part!r}, expected one of {', '.join(MODES)}"
+            if strict:
+                raise ValueError(message)
+            warnings.warn(f"{message}; ignoring it", RuntimeWarning, stacklevel=2)
+    if modes:
+        modes.add('timers')
+    return tuple(mode for mode in MODES if mode in modes)
+
+
+def rss_peak_mb():
+    """Process memory high-water mark in MB; None where the resource module is missing"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _json_default(value):
+    # NumPy scalars and pandas Periods / Timestamps show up in notes
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+# ============================================================================
+# Report
+# ============================================================================
+
+class StageReport:
+    """Collects per-stage timings, memory and notes for one process"""
+
+    def __init__(self, modes=(), output_dir=DEFAULT_PROFILE_DIR):
+        self.modes = tuple(modes)
+        self.output_dir = Path(output_dir)
+        self.started = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self._stack = []
+        self._stages = {}
+        self._profiles = {}
+        self._notes = []
+        self._dirty = False
+        if 'memory' in self.modes and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @property
+    def enabled(self):
+        return bool(self.modes)
+
+    def _enter(self, name):
+        path = '/'.join([frame['path'] for frame in self._stack[-1:]] + [name])
+        frame = {'path': path, 'rss_start': rss_peak_mb(), 'py_peak': 0}
+        if 'memory' in self.modes:
+            if self._stack:
+                parent = self._stack[-1]
+                parent['py_peak'] = max(parent['py_peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        if 'cprofile' in self.modes and not self._stack:
+            # cProfile cannot nest, so only top-level stages get their own dump
+            frame['profile'] = self._profiles.setdefault(path, cProfile.Profile())
+            frame['profile'].enable()
+        # Created on entry so the report lists stages in the order they start
+        self._stages.setdefault(path, {
+            'stage': path,
+            'calls': 0,
+            'seconds': 0.0,
+            'rss_peak_mb': 0.0,
+            'rss_growth_mb': 0.0,
+        })
+        self._stack.append(frame)
+        frame['t0'] = time.perf_counter()
+
+    def _exit(self):
+        frame = self._stack.pop()
+        elapsed = time.perf_counter() - frame['t0']
+        if 'profile' in frame:
+            frame['profile'].disable()
+        rss_end = rss_peak_mb()
+
+        entry = self._stages[frame['path']]
+        entry['calls'] += 1
+        entry['seconds'] += elapsed
+        if rss_end is None:
+            entry['rss_peak_mb'] = entry['rss_growth_mb'] = None
+        else:
+            entry['rss_peak_mb'] = max(entry['rss_peak_mb'], rss_end)
+            entry['rss_growth_mb'] += rss_end - frame['rss_start']
+        if 'memory' in self.modes:
+            py_peak = max(frame['py_peak'], tracemalloc.get_traced_memory()[1])
+            entry['py_peak_mb'] = max(entry.get('py_peak_mb', 0.0), py_peak / (1024 * 1024))
+            if self._stack:
+                parent = self._stack[-1]
+                parent['py_peak'] = max(parent['py_peak'], py_peak)
+        self._dirty = True
+
+    def note(self, **fields):
+        """Record diagnostics against the current stage"""
+        stage = self._stack[-1]['path'] if self._stack else None
+        self._notes.append(dict(stage=stage, **fields))
+        self._dirty = True
+
+    def to_dict(self):
+        stages = []
+        for path, entry in self._stages.items():
+            if not entry['calls']:
+                continue  # still running
+            entry = dict(entry, mean_seconds=entry['seconds'] / entry['calls'])
+            if path in self._profiles:
+                entry['profile'] = self.profile_path(path).name
+            stages.append(entry)
+        return {
+            'version': REPORT_VERSION,
+            'modes': list(self.modes),
+            'started': self.started.isoformat(timespec='seconds'),
+            'wall_seconds': time.perf_counter() - self._t0,
+            'rss_peak_mb': rss_peak_mb(),
+            'python': platform.python_version(),
+            'argv': sys.argv,
+            'stages': stages,
+            'notes': self._notes,
+        }
+
+    def profile_path(self, path):
+        return self.output_dir / f"{path.replace('/', '.')}.prof"
+
+    def write(self, path=None):
+        """Write report.json (and any cProfile dumps); returns the report path"""
+        path = Path(path) if path is not None else self.output_dir / REPORT_NAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for stage_path, profile in self._profiles.items():
+            self.profile_path(stage_path).parent.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(self.profile_path(stage_path))
+        path.write_text(json.dumps(self.to_dict(), indent=2, default=_json_default) + '\n',
+                        encoding='utf-8')
+        self._dirty = False
+        return path
+
+
+_report = StageReport()
+
+
+class stage(ContextDecorator):
+    """
+    Time a block (`with stage('savefig'):`) or a whole function (`@stage('template')`)
+    Looks up the active report on entry, so decorators applied at import time
+    follow a later configure()
+    """
+
+    def __init__(self, name):
+        self.name = name
+        # One entry per active (possibly recursive) use: the report to close, if any
+        self._open = []
+
+    def __enter__(self):
+        report = _report if _report.enabled else None
+        if report is not None:
+            report._enter(self.name)
+        self._open.append(report)
+        return self
+
+    def __exit__(self, *exc):
+        report = self._open.pop()
+        if report is not None:
+            report._exit()
+        return False
+
+
+def note(**fields):
+    if _report.enabled:
+        _report.note(**fields)
+
+
+def enabled():
+    return _report.enabled
+
+
+def current():
+    return _report
+
+
+def configure(modes, output_dir=None, strict=True):
+    """
+    Start a fresh report; modes is a tuple or a TRAMWAY_PROFILE style string
+    An empty mode list switches instrumentation off again
+    """
+    global _report
+    if isinstance(modes, str):
+        modes = parse_modes(modes, strict)
+    if output_dir is None:
+        output_dir = os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR)
+    _report = StageReport(modes, output_dir)
+    return _report
+
+
+def configure_from_env():
+    # Runs at import time: a typo in the diagnostics switch must not stop `import tramway`
+    return configure(os.environ.get(PROFILE_ENV, ''), strict=False)
+
+
+def write_report(path=None):
+    """Write the active report now; returns its path, or None when disabled"""
+    if not _report.enabled:
+        return None
+    return _report.write(path)
+
+
+@atexit.register
+def _write_at_exit():
+    if _report.enabled and _report._dirty:
+        _report.write()
+
+
+configure_from_env()
@@ -0,0 +1,358 @@
+"""
+MetroCard fare history loader
+
+Reads only the requested columns, stations and dates from the CSV, or from
+a year / station partitioned Parquet cache kept next to it.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+
+# ============================================================================
+# Fare CSV Loader (column selection + filter pushdown)
+# ============================================================================
+
+# The MetroCard history export writes dates like 7/31/21 and counts like "8,976"
+FARE_DATE_FORMAT = '%m/%d/%y'
+# One resolution for parsed dates, whichever path (CSV or cache) produced them
+FARE_DATE_DTYPE = 'datetime64[ns]'
+FARE_DATE_COLUMNS = ['From Date', 'To Date']
+FARE_TEXT_COLUMNS = ['Remote Station ID', 'Station']
+FARE_CALENDAR_COLUMNS = ['month', 'year']
+# Per-row ratios; every other numeric column is a rider count and can be summed
+FARE_RATIO_COLUMNS = ['% of Non-Full Fare']
+
+TRAM_STATIONS = ['R468', 'R469']  # R468 = Manhattan→Island, R469 = Island→Manhattan
+
+
+def read_fare_header(filepath):
+    """Column names only, without reading any rows"""
+    return list(pd.read_csv(filepath, nrows=0, encoding='utf-8-sig').columns)
+
+
+def fare_dtypes(header):
+    """
+    Explicit dtype for every column so pandas never falls back to object
+    Fare counts are float64: newer fare types are blank for older weeks
+    """
+    dtypes = {}
+    for col in header:
+        if col in FARE_DATE_COLUMNS or col in FARE_TEXT_COLUMNS:
+            dtypes[col] = str
+        elif col in FARE_CALENDAR_COLUMNS:
+            dtypes[col] = 'Int16'
+        else:
+            dtypes[col] = 'float64'
+    return dtypes
+
+
+def fare_count_columns(header):
+    """The summable rider-count columns of a header, in file order"""
+    skip = set(FARE_DATE_COLUMNS + FARE_TEXT_COLUMNS + FARE_CALENDAR_COLUMNS + FARE_RATIO_COLUMNS)
+    return [col for col in header if col not in skip]
+
+
+def filter_fare_rows(df, start=None, end=None, stations=None):
+    """
+    Apply station and date-range predicates to one parsed block
+    Stations are matched first so dates are only parsed for surviving rows
+    """
+    if stations is not None:
+        df = df[df['Remote Station ID'].isin(stations)]
+
+    with instrument.stage('date_parse'):
+        df = df.assign(**{
+            col: pd.to_datetime(df[col], format=FARE_DATE_FORMAT).astype(FARE_DATE_DTYPE)
+            for col in FARE_DATE_COLUMNS if col in df.columns
+        })
+
+    if start is not None:
+        df = df[df['From Date'] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df['From Date'] <= pd.Timestamp(end)]
+    return df
+
+
+def fare_usecols(filepath, columns=None):
+    """Header columns to read for `columns`, plus the ones the filters need"""
+    header = read_fare_header(filepath)
+    if columns is None:
+        usecols = header
+    else:
+        missing = [col for col in columns if col not in header]
+        if missing:
+            raise ValueError(f"Columns not in {filepath}: {missing}")
+        keep = set(['From Date', 'Remote Station ID'] + list(columns))
+        usecols = [col for col in header if col in keep]
+    return usecols
+
+
+def read_fare_csv(filepath, usecols, chunksize=None):
+    return pd.read_csv(
+        filepath,
+        encoding='utf-8-sig',
+        usecols=usecols,
+        dtype=fare_dtypes(usecols),
+        thousands=',',
+        chunksize=chunksize,
+    )
+
+
+def iter_fare_data(filepath, columns=None, start=None, end=None, stations=None,
+                   chunksize=250_000):
+    """
+    Stream the fare CSV as filtered blocks of at most `chunksize` rows
+    Same arguments as load_fare_data(); only one block is in memory at a time
+    """
+    usecols = fare_usecols(filepath, columns)
+    if stations is not None:
+        stations = list(stations)
+    with read_fare_csv(filepath, usecols, chunksize) as reader:
+        for chunk in reader:
+            yield filter_fare_rows(chunk, start, end, stations)[usecols]
+
+
+@instrument.stage('csv_parse')
+def load_fare_data(filepath, columns=None, start=None, end=None, stations=None,
+                   chunksize=None):
+    """
+    Load the MetroCard fare CSV with only the rows and columns you ask for
+
+    columns   - fare/count columns to keep (None = all). From Date and
+                Remote Station ID are always read because the filters need them
+    start/end - inclusive From Date range, anything pd.Timestamp accepts
+    stations  - Remote Station IDs to keep (None = all stations)
+    chunksize - parse in blocks of this many rows, filtering each block before
+                the next is read, so the full history never sits in memory
+    """
+    usecols = fare_usecols(filepath, columns)
+    if chunksize is None:
+        stations = list(stations) if stations is not None else None
+        df = filter_fare_rows(read_fare_csv(filepath, usecols), start, end, stations)
+    else:
+        blocks = list(iter_fare_data(filepath, columns, start, end, stations, chunksize))
+        if not blocks:
+            # A header-only file yields no chunks at all; keep the columns and dtypes
+            blocks = [filter_fare_rows(pd.DataFrame(columns=usecols).astype(fare_dtypes(usecols)))]
+        df = pd.concat(blocks)
+
+    return df[usecols].reset_index(drop=True)
+
+
+# ============================================================================
+# Parquet Cache of the Cleaned Fare Table
+# ============================================================================
+
+# Bump when the cleaned table's layout changes so old caches are rebuilt
+FARE_CACHE_VERSION = 2
+FARE_CACHE_DIRNAME = '.fare_cache'
+FARE_ROW_COLUMN = '__row'
+# Partition key: the year of From Date, so a blank 'year' cell cannot misplace a row
+FARE_YEAR_PARTITION = '__year'
+
+
+def fare_cache_dir(filepath):
+    """Cache lives next to the CSV: .fare_cache/<csv name>/"""
+    filepath = Path(filepath)
+    return filepath.parent / FARE_CACHE_DIRNAME / filepath.name
+
+
+def sha256_file(filepath, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_fingerprint(filepath, known=None):
+    """
+    Size, mtime and SHA-256 of the source CSV
+    The hash is only recomputed when size or mtime differ from `known`
+    """
+    stat = os.stat(filepath)
+    fingerprint = {
+        'version': FARE_CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+    if known and all(known.get(k) == v for k, v in fingerprint.items()):
+        fingerprint['sha256'] = known['sha256']
+    else:
+        fingerprint['sha256'] = sha256_file(filepath)
+    return fingerprint
+
+
+def read_cache_fingerprint(cache_dir):
+    try:
+        with open(cache_dir / 'fingerprint.json', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache_fingerprint(cache_dir, fingerprint):
+    tmp_path = cache_dir / 'fingerprint.json.tmp'
+    tmp_path.write_text(json.dumps(fingerprint, indent=2) + '\n', encoding='utf-8')
+    os.replace(tmp_path, cache_dir / 'fingerprint.json')
+
+
+def fare_partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    # Explicit types so partition keys round-trip as Int16 / str, not dictionaries
+    schema = pa.schema([(FARE_YEAR_PARTITION, pa.int16()), ('Remote Station ID', pa.string())])
+    return ds.partitioning(schema, flavor='hive')
+
+
+@instrument.stage('cache_build')
+def build_fare_cache(filepath, cache_dir, fingerprint, chunksize=250_000):
+    """
+    Clean the whole CSV once and write it as a year / station partitioned
+    Parquet dataset. Built in a sibling temp dir and swapped in at the end
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    df = load_fare_data(filepath, chunksize=chunksize)
+    columns = list(df.columns)
+    df[FARE_YEAR_PARTITION] = df['From Date'].dt.year.astype('Int16')
+    # Remember CSV order so cached reads come back exactly as the CSV loader returns them
+    df[FARE_ROW_COLUMN] = np.arange(len(df), dtype='int64')
+
+    tmp_dir = cache_dir.with_name(cache_dir.name + '.tmp')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        tmp_dir / 'data',
+        format='parquet',
+        partitioning=fare_partitioning(),
+    )
+    write_cache_fingerprint(tmp_dir, dict(fingerprint, columns=columns))
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+
+def ensure_fare_cache(filepath, cache_dir=None):
+    """
+    Return the cache dir for `filepath`, (re)building it when the source changed
+    A touched-but-identical CSV only costs one hash, not a rebuild
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else fare_cache_dir(filepath)
+    known = read_cache_fingerprint(cache_dir)
+    current = source_fingerprint(filepath, known)
+
+    if known and known.get('sha256') == current['sha256'] and known.get('version') == current['version']:
+        if known.get('mtime_ns') != current['mtime_ns'] or known.get('size') != current['size']:
+            write_cache_fingerprint(cache_dir, dict(known, **current))
+        return cache_dir
+
+    cache_dir.parent.mkdir(parents=True, exist_ok=True)
+    build_fare_cache(filepath, cache_dir, current)
+    return cache_dir
+
+
+def hive_partitions(directory, key):
+    """{value: path} for the `key=value` subdirectories of `directory`"""
+    from urllib.parse import unquote
+
+    partitions = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            name, sep, value = entry.name.partition('=')
+            if entry.is_dir() and sep and name == key:
+                partitions[unquote(value)] = Path(entry.path)
+    return partitions
+
+
+def fare_partition_files(data_dir, start=None, end=None, stations=None):
+    """
+    Parquet files of the year / station partitions that can match the query
+    Picked by directory name, so untouched partitions are never even opened
+    """
+    files = []
+    for year, year_dir in sorted(hive_partitions(data_dir, FARE_YEAR_PARTITION).items()):
+        if not year.isdigit():
+            # Rows without a From Date (pyarrow's default partition) never match a date range
+            if start is not None or end is not None:
+                continue
+        elif start is not None and int(year) < start.year:
+            continue
+        elif end is not None and int(year) > end.year:
+            continue
+        station_dirs = hive_partitions(year_dir, 'Remote Station ID')
+        if stations is not None:
+            station_dirs = {k: v for k, v in station_dirs.items() if k in stations}
+        for station_dir in station_dirs.values():
+            files.extend(str(p) for p in station_dir.glob('*.parquet'))
+    return sorted(files)
+
+
+def load_fare_data_cached(filepath, columns=None, start=None, end=None, stations=None,
+                          cache_dir=None):
+    """
+    Same arguments and result as load_fare_data(), served from the Parquet cache
+    Only the year / station partitions that can match are opened (memory-mapped)
+    Falls back to parsing the CSV when pyarrow is not installed
+    """
+    try:
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+    except ImportError:
+        return load_fare_data(filepath, columns, start, end, stations)
+
+    with instrument.stage('cache_check'):
+        cache_dir = ensure_fare_cache(filepath, cache_dir)
+    header = read_cache_fingerprint(cache_dir)['columns']
+    if columns is None:
+        usecols = header
+    else:
+        missing = [col for col in columns if col not in header]
+        if missing:
+            raise ValueError(f"Columns not in {filepath}: {missing}")
+        keep = set(['From Date', 'Remote Station ID'] + list(columns))
+        usecols = [col for col in header if col in keep]
+
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    stations = set(stations) if stations is not None else None
+
+    data_dir = cache_dir / 'data'
+    files = fare_partition_files(data_dir, start, end, stations)
+    dtypes = fare_dtypes(usecols)
+    for col in FARE_DATE_COLUMNS:
+        if col in dtypes:
+            dtypes[col] = FARE_DATE_DTYPE
+    if not files:
+        return pd.DataFrame(columns=usecols).astype(dtypes)
+
+    with instrument.stage('cache_read'):
+        dataset = ds.dataset(
+            files,
+            format='parquet',
+            partitioning=fare_partitioning(),
+            partition_base_dir=str(data_dir),
+            filesystem=fs.LocalFileSystem(use_mmap=True),
+        )
+        # Partitions are already pruned; only the From Date range needs a row filter
+        row_filter = None
+        if start is not None:
+            row_filter = ds.field('From Date') >= start.to_datetime64()
+        if end is not None:
+            upper = ds.field('From Date') <= end.to_datetime64()
+            row_filter = upper if row_filter is None else row_filter & upper
+
+        table = dataset.to_table(columns=usecols + [FARE_ROW_COLUMN], filter=row_filter)
+        df = table.to_pandas().sort_values(FARE_ROW_COLUMN)
+        instrument.note(partition_files=len(files), rows=len(df))
+        return df[usecols].astype(dtypes).reset_index(drop=True)
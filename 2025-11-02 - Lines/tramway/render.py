@@ -0,0 +1,377 @@
+"""
+Minard-style flow map rendering
+
+The only module here that imports matplotlib (pyplot only when a figure is
+meant for the screen); every figure is drawn and saved under FLOW_MAP_STYLE.
+"""
+
+import warnings
+
+import matplotlib
+import numpy as np
+from matplotlib.patches import Polygon, Rectangle
+
+from . import export, instrument
+from .flows import FLOW_BOTTOM, FLOW_SPACING, flow_geometry, make_flows, month_label_stride
+from .ridership import COVID_PERIODS
+from .timeline import COVID_KEY_EVENTS, COVID_KEY_PERIODS, COVID_TIMELINE_CAPTIONS, get_covid_timeline
+
+# ============================================================================
+# Style
+# ============================================================================
+
+# Applied around every draw and save instead of being set globally at import
+FLOW_MAP_STYLE = {
+    'font.family': 'serif',
+    'font.serif': ['Georgia', 'Times New Roman', 'Palatino', 'DejaVu Serif'],
+    'figure.dpi': 150,
+}
+
+
+def flow_map_style():
+    """rcParams for flow maps, as a context manager or decorator"""
+    return matplotlib.rc_context(FLOW_MAP_STYLE)
+
+@instrument.stage('layout')
+def layout_flow_map(fig):
+    """tight_layout() leaving room for the credit below and the title above"""
+    with warnings.catch_warnings():
+        # The axis-less flow and timeline panels still lay out as intended
+        warnings.filterwarnings('ignore', message='This figure includes Axes that are not compatible',
+                                category=UserWarning)
+        fig.tight_layout(rect=[0, 0.02, 1, 0.94])
+
+# ============================================================================
+# Create Flow Map
+# ============================================================================
+
+@flow_map_style()
+@instrument.stage('template')
+def draw_flow_template(periods, n_flows,
+                       timeline=None,
+                       timeline_events=None,
+                       timeline_captions=None,
+                       timeline_title='NYC COVID-19 Timeline & Interventions',
+                       use_pyplot=True):
+    """
+    Everything on a flow map that does not depend on the ridership values:
+    figure, gridspec, year / month labels, the timeline strip and the credit
+    Returns a template dict that draw_flow_layers() fills in
+    use_pyplot=False builds a bare Figure that pyplot never tracks (batch jobs)
+    """
+    
+    n_periods = len(periods)
+    if n_periods == 0:
+        raise ValueError("create_flow_map() needs at least one period")
+    
+    # Create figure: the flow panel grows with the number of flows
+    flow_rows = max(n_flows, 2) / 2
+    if timeline is not None:
+        figsize = (24, 11 + 5.5 * (flow_rows - 1))
+    else:
+        figsize = (24, 8 * flow_rows)
+    if use_pyplot:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=figsize, facecolor='#f8f8f0')
+    else:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=figsize, facecolor='#f8f8f0')
+    
+    if timeline is not None:
+        gs = fig.add_gridspec(3, 1, height_ratios=[5 * flow_rows, 0.2, 2], hspace=0.25)
+        ax_flow = fig.add_subplot(gs[0])
+        ax_covid = fig.add_subplot(gs[2])
+    else:
+        ax_flow = fig.add_subplot(1, 1, 1)
+        ax_covid = None
+    
+    ax_flow.set_facecolor('#f8f8f0')
+    
+    # X positions, one per period
+    x_positions = np.arange(1, n_periods + 1)
+    position = {period: i for i, period in enumerate(periods)}
+    
+    # ========================================================================
+    # X-Axis: Year labels with alternating months
+    # ========================================================================
+    
+    # Year labels - centered over their months, with a subtle separator below
+    years = {}
+    for i, period in enumerate(periods):
+        years.setdefault(period.year, []).append(x_positions[i])
+    for year, xs in years.items():
+        ax_flow.text((xs[0] + xs[-1]) / 2, -0.3, str(year), ha='center', va='top',
+                    fontsize=12, fontweight='bold', color='#2c3e50')
+        ax_flow.plot([xs[0], xs[-1]], [-0.6, -0.6], color='#2c3e50', linewidth=1, alpha=0.3)
+    
+    # Month labels (Jan, Mar, May, ... for two years; sparser for longer ranges)
+    if periods.freqstr.startswith('M'):
+        stride = month_label_stride(n_periods)
+        for i, period in enumerate(periods):
+            if (period.month - 1) % stride == 0:
+                ax_flow.text(x_positions[i], -0.9, period.strftime('%b'), ha='center', va='top',
+                            fontsize=10, fontweight='normal', color='#2c3e50')
+    
+    # ========================================================================
+    # Styling
+    # ========================================================================
+    
+    y_top = FLOW_BOTTOM + FLOW_SPACING * (max(n_flows, 1) - 1) + 4.5
+    ax_flow.set_xlim(0, n_periods + 1)
+    ax_flow.set_ylim(-1.5, y_top)  # Extended bottom margin for the x-axis layout
+    ax_flow.set_aspect('auto')
+    ax_flow.axis('off')
+    
+    # ========================================================================
+    # TIMELINE (Bottom)
+    # ========================================================================
+    
+    if ax_covid is not None:
+        ax_covid.set_facecolor('#f8f8f0')
+        
+        # Draw timeline bars
+        for i, period in enumerate(periods):
+            if period in timeline:
+                label, event, color = timeline[period]
+            else:
+                color = '#E8E8E8'  # Default gray
+                event = ""
+            
+            # Draw colored bar for this period
+            bar = Rectangle((x_positions[i] - 0.4, 0), 0.8, 1,
+                           facecolor=color, edgecolor='white', linewidth=1)
+            ax_covid.add_patch(bar)
+        
+        # Add key event labels
+        for period in (timeline_events if timeline_events is not None else timeline):
+            if period in timeline and period in position:
+                label, event, color = timeline[period]
+                ax_covid.text(x_positions[position[period]], 1.3, event, ha='center', va='bottom',
+                             fontsize=9, fontweight='bold', rotation=0,
+                             color='#2c3e50')
+        
+        # Timeline captions
+        for period, text, color in timeline_captions or []:
+            if period in position:
+                ax_covid.text(x_positions[position[period]], -0.5, text, ha='center', fontsize=13,
+                             fontweight='bold', color=color)
+        
+        # Styling
+        ax_covid.set_xlim(0, n_periods + 1)
+        ax_covid.set_ylim(-1, 2)
+        ax_covid.set_aspect('auto')
+        ax_covid.axis('off')
+        
+        if timeline_title:
+            ax_covid.set_title(timeline_title,
+                              fontsize=13, fontweight='bold', color='#2c3e50', pad=15)
+    
+    # ========================================================================
+    # Credit
+    # ========================================================================
+    
+    credit = '#30DayMapChallenge 2025 | Flow Lines\nData: MTA NYCT MetroCard History | Inspired by Charles Minard, 1869'
+    fig.text(0.5, 0.01, credit, ha='center', fontsize=8,
+            color='#7f8c8d', style='italic')
+    
+    return {
+        'fig': fig,
+        'ax_flow': ax_flow,
+        'ax_timeline': ax_covid,
+        'periods': periods,
+        'n_flows': n_flows,
+        'x_positions': x_positions,
+        'position': position,
+        'y_top': y_top,
+    }
+
+
+@flow_map_style()
+@instrument.stage('layers')
+def draw_flow_layers(template, flows,
+                     title=None,
+                     subtitle='Line thickness = ridership per period  |  Light tones = tourists',
+                     key_periods=None):
+    """
+    The value-dependent part of a flow map: band polygons, key annotations,
+    title and subtitle. Returns the artists it added so a batch renderer can
+    remove them and reuse the template for the next figure
+    """
+    
+    fig = template['fig']
+    ax_flow = template['ax_flow']
+    periods = template['periods']
+    x_positions = template['x_positions']
+    position = template['position']
+    n_periods = len(periods)
+    n_flows = len(flows)
+    if n_flows != template['n_flows']:
+        raise ValueError(f"Template is laid out for {template['n_flows']} flows, got {n_flows}")
+    
+    with instrument.stage('geometry'):
+        geometry, max_ridership = flow_geometry(flows, x_positions)
+    artists = []
+    
+    if instrument.enabled():
+        # One absolute scale shared by every flow
+        instrument.note(
+            max_ridership=max_ridership,
+            ridership_range={flow['label']: [flow['values'][0].min(), flow['values'][0].max()]
+                             for flow in flows},
+        )
+    
+    # ========================================================================
+    # Flows (top to bottom)
+    # ========================================================================
+    
+    for flow, geom in zip(flows, geometry):
+        resident_polygon = Polygon(
+            geom['resident'],
+            facecolor=flow['resident_color'],
+            edgecolor='white',
+            linewidth=1.5,
+            alpha=0.9,
+            zorder=10
+        )
+        ax_flow.add_patch(resident_polygon)
+        
+        tourist_polygon = Polygon(
+            geom['tourist'],
+            facecolor=flow['tourist_color'],
+            edgecolor=None,
+            alpha=0.95,
+            zorder=11
+        )
+        ax_flow.add_patch(tourist_polygon)
+        artists += [resident_polygon, tourist_polygon]
+    
+    # Add key ridership annotations: above the top flows, below the lowest one
+    if key_periods is None:
+        key_indices = range(2, n_periods, max(4, n_periods // 12))
+    else:
+        key_indices = [position[p] for p in key_periods if p in position]
+    
+    for idx in key_indices:
+        x = x_positions[idx]
+        for i, (flow, geom) in enumerate(zip(flows, geometry)):
+            value = flow['values'][0][idx]
+            if value <= 0:
+                continue
+            if i == n_flows - 1 and n_flows > 1:
+                y = geom['y_center'][idx] - geom['half_thickness'][idx]
+                artists.append(ax_flow.text(x, y - 0.5, f'{value:,.0f}',
+                            ha='center', va='top', fontsize=12,
+                            fontweight='bold', color=flow['resident_color']))
+            else:
+                y = geom['y_center'][idx] + geom['half_thickness'][idx]
+                artists.append(ax_flow.text(x, y + 0.5, f'{value:,.0f}',
+                            ha='center', va='bottom', fontsize=12,
+                            fontweight='bold', color=flow['resident_color']))
+    
+    # ========================================================================
+    # Title
+    # ========================================================================
+    
+    if title is None:
+        title = f"Ridership Flows\n{periods[0].strftime('%b %Y')} – {periods[-1].strftime('%b %Y')}"
+    # suptitle() reuses the figure's one title, so an empty string clears it
+    fig.suptitle(title, fontsize=22, fontweight='bold', color='#2c3e50', y=0.96)
+    
+    if subtitle:
+        artists.append(ax_flow.text((n_periods + 1) / 2, template['y_top'] - 0.3, subtitle,
+                                    ha='center', fontsize=10, color='#7f8c8d', style='italic'))
+    
+    return artists
+
+
+@flow_map_style()
+def create_flow_map(flows, periods,
+                    title=None,
+                    subtitle='Line thickness = ridership per period  |  Light tones = tourists',
+                    key_periods=None,
+                    timeline=None,
+                    timeline_events=None,
+                    timeline_captions=None,
+                    timeline_title='NYC COVID-19 Timeline & Interventions',
+                    output_file=None,
+                    targets=('png',),
+                    use_cache=True,
+                    draw_cached=False):
+    """
+    Minard-style flow map for any number of flows over any period range
+    
+    flows    - from make_flows(); each has a (2, n_periods) 'values' array
+    periods  - PeriodIndex the flow columns line up with (x = 1..n)
+    key_periods - periods whose totals are written on the flows
+                  (default: every 4th period from the third, sparser for long ranges)
+    timeline - {Period: (label, event, colour)} drawn as a bar strip below;
+               None leaves the strip out. timeline_events get a text label,
+               timeline_captions are (Period, text, colour) under the strip
+    output_file - base name of the exports; targets picks them from
+                  export.EXPORT_TARGETS ('preview', 'png', 'svg', 'pdf', 'webp')
+    use_cache   - copy unchanged exports from .export_cache/ next to output_file;
+                  when every target is cached nothing is drawn and None is
+                  returned, unless draw_cached asks for the figure anyway
+    """
+    
+    inputs = dict(flows=flows, periods=periods, title=title, subtitle=subtitle,
+                  key_periods=key_periods, timeline=timeline,
+                  timeline_events=timeline_events, timeline_captions=timeline_captions,
+                  timeline_title=timeline_title)
+    if output_file and use_cache and not draw_cached:
+        paths = export.cached_exports(output_file, targets, inputs)
+        if paths is not None:
+            for path in paths.values():
+                print(f"\n✅ Flow map saved as {path}")
+            return None
+    
+    template = draw_flow_template(periods, len(flows),
+                                  timeline=timeline,
+                                  timeline_events=timeline_events,
+                                  timeline_captions=timeline_captions,
+                                  timeline_title=timeline_title)
+    draw_flow_layers(template, flows, title=title, subtitle=subtitle, key_periods=key_periods)
+    fig = template['fig']
+    
+    # ========================================================================
+    # Save
+    # ========================================================================
+    
+    layout_flow_map(fig)
+    if output_file:
+        with instrument.stage('export'):
+            paths = export.export_figure(fig, output_file, targets,
+                                         inputs=inputs, use_cache=use_cache)
+        for path in paths.values():
+            print(f"\n✅ Flow map saved as {path}")
+    
+    return fig
+
+# ============================================================================
+# Create COVID Impact Flow Map
+# ============================================================================
+
+def create_covid_impact_map(manhattan_to_island, island_to_manhattan, 
+                            output_file='roosevelt_tramway_covid_impact.png',
+                            targets=('png',), use_cache=True, draw_cached=False):
+    """
+    Create Minard-style map showing COVID-19 impact on ridership
+    Manhattan → Roosevelt Island on top, the return trip below
+    (None instead of the figure when every export came from the cache)
+    """
+    flows = make_flows({'R468': manhattan_to_island, 'R469': island_to_manhattan}, COVID_PERIODS)
+    
+    return create_flow_map(
+        flows,
+        COVID_PERIODS,
+        title='Roosevelt Island Tramway\nThe COVID-19 Impact on Ridership  2019-2020',
+        subtitle='Watch ridership collapse in March 2020  |  Line thickness = monthly ridership  |  Light tones = tourists',
+        key_periods=COVID_KEY_PERIODS,
+        timeline=get_covid_timeline(),
+        timeline_events=COVID_KEY_EVENTS,
+        timeline_captions=COVID_TIMELINE_CAPTIONS,
+        output_file=output_file,
+        targets=targets,
+        use_cache=use_cache,
+        draw_cached=draw_cached,
+    )
@@ -0,0 +1,117 @@
+"""
+Weekly fare records resampled onto calendar periods
+
+Each record covers From Date..To Date (both inclusive, normally a Saturday to
+Friday week). A week that straddles a month, quarter or year boundary is
+split between the periods by the fraction of its days that fall in each, so
+period totals are exact rather than depending on which day the week started.
+The whole table is handled in one vectorized pass: records are repeated once
+per period they touch and weighted, then summed in a single groupby.
+"""
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+
+# pandas period aliases accepted for the output
+RESAMPLE_FREQS = {'M': 'M', 'Q': 'Q-DEC', 'Y': 'Y-DEC'}
+
+# Calendar frequencies as whole months; their Period ordinals count these from 1970-01
+CALENDAR_MONTHS = {'M': 1, 'Q-DEC': 3, 'Y-DEC': 12}
+
+STATION_COLUMN = 'Remote Station ID'
+PERIOD_COLUMN = 'Period'
+
+
+def record_spans(fare_df, start='From Date', end='To Date'):
+    """
+    First and last day of every record as datetime64[D] arrays
+    A missing end is taken as the start day; a few exports have the two
+    dates swapped (To Date before From Date), which is read as the same span
+    """
+    first = fare_df[start].to_numpy(dtype='datetime64[D]')
+    last = fare_df[end].to_numpy(dtype='datetime64[D]') if end in fare_df else first.copy()
+    last = np.where(np.isnat(last), first, last)
+    return np.minimum(first, last), np.maximum(first, last)
+
+
+def period_ordinals(days, freq):
+    """Period ordinals of datetime64[D] days; plain month arithmetic for M / Q / Y"""
+    if freq in CALENDAR_MONTHS:
+        return days.astype('datetime64[M]').astype(np.int64) // CALENDAR_MONTHS[freq]
+    return pd.PeriodIndex(days, freq=freq).asi8
+
+
+def period_bounds(ordinal, freq):
+    """First and last day (datetime64[D]) of each period ordinal"""
+    if freq in CALENDAR_MONTHS:
+        months = CALENDAR_MONTHS[freq]
+        start_month = (ordinal * months).astype('datetime64[M]')
+        return (start_month.astype('datetime64[D]'),
+                (start_month + months).astype('datetime64[D]') - np.timedelta64(1, 'D'))
+    periods = pd.PeriodIndex.from_ordinals(ordinal, freq=freq)
+    return (periods.start_time.to_numpy(dtype='datetime64[D]'),
+            periods.end_time.to_numpy(dtype='datetime64[D]'))
+
+
+def apportion_weights(first, last, freq='M'):
+    """
+    Split each [first, last] day span across the periods it touches
+
+    Returns (row, ordinal, weight): one entry per (record, period) piece,
+    where row indexes the input records, ordinal is the pandas Period ordinal
+    and weight is the fraction of the record's days in that period.
+    Weights of every record sum to 1
+    """
+    freq = RESAMPLE_FREQS.get(freq, freq)
+    first_ord = period_ordinals(first, freq)
+    last_ord = period_ordinals(last, freq)
+
+    # Repeat every record once per period it touches; k counts 0, 1, ... within a record
+    n_pieces = last_ord - first_ord + 1
+    row = np.repeat(np.arange(len(first_ord)), n_pieces)
+    k = np.arange(len(row)) - np.repeat(np.cumsum(n_pieces) - n_pieces, n_pieces)
+    ordinal = first_ord[row] + k
+
+    # Clip each piece to its period: [max(first, period start), min(last, period end)]
+    period_first, period_last = period_bounds(ordinal, freq)
+    piece_days = (np.minimum(last[row], period_last) - np.maximum(first[row], period_first)).astype(int) + 1
+    total_days = (last - first).astype(int) + 1
+    return row, ordinal, piece_days / total_days[row]
+
+
+@instrument.stage('apportion')
+def apportion_weeks(fare_df, columns, freq='M', by=STATION_COLUMN,
+                    start='From Date', end='To Date'):
+    """
+    Sum `columns` per `by` value and calendar period, splitting every record
+    across the periods its From..To span covers by day fraction
+
+    freq    - 'M' (monthly), 'Q' (quarterly) or 'Y' (yearly), or any pandas
+              period alias
+    Returns a frame indexed by (by, Period) with one column per fare column,
+    only for (station, period) pairs that received records. Blank counts
+    contribute nothing. Column totals equal the input's
+    """
+    freq = RESAMPLE_FREQS.get(freq, freq)
+    columns = list(columns)
+    first, last = record_spans(fare_df, start, end)
+    row, ordinal, weight = apportion_weights(first, last, freq)
+
+    values = fare_df[columns].to_numpy(dtype=float)[row] * weight[:, None]
+    station_codes, stations = pd.factorize(fare_df[by], sort=True)
+    pieces = pd.DataFrame(values, columns=columns)
+    pieces[by] = station_codes[row]
+    pieces[PERIOD_COLUMN] = ordinal
+    # min_count=1 keeps a column blank where every week was blank
+    summed = pieces.groupby([by, PERIOD_COLUMN], sort=True).sum(min_count=1)
+
+    if instrument.enabled():
+        instrument.note(freq=freq, records=len(fare_df), pieces=len(row),
+                        split_records=int(len(row) - len(fare_df)))
+
+    station_index = stations.take(summed.index.get_level_values(by))
+    period_index = pd.PeriodIndex.from_ordinals(summed.index.get_level_values(PERIOD_COLUMN), freq=freq)
+    summed.index = pd.MultiIndex.from_arrays([station_index, period_index], names=[by, PERIOD_COLUMN])
+    return summed
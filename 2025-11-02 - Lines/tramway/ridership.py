@@ -0,0 +1,146 @@
+"""
+Monthly ridership per station, summed from the weekly fare records
+"""
+
+import pandas as pd
+
+from . import instrument
+from .loader import TRAM_STATIONS, load_fare_data, load_fare_data_cached
+from .resample import PERIOD_COLUMN, STATION_COLUMN, apportion_weeks
+
+# ============================================================================
+# Load Monthly Ridership (NO AVERAGING)
+# ============================================================================
+
+COVID_PERIODS = pd.period_range(start='2019-01', end='2020-12', freq='M')
+
+STATION_LABELS = {
+    'R468': 'Manhattan→Island',
+    'R469': 'Island→Manhattan',
+}
+
+
+def station_label(station):
+    return STATION_LABELS.get(station, station)
+
+
+RIDERSHIP_COLUMNS = ['Total Ridership', 'Tourist', 'Resident']
+
+# A week starting this many days before the first period still reaches into it
+WEEK_LOOKBACK_DAYS = 6
+
+
+def dense_monthly(monthly, stations, periods):
+    """
+    Lay monthly sums out on every (station, period) pair with a single reindex
+    Months without records are filled with 0 explicitly
+    Returns {station: DataFrame indexed by YearMonth (exactly `periods`)}
+    """
+    index = pd.MultiIndex.from_product([stations, periods], names=['Remote Station ID', 'YearMonth'])
+    dense = (
+        monthly.set_index(['Remote Station ID', 'YearMonth'])[RIDERSHIP_COLUMNS]
+        .reindex(index, fill_value=0)
+        .to_numpy(dtype=float)
+        .reshape(len(stations), len(periods), len(RIDERSHIP_COLUMNS))
+    )
+    
+    index = periods.rename('YearMonth')
+    calendar = {'Year': periods.year, 'Month': periods.month}
+    by_station = {}
+    for i, station in enumerate(stations):
+        columns = dict(calendar, **{'Remote Station ID': station})
+        columns.update(zip(RIDERSHIP_COLUMNS, dense[i].T))
+        by_station[station] = pd.DataFrame(columns, index=index)
+    return by_station
+
+
+def ridership_frame(sums):
+    """
+    Long monthly frame from per-(station, period) fare sums
+    SUM for the period, not average; tourists = full fare, residents = the rest
+    """
+    # Blank counts sum to 0, as the monthly totals always have
+    sums = sums.fillna(0)
+    return pd.DataFrame({
+        'Remote Station ID': sums.index.get_level_values(STATION_COLUMN),
+        'YearMonth': sums.index.get_level_values(PERIOD_COLUMN),
+        'Total Ridership': sums['Total Ridership'].to_numpy(),
+        'Tourist': sums['Full Fare'].to_numpy(),
+        'Resident': (sums['Total Ridership'] - sums['Full Fare']).to_numpy(),
+    })
+
+
+def load_monthly_ridership(filepath, stations, periods, chunksize=None, use_cache=True,
+                           split_weeks=True):
+    """
+    Load weekly records for any stations over a period range and sum them
+    per period (monthly, or quarterly / yearly for a 'Q' / 'Y' PeriodIndex).
+    Returns {station: dense DataFrame indexed by YearMonth}, see dense_monthly()
+    use_cache   - read the cleaned table from the Parquet cache next to the CSV
+    split_weeks - share a week that spans two periods by day fraction
+                  (see resample.py); False books it all to its From Date
+    """
+    
+    stations = list(stations)
+    first, last = periods[0], periods[-1]
+    
+    # Only the requested stations, dates and the two count columns are loaded
+    query = dict(
+        columns=['To Date', 'Total Ridership', 'Full Fare'],
+        start=first.start_time - pd.Timedelta(days=WEEK_LOOKBACK_DAYS if split_weeks else 0),
+        end=last.end_time,
+        stations=stations,
+    )
+    with instrument.stage('read'):
+        if use_cache:
+            fare_df = load_fare_data_cached(filepath, **query)
+        else:
+            fare_df = load_fare_data(filepath, chunksize=chunksize, **query)
+    
+    with instrument.stage('aggregate'):
+        counts = ['Total Ridership', 'Full Fare']
+        if split_weeks:
+            sums = apportion_weeks(fare_df, counts, periods.freqstr)
+        else:
+            # Each week wholly in the period of its From Date
+            booked = fare_df['From Date'].dt.to_period(periods.freqstr).rename(PERIOD_COLUMN)
+            sums = fare_df.groupby([fare_df[STATION_COLUMN], booked])[counts].sum()
+        monthly = ridership_frame(sums)
+    
+    if instrument.enabled():
+        instrument.note(
+            periods=f"{first}–{last}",
+            weekly_records=len(fare_df),
+            weekly_records_by_station=fare_df['Remote Station ID'].value_counts()
+                                      .reindex(stations, fill_value=0).to_dict(),
+            period_records=int(monthly['YearMonth'].between(first, last).sum()),
+            period_records_expected=len(periods) * len(stations),
+        )
+    
+    # Separate stations, one row per period
+    with instrument.stage('dense'):
+        return dense_monthly(monthly, stations, periods)
+
+
+def cube_monthly_ridership(cube, stations, periods):
+    """
+    Same result as load_monthly_ridership(), answered from a FareCube
+    (see cube.py) built at the frequency of `periods` - no CSV is read
+    """
+    stations = list(stations)
+    with instrument.stage('cube_query'):
+        sums = cube.sums(stations, periods, ['Total Ridership', 'Full Fare'])
+        return dense_monthly(ridership_frame(sums), stations, periods)
+
+
+def load_covid_period_data(filepath='edited.csv', chunksize=None, use_cache=True):
+    """
+    Load CSV and filter for 2019-2020 only
+    Returns monthly data for each direction
+    """
+    by_station = load_monthly_ridership(filepath, TRAM_STATIONS, COVID_PERIODS,
+                                        chunksize=chunksize, use_cache=use_cache)
+    manhattan_to_island = by_station['R468']
+    island_to_manhattan = by_station['R469']
+    
+    return manhattan_to_island, island_to_manhattan
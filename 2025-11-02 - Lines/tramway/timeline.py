@@ -0,0 +1,49 @@
+"""
+NYC COVID-19 timeline drawn under the flow map
+"""
+
+import pandas as pd
+
+# ============================================================================
+# COVID Timeline Events
+# ============================================================================
+
+def get_covid_timeline():
+    """
+    Key COVID-19 events for NYC
+    Returns dict with monthly Period and (label, event, colour)
+    """
+    timeline = {
+        # 2019 - Normal operations
+        '2019-01': ("Jan 2019", "Normal Operations", "#9BA17B"),
+        '2019-12': ("Dec 2019", "Normal Operations", "#9BA17B"),
+    
+        # 2020 - Warnings (tan instead of bright yellow)
+        '2020-01': ("Jan 2020", "Normal Operations", "#9BA17B"),
+        '2020-02': ("Feb 2020", "First US Cases", "#D4C5A9"),
+        
+        # Lockdown (muted terracotta/rust instead of bright red)
+        '2020-03': ("Mar 2020", "NYC LOCKDOWN BEGINS", "#A0522D"),
+        '2020-04': ("Apr 2020", "Peak Deaths", "#8B4513"),
+        
+        # Reopening (pale peach/cream instead of bright orange)
+        '2020-05': ("May 2020", "Phase 1 Reopening", "#D2B48C"),
+        '2020-06': ("Jun 2020", "Phase 2 Reopening", "#C9B699"),
+        
+        # Recovery (muted blue-gray instead of bright blue)
+        '2020-12': ("Dec 2020", "Vaccines Begin", "#8B9BA3")
+    }
+    return {pd.Period(month, freq='M'): event for month, event in timeline.items()}
+
+
+# Events labelled above the timeline bars: Mar, Apr, May, Dec 2020
+COVID_KEY_EVENTS = [pd.Period(m, freq='M') for m in ['2020-03', '2020-04', '2020-05', '2020-12']]
+
+# Months whose totals are written on the flows
+COVID_KEY_PERIODS = [pd.Period(m, freq='M') for m in
+                     ['2019-03', '2019-07', '2019-11', '2020-03', '2020-04', '2020-07', '2020-11']]
+
+COVID_TIMELINE_CAPTIONS = [
+    (pd.Period('2019-06', freq='M'), '2019: Normal Operations', '#9BA17B'),
+    (pd.Period('2020-06', freq='M'), '2020: COVID-19 Impact & Recovery', '#A0522D'),
+]
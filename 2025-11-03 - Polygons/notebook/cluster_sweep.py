@@ -0,0 +1,123 @@
+"""
+DBSCAN cluster counts for every eps from one radius-neighbor graph
+
+DBSCAN's clusters at eps are the connected components of its core points
+(weighted neighbor count within eps >= min_samples) joined by edges no
+longer than eps. Giving each edge the weight max(d, core_u, core_v) turns
+that into single linkage: the components at eps are those of the edges
+weighing <= eps. So one graph built at the largest eps, its core distances
+and one minimum spanning tree give the exact cluster count for every smaller
+eps, and the eps closest to a target count is a search over that curve
+instead of a grid of DBSCAN fits.
+
+Identical rows (blocks wholly inside one neighborhood) are collapsed into one
+weighted point first, which keeps the graph small.
+
+    sweep = EpsSweep(neighborhood_probs, max_eps=0.5)
+    best_eps = sweep.best_eps(350, min_eps=0.05)
+    labels = sweep.labels(best_eps)
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import minimum_spanning_tree
+
+
+def unique_rows(X):
+    """(unique rows, weights, inverse) of a dense array or CSR matrix"""
+    if not sparse.issparse(X):
+        unique, inverse, counts = np.unique(np.asarray(X), axis=0, return_inverse=True, return_counts=True)
+        return unique, counts, inverse.ravel()
+
+    X = sparse.csr_matrix(X, copy=True)
+    X.eliminate_zeros()
+    X.sort_indices()
+    first = {}
+    inverse = np.empty(X.shape[0], dtype=np.int64)
+    for row, (start, stop) in enumerate(zip(X.indptr[:-1], X.indptr[1:])):
+        key = X.indices[start:stop].tobytes() + b"|" + X.data[start:stop].tobytes()
+        inverse[row] = first.setdefault(key, len(first))
+    representatives = np.zeros(len(first), dtype=np.int64)
+    representatives[inverse[::-1]] = np.arange(X.shape[0])[::-1]
+    return X[representatives], np.bincount(inverse), inverse
+
+
+class EpsSweep:
+    """
+    X           - points (dense array or CSR), e.g. the neighborhood shares
+    max_eps     - largest eps of interest; the neighbor graph is built at this radius
+    min_samples - as DBSCAN's (the point itself included)
+    algorithm   - sklearn NearestNeighbors algorithm: a ball / KD tree for dense
+                  input, brute force over the non-zeros for sparse input
+    """
+
+    def __init__(self, X, max_eps, min_samples=5, algorithm="auto"):
+        from sklearn.neighbors import NearestNeighbors
+
+        self.max_eps = max_eps
+        self.min_samples = min_samples
+        self.points, self.weights, self.inverse = unique_rows(X)
+
+        model = NearestNeighbors(radius=max_eps, algorithm=algorithm).fit(self.points)
+        distances, neighbors = model.radius_neighbors(self.points, sort_results=True)
+        lengths = np.array([len(n) for n in neighbors])
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        columns = np.concatenate(neighbors)
+        dist = np.concatenate(distances)
+        # Distances within a row are ascending, self (0) first
+        self.graph = sparse.csr_matrix((dist, columns, indptr), shape=(len(lengths),) * 2)
+
+        # Core distance: radius at which the weighted neighbor count reaches min_samples
+        cumulative = np.cumsum(self.weights[columns])
+        cumulative -= np.repeat(cumulative[indptr[:-1]] - self.weights[columns[indptr[:-1]]], lengths)
+        position = np.where(cumulative >= min_samples, np.arange(len(columns)), len(columns))
+        first = np.minimum.reduceat(position, indptr[:-1])
+        self.core_distance = np.full(len(lengths), np.inf)
+        is_core = first < indptr[1:]
+        self.core_distance[is_core] = dist[first[is_core]]
+
+        # Mutual reachability weights; the MST's edges are exactly the merges as eps grows
+        keep = (rows != columns) & is_core[rows] & is_core[columns]
+        weight = np.maximum(dist[keep], np.maximum(self.core_distance[rows[keep]],
+                                                   self.core_distance[columns[keep]]))
+        reach = sparse.csr_matrix((weight, (rows[keep], columns[keep])), shape=self.graph.shape)
+        self.merges = np.sort(minimum_spanning_tree(reach).data)
+        self.cores = np.sort(self.core_distance[is_core])
+
+    def n_clusters(self, eps):
+        """DBSCAN cluster count at eps (scalar or array), for eps <= max_eps"""
+        eps = np.asarray(eps, dtype=float)
+        if np.any(eps > self.max_eps):
+            raise ValueError(f"eps above max_eps={self.max_eps}; rebuild the sweep with a larger radius")
+        counts = np.searchsorted(self.cores, eps, side="right") - np.searchsorted(self.merges, eps, side="right")
+        return counts if counts.ndim else int(counts)
+
+    def breakpoints(self, min_eps=0.0, max_eps=None):
+        """Every eps in [min_eps, max_eps] where the cluster count can change, plus min_eps"""
+        max_eps = self.max_eps if max_eps is None else max_eps
+        points = np.union1d(self.cores, self.merges)
+        return np.union1d([min_eps], points[(points >= min_eps) & (points <= max_eps)])
+
+    def best_eps(self, target, min_eps=0.0, max_eps=None):
+        """
+        eps in [min_eps, max_eps] whose cluster count is closest to `target`
+        (the smallest such count interval wins). Returned as the middle of that
+        interval, so refitting DBSCAN at it is safe from rounding at the edges
+        """
+        max_eps = self.max_eps if max_eps is None else max_eps
+        starts = self.breakpoints(min_eps, max_eps)
+        best = int(np.argmin(np.abs(self.n_clusters(starts) - target)))
+        stop = starts[best + 1] if best + 1 < len(starts) else max_eps
+        return float((starts[best] + stop) / 2)
+
+    def labels(self, eps, **dbscan_kwargs):
+        """DBSCAN labels of every input row at eps, fitted on the stored graph"""
+        from sklearn.cluster import DBSCAN
+
+        graph = self.graph.copy()
+        graph.data[graph.data > eps] = 0
+        graph.eliminate_zeros()
+        model = DBSCAN(eps=eps, min_samples=self.min_samples, metric="precomputed", **dbscan_kwargs)
+        model.fit(graph, sample_weight=self.weights)
+        return model.labels_[self.inverse]
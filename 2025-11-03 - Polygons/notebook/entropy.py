@@ -0,0 +1,132 @@
+"""
+Neighborhood entropy per block, computed from a sparse probability matrix
+
+Every block row of combined.geojson holds one `x*` column per neighborhood,
+almost all of them blank. The table is read in Arrow batches, each batch
+becomes a CSR block of its non-zero shares, and entropy plus the normalized,
+opacity-weighted variants are computed from those non-zeros only. Memory
+grows with the number of non-zeros, not with blocks x neighborhoods.
+
+    probs, entropy_map = block_entropy("../data/combined.geojson", read_geometry=True)
+    entropy_map.to_file("../entropy_map.geojson", driver="GeoJSON")
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+NEIGHBORHOOD_PREFIX = "x"
+BLOCK_COLUMNS = ["color", "opacity"]
+BATCH_SIZE = 10_000
+
+
+def neighborhood_columns(columns):
+    return [col for col in columns if col.startswith(NEIGHBORHOOD_PREFIX)]
+
+
+def read_batches(path, columns=None, read_geometry=False, batch_size=BATCH_SIZE):
+    """
+    Yield the layer as DataFrames of at most `batch_size` rows, in file order
+    (GeoDataFrames when read_geometry is set)
+    """
+    import geopandas as gpd
+    from pyogrio.raw import open_arrow
+
+    with open_arrow(path, columns=columns, read_geometry=read_geometry,
+                    batch_size=batch_size, use_pyarrow=True) as (meta, reader):
+        geometry_name = meta["geometry_name"] or "wkb_geometry"
+        for batch in reader:
+            frame = batch.to_pandas()
+            if read_geometry:
+                geometry = gpd.GeoSeries.from_wkb(frame.pop(geometry_name), crs=meta["crs"])
+                frame = gpd.GeoDataFrame(frame, geometry=geometry)
+            yield frame
+
+
+def sparse_shares(counts):
+    """
+    Row-normalized CSR matrix of a dense block of counts (blank = 0)
+    Rows without any count stay empty
+    """
+    matrix = sparse.csr_matrix(np.nan_to_num(np.asarray(counts, dtype=float)))
+    matrix.eliminate_zeros()
+    totals = np.asarray(matrix.sum(axis=1)).ravel()
+    matrix.data /= np.repeat(totals, np.diff(matrix.indptr))
+    return matrix
+
+
+def row_entropy(probs):
+    """
+    Shannon entropy (natural log) of every CSR row, from its non-zeros only
+    Rows without any share are NaN, as the dense 0/0 division made them
+    """
+    log_p = np.log(probs.data)
+    rows = np.repeat(np.arange(probs.shape[0]), np.diff(probs.indptr))
+    entropy = -np.bincount(rows, probs.data * log_p, minlength=probs.shape[0])
+    entropy[np.diff(probs.indptr) == 0] = np.nan
+    return entropy
+
+
+def min_max(values):
+    """Scale to 0..1, ignoring NaN like Series.min() / max()"""
+    values = np.asarray(values, dtype=float)
+    low, high = np.nanmin(values), np.nanmax(values)
+    return (values - low) / (high - low)
+
+
+def read_probabilities(path, batch_size=BATCH_SIZE, read_geometry=False):
+    """
+    (probs, blocks): the CSR neighborhood shares of every block and a frame
+    of the per-block color / opacity (a GeoDataFrame with the block geometry
+    when read_geometry is set), both in file order
+    """
+    parts, block_parts = [], []
+    # Field names come from the first batch; asking for them up front would scan the file twice
+    neighborhoods = extra = None
+    for batch in read_batches(path, read_geometry=read_geometry, batch_size=batch_size):
+        if neighborhoods is None:
+            neighborhoods = neighborhood_columns(batch.columns)
+            extra = [col for col in BLOCK_COLUMNS if col in batch.columns]
+            if read_geometry:
+                extra.append(batch.geometry.name)
+        parts.append(sparse_shares(batch[neighborhoods].to_numpy(dtype=float, na_value=np.nan)))
+        block_parts.append(batch[extra])
+
+    if not parts:
+        return sparse.csr_matrix((0, 0)), pd.DataFrame(columns=BLOCK_COLUMNS)
+    return sparse.vstack(parts, format="csr"), pd.concat(block_parts, ignore_index=True)
+
+
+def entropy_metrics(probs, blocks):
+    """
+    Per-block entropy columns, as the notebook derives them:
+    entropy, entropy_normalized, opacity_normalized,
+    entropy_normalized_weighted and entropy_normalized_weighted_normalized
+    (a GeoDataFrame when `blocks` carries geometry)
+    """
+    entropy = row_entropy(probs)
+    metrics = pd.DataFrame({"entropy": entropy}, index=blocks.index)
+    metrics["entropy_normalized"] = min_max(entropy)
+    for col in BLOCK_COLUMNS:
+        if col in blocks:
+            metrics[col] = blocks[col].to_numpy()
+    if "opacity" in blocks:
+        metrics["opacity_normalized"] = min_max(blocks["opacity"])
+        weighted = metrics["entropy_normalized"].to_numpy() * metrics["opacity_normalized"].to_numpy()
+        metrics["entropy_normalized_weighted"] = weighted
+        metrics["entropy_normalized_weighted_normalized"] = min_max(weighted)
+    if hasattr(blocks, "geometry"):
+        import geopandas as gpd
+
+        metrics = gpd.GeoDataFrame(metrics, geometry=blocks.geometry.values, crs=blocks.crs)
+    return metrics
+
+
+def block_entropy(path, batch_size=BATCH_SIZE, read_geometry=False):
+    """
+    (probs, metrics) for a block layer in one pass over the file; see
+    read_probabilities() and entropy_metrics()
+    """
+    probs, blocks = read_probabilities(path, batch_size, read_geometry)
+    return probs, entropy_metrics(probs, blocks)
+
@@ -0,0 +1,218 @@
+"""
+Streaming property transforms for GeoJSON layers
+
+A FeatureCollection is parsed one feature at a time (json raw_decode over a
+sliding text buffer), transforms run on batches of features, and each batch
+is written out before the next is read, so peak memory is one batch however
+many features the file holds. Geometry is passed through untouched.
+
+    # file to file: newline-delimited GeoJSON, a FeatureCollection or FlatGeobuf
+    transform_file("../entropy_map.geojson", "../colored.geojsonl", annotate_features)
+    # or straight from the GeoDataFrame, no intermediate file
+    write_frame(annotate(entropy_map), "../colored.geojson")
+"""
+
+import json
+import re
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+COLOR_COLUMN = "color"
+FILL_COLUMN = "fillColor"
+BATCH_SIZE = 10_000
+READ_SIZE = 1 << 20
+
+# FlatGeobuf's spatial index rejects null geometries (and reorders features), so it is left out
+FLATGEOBUF_OPTIONS = {"SPATIAL_INDEX": "NO"}
+RGB_SUFFIXES = ("_r", "_g", "_b")
+
+FEATURES_KEY = re.compile(r'"features"\s*:\s*\[')
+SEPARATORS = " \t\r\n,"
+
+
+@lru_cache(maxsize=None)
+def hex_to_rgb(h):
+    """[r, g, b] for a '#rrggbb' string, None for anything else"""
+    if not (isinstance(h, str) and h.startswith("#") and len(h) == 7):
+        return None
+    try:
+        return [int(h[i:i + 2], 16) for i in (1, 3, 5)]
+    except ValueError:
+        return None
+
+
+def fill_colors(colors):
+    """
+    RGB list per entry of `colors`; each distinct color is converted once and
+    rows share its palette entry. Entries without a valid hex color get None
+    """
+    codes, palette = pd.factorize(pd.Series(colors, dtype=object), use_na_sentinel=True)
+    rgb = np.empty(len(palette) + 1, dtype=object)
+    rgb[:-1] = [hex_to_rgb(h) for h in palette]
+    rgb[-1] = None
+    # code -1 (missing) lands on the trailing None
+    return rgb[codes]
+
+
+def annotate(gdf, color_column=COLOR_COLUMN, fill_column=FILL_COLUMN):
+    """Copy of a GeoDataFrame with fillColor = RGB of its hex color column"""
+    if color_column not in gdf:
+        return gdf
+    return gdf.assign(**{fill_column: fill_colors(gdf[color_column].to_numpy())})
+
+
+def annotate_features(features, color_column=COLOR_COLUMN, fill_column=FILL_COLUMN):
+    """Add fillColor to the properties of each feature with a valid hex color, in place"""
+    for feature in features:
+        # "properties": null is valid GeoJSON; give it a dict the color can land in
+        feature["properties"] = feature.get("properties") or {}
+    properties = [feature["properties"] for feature in features]
+    for props, rgb in zip(properties, fill_colors([p.get(color_column) for p in properties])):
+        if rgb is not None:
+            props[fill_column] = rgb
+    return features
+
+
+def rgb_columns(frame, fill_column=FILL_COLUMN):
+    """
+    Copy of `frame` with its fillColor lists split into nullable int
+    fillColor_r / _g / _b columns, present even when no row has a color
+    """
+    colors = frame[fill_column] if fill_column in frame else [None] * len(frame)
+    channels = pd.DataFrame(
+        [rgb if isinstance(rgb, list) else [None] * 3 for rgb in colors],
+        index=frame.index,
+        columns=[fill_column + suffix for suffix in RGB_SUFFIXES],
+        dtype="Int16",
+    )
+    return pd.concat([frame.drop(columns=fill_column, errors="ignore"), channels], axis=1)
+
+
+def iter_features(path, read_size=READ_SIZE):
+    """Yield the features of a GeoJSON FeatureCollection one at a time"""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buffer = f.read(read_size)
+        while (match := FEATURES_KEY.search(buffer)) is None:
+            more = f.read(read_size)
+            if not more:
+                return
+            # Keep a tail in case the key straddles two reads
+            buffer = buffer[-32:] + more
+        pos = match.end()
+
+        eof = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in SEPARATORS:
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            try:
+                if pos >= len(buffer):
+                    raise ValueError("buffer exhausted")
+                feature, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                # Feature cut off by the read boundary: drop what is consumed, read on
+                if eof:
+                    raise ValueError(f"Truncated GeoJSON: {path}")
+                more = f.read(read_size)
+                eof = not more
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            yield feature
+            pos = end
+
+
+def iter_batches(features, batch_size=BATCH_SIZE):
+    features = iter(features)
+    while batch := list(islice(features, batch_size)):
+        yield batch
+
+
+class FeatureWriter:
+    """
+    Append feature batches to `path`; the format follows the extension:
+    .geojsonl / .geojsons / .ndjson - one feature per line
+    .geojson / .json                - a FeatureCollection, written as it goes
+    .fgb                            - FlatGeobuf, through pyogrio; fillColor is
+                                      stored as int fillColor_r / _g / _b columns
+                                      and the first batch fixes the other fields
+    """
+
+    LINE_SUFFIXES = (".geojsonl", ".geojsons", ".ndjson", ".jsonl")
+
+    def __init__(self, path, crs="EPSG:4326", fill_column=FILL_COLUMN):
+        self.path = str(path)
+        self.crs = crs
+        self.fill_column = fill_column
+        self.count = 0
+        self.columns = None
+        self.flatgeobuf = self.path.endswith(".fgb")
+        self.lines = self.path.endswith(self.LINE_SUFFIXES)
+        self.file = None
+        if not self.flatgeobuf:
+            self.file = open(self.path, "w", encoding="utf-8")
+            if not self.lines:
+                self.file.write('{"type": "FeatureCollection", "features": [\n')
+
+    def write(self, features):
+        if not features:
+            return
+        if self.flatgeobuf:
+            import geopandas as gpd
+            from pyogrio import write_dataframe
+
+            frame = rgb_columns(gpd.GeoDataFrame.from_features(features, crs=self.crs), self.fill_column)
+            if self.columns is None:
+                self.columns = list(frame.columns)
+            else:
+                extra = sorted(set(frame.columns) - set(self.columns))
+                if extra:
+                    raise ValueError(f"{self.path}: properties {extra} are not in the first batch")
+                frame = frame.reindex(columns=self.columns)
+            write_dataframe(frame, self.path, driver="FlatGeobuf", append=self.count > 0,
+                            layer_options=FLATGEOBUF_OPTIONS)
+        elif self.lines:
+            self.file.write("".join(json.dumps(feature) + "\n" for feature in features))
+        else:
+            lead = ",\n" if self.count else ""
+            self.file.write(lead + ",\n".join(json.dumps(feature) for feature in features))
+        self.count += len(features)
+
+    def close(self):
+        if self.file is not None:
+            if not self.lines:
+                self.file.write("\n]}\n")
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def transform_file(path, out_path, transform=annotate_features, batch_size=BATCH_SIZE):
+    """
+    Stream `path` through transform(list of features) -> list of features
+    into `out_path` (see FeatureWriter). Returns the number of features
+    """
+    with FeatureWriter(out_path) as writer:
+        for batch in iter_batches(iter_features(path), batch_size):
+            writer.write(transform(batch))
+    return writer.count
+
+
+def write_frame(gdf, path, batch_size=BATCH_SIZE):
+    """Write a GeoDataFrame through FeatureWriter, `batch_size` rows at a time"""
+    crs = gdf.crs.to_string() if gdf.crs is not None else None
+    with FeatureWriter(path, crs=crs) as writer:
+        for start in range(0, len(gdf), batch_size):
+            chunk = gdf.iloc[start:start + batch_size]
+            writer.write(json.loads(chunk.to_json(drop_id=True))["features"])
+    return writer.count
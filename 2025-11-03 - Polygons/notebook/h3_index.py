@@ -0,0 +1,130 @@
+"""
+H3 cells for every block at several resolutions, and hex-level rollups
+
+Block centroids are computed as coordinate arrays, each distinct centroid is
+indexed once at the finest resolution, and coarser cells are derived from
+those 64-bit ids with bit operations, so one pass covers every resolution.
+Block metrics are then summed per finest cell and rolled up level by level,
+giving one compact table (resolution, cell, counts, means, dominant cluster)
+that hex tiles can be served from.
+
+    block_cells = index_blocks(entropy_map, [7, 8, 9, 10])
+    hex_table = hex_rollup(block_cells, entropy_map, mean=["entropy"], label="cluster")
+"""
+
+import numpy as np
+import pandas as pd
+
+H3_RESOLUTIONS = [7, 8, 9, 10]
+
+# H3 index layout: resolution in bits 52-55, then one 3-bit digit per resolution 1..15
+H3_RES_SHIFT = 52
+H3_RES_MASK = np.uint64(0xF << H3_RES_SHIFT)
+H3_MAX_RES = 15
+
+
+def centroid_latlng(gdf):
+    """WGS84 (lat, lng) arrays of the geometry centroids, taken in the layer's own CRS"""
+    import shapely
+
+    centroids = shapely.centroid(gdf.geometry.values)
+    if gdf.crs is not None and not gdf.crs.is_geographic:
+        import geopandas as gpd
+
+        centroids = gpd.GeoSeries(centroids, crs=gdf.crs).to_crs(4326).values
+    return shapely.get_y(centroids), shapely.get_x(centroids)
+
+
+def latlng_to_cells(lat, lng, res):
+    """H3 cells (uint64) at `res`; h3 is called once per distinct coordinate"""
+    import h3.api.basic_int as h3
+
+    points, inverse = np.unique(np.column_stack([lat, lng]), axis=0, return_inverse=True)
+    cells = np.fromiter((h3.latlng_to_cell(y, x, res) for y, x in points), dtype=np.uint64, count=len(points))
+    return cells[inverse.ravel()]
+
+
+def cells_to_parent(cells, res):
+    """Parents of uint64 H3 cells at a coarser `res`: set the resolution, blank the finer digits"""
+    cells = np.asarray(cells, dtype=np.uint64)
+    finer_digits = np.uint64((1 << (3 * (H3_MAX_RES - res))) - 1)
+    return (cells & ~H3_RES_MASK) | np.uint64(res << H3_RES_SHIFT) | finer_digits
+
+
+def cells_to_str(cells):
+    """Hex strings, as h3.latlng_to_cell returns them"""
+    return np.char.mod("%x", np.asarray(cells, dtype=np.uint64))
+
+
+def index_blocks(gdf, resolutions=H3_RESOLUTIONS):
+    """{res: uint64 cell per block} for each resolution, from one finest-level pass"""
+    resolutions = sorted(resolutions)
+    lat, lng = centroid_latlng(gdf)
+    finest = latlng_to_cells(lat, lng, resolutions[-1])
+    return {res: finest if res == resolutions[-1] else cells_to_parent(finest, res) for res in resolutions}
+
+
+def _level(res, cells, count, sums, valid, label, pairs, pair_counts):
+    frame = pd.DataFrame({"res": np.int8(res), "h3": cells.astype(np.int64), "n_blocks": count})
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for col in sums:
+            frame[f"{col}_mean"] = sums[col] / valid[col]
+    if pairs is not None:
+        # Dominant label: highest block count per cell, smallest label on ties
+        pair_cell, pair_label = pairs
+        order = np.lexsort((pair_label, -pair_counts, pair_cell))
+        first = order[np.r_[True, pair_cell[order][1:] != pair_cell[order][:-1]]]
+        dominant = np.full(len(cells), -1, dtype=np.int64)
+        dominant[pair_cell[first]] = pair_label[first]
+        frame[f"{label}_mode"] = dominant
+        frame[f"{label}_count"] = np.bincount(pair_cell, minlength=len(cells))
+    return frame
+
+
+def hex_rollup(block_cells, metrics, mean=(), label=None):
+    """
+    Per-cell table for every resolution in `block_cells` (see index_blocks())
+
+    metrics - per-block frame, rows in the same order as the cells
+    mean    - columns averaged per cell, NaN skipped (<col>_mean)
+    label   - integer label column (e.g. DBSCAN cluster); each cell gets its
+              most common label (<label>_mode) and the number of distinct labels
+              (<label>_count), noise (-1) excluded
+    Returns columns res, h3 (int64 cell id), n_blocks, ... sorted by res, h3.
+    Coarser levels are summed from the finer level's totals, not the blocks
+    """
+    resolutions = sorted(block_cells, reverse=True)
+    finest = resolutions[0]
+
+    cells, inverse = np.unique(block_cells[finest], return_inverse=True)
+    inverse = inverse.ravel()
+    count = np.bincount(inverse, minlength=len(cells))
+    sums, valid = {}, {}
+    for col in mean:
+        values = metrics[col].to_numpy(dtype=float)
+        ok = ~np.isnan(values)
+        sums[col] = np.bincount(inverse[ok], values[ok], minlength=len(cells))
+        valid[col] = np.bincount(inverse[ok], minlength=len(cells))
+
+    pairs = pair_counts = None
+    if label is not None:
+        labels = metrics[label].to_numpy(dtype=np.int64)
+        keep = labels >= 0
+        keys, pair_counts = np.unique(np.column_stack([inverse[keep], labels[keep]]), axis=0, return_counts=True)
+        pairs = (keys[:, 0], keys[:, 1])
+
+    levels = [_level(finest, cells, count, sums, valid, label, pairs, pair_counts)]
+    for res in resolutions[1:]:
+        parents, up = np.unique(cells_to_parent(cells, res), return_inverse=True)
+        up = up.ravel()
+        count = np.bincount(up, count, minlength=len(parents)).astype(np.int64)
+        sums = {col: np.bincount(up, s, minlength=len(parents)) for col, s in sums.items()}
+        valid = {col: np.bincount(up, v, minlength=len(parents)) for col, v in valid.items()}
+        if pairs is not None:
+            keys, where = np.unique(np.column_stack([up[pairs[0]], pairs[1]]), axis=0, return_inverse=True)
+            pair_counts = np.bincount(where.ravel(), pair_counts).astype(np.int64)
+            pairs = (keys[:, 0], keys[:, 1])
+        cells = parents
+        levels.append(_level(res, cells, count, sums, valid, label, pairs, pair_counts))
+
+    return pd.concat(levels[::-1], ignore_index=True)
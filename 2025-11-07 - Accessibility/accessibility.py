@@ -0,0 +1,339 @@
+"""
+Street-network accessibility with pandana, built once and reused
+
+    engine = AccessibilityEngine.open('.access_cache/network.h5', nodes, edges)
+    distances = engine.nearest({'mta': entrances, 'restaurants': subways}, maxdist=10_000)
+
+The network inputs (node coordinates and the remapped edge table) are kept in
+an HDF5 file with a hash of the nodes and edges they came from, so later runs
+on the same network skip the osmid remapping and a changed network is rebuilt.
+pandana cannot write its contraction hierarchy or precomputed ranges to disk,
+so both are rebuilt from the stored arrays on open; the precompute horizon is
+stored with them.
+Nearest-POI distances are cached per category as Parquet, keyed by the
+network, the POI coordinates and the query, so rerunning a batch of amenity
+types only computes the categories whose points changed.
+
+BlockAssignment maps nodes to census blocks once (STRtree, persisted as .npz);
+node metrics are then averaged per block with np.bincount.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Bump when the stored network or result layout changes
+ENGINE_VERSION = 2
+RESULT_DIRNAME = 'nearest'
+
+
+def network_arrays(nodes, edges, weight='length'):
+    """
+    pandana inputs from ox.graph_to_gdfs() output
+    Nodes get positional ids 0..n-1 in place of osmids; edges whose ends are
+    not in `nodes` are dropped
+    """
+    osmids = pd.Index(nodes.index)
+    edges = edges.reset_index()
+    u = osmids.get_indexer(edges['u'])
+    v = osmids.get_indexer(edges['v'])
+    keep = (u >= 0) & (v >= 0)
+
+    node_xy = pd.DataFrame({'x': nodes['x'].to_numpy(dtype=float), 'y': nodes['y'].to_numpy(dtype=float)})
+    edge_table = pd.DataFrame({
+        'from': u[keep],
+        'to': v[keep],
+        weight: edges[weight].to_numpy(dtype=float)[keep],
+    })
+    return node_xy, edge_table
+
+
+def hash_arrays(*arrays):
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def gdfs_hash(nodes, edges, weight='length', twoway=True):
+    """Hash of what network_arrays() reads from the node / edge GeoDataFrames, plus the settings"""
+    edges = edges.reset_index()
+    digest = hash_arrays(
+        pd.util.hash_pandas_object(nodes.index, index=False).to_numpy(),
+        nodes['x'].to_numpy(dtype=float), nodes['y'].to_numpy(dtype=float),
+        pd.util.hash_pandas_object(edges['u'], index=False).to_numpy(),
+        pd.util.hash_pandas_object(edges['v'], index=False).to_numpy(),
+        edges[weight].to_numpy(dtype=float),
+    )
+    return hashlib.sha256(f"{digest}:{weight}:{twoway}".encode()).hexdigest()
+
+
+def poi_coordinates(points):
+    """(x, y) float arrays from a GeoSeries / GeoDataFrame or an (x, y) pair"""
+    if hasattr(points, 'geometry'):
+        geometry = points.geometry
+        return geometry.x.to_numpy(dtype=float), geometry.y.to_numpy(dtype=float)
+    x, y = points
+    return np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+
+
+def group_pois(gdf, column):
+    """{category: points} for every value of `column`, ready for nearest()"""
+    gdf = gdf.dropna(subset=[gdf.geometry.name])
+    return {name: group.geometry for name, group in gdf.groupby(column, sort=True)}
+
+
+class AccessibilityEngine:
+    """
+    One pandana network with its precompute done, shared by every POI category
+
+    node_xy    - DataFrame of x / y per positional node id
+    edge_table - DataFrame of from / to node ids and the impedance column
+    weight     - impedance column name
+    horizon    - precompute distance, in impedance units
+    """
+
+    def __init__(self, node_xy, edge_table, weight='length', horizon=5_000, twoway=True,
+                 cache_dir=None):
+        import pandana
+
+        self.node_xy = node_xy
+        self.edge_table = edge_table
+        self.weight = weight
+        self.horizon = horizon
+        self.twoway = twoway
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.fingerprint = hash_arrays(
+            node_xy[['x', 'y']].to_numpy(), edge_table[['from', 'to']].to_numpy(),
+            edge_table[weight].to_numpy(), np.array([twoway]),
+        )
+
+        self.network = pandana.Network(node_xy['x'], node_xy['y'], edge_table['from'], edge_table['to'],
+                                       edge_table[[weight]], twoway=twoway)
+        self.network.precompute(horizon)
+
+    @classmethod
+    def from_gdfs(cls, nodes, edges, weight='length', **kwargs):
+        node_xy, edge_table = network_arrays(nodes, edges, weight)
+        return cls(node_xy, edge_table, weight, **kwargs)
+
+    def save(self, path, source=None):
+        """Write the network inputs and settings to an HDF5 file; `source` is gdfs_hash() of what they came from"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with pd.HDFStore(tmp_path, mode='w') as store:
+            store['nodes'] = self.node_xy
+            store['edges'] = self.edge_table
+            store.get_storer('edges').attrs.engine = json.dumps({
+                'version': ENGINE_VERSION,
+                'weight': self.weight,
+                'horizon': self.horizon,
+                'twoway': self.twoway,
+                'source': source,
+            })
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path, source=None, **kwargs):
+        """Rebuild the network from a file written by save(), checking its source hash if given"""
+        with pd.HDFStore(path, mode='r') as store:
+            settings = json.loads(store.get_storer('edges').attrs.engine)
+            if settings.pop('version', None) != ENGINE_VERSION:
+                raise ValueError(f"{path} was written by another engine version")
+            stored_source = settings.pop('source', None)
+            if source is not None and stored_source != source:
+                raise ValueError(f"{path} was built from another network")
+            node_xy, edge_table = store['nodes'], store['edges']
+        settings.update(kwargs)
+        return cls(node_xy, edge_table, **settings)
+
+    @classmethod
+    def open(cls, path, nodes, edges, weight='length', horizon=5_000, twoway=True):
+        """
+        Load the network saved at `path` if it was built from these nodes and
+        edges, else build it and save it there. Nearest-POI results are cached
+        in a folder beside it
+        """
+        path = Path(path)
+        cache_dir = path.with_suffix('') / RESULT_DIRNAME
+        source = gdfs_hash(nodes, edges, weight, twoway)
+        if path.exists():
+            try:
+                return cls.load(path, source=source, horizon=horizon, cache_dir=cache_dir)
+            except (OSError, KeyError, ValueError):
+                pass
+        engine = cls.from_gdfs(nodes, edges, weight, horizon=horizon, twoway=twoway, cache_dir=cache_dir)
+        engine.save(path, source=source)
+        return engine
+
+    def result_path(self, category, x, y, maxdist, num_pois):
+        key = hash_arrays(x, y, np.array([maxdist, num_pois], dtype=float))
+        key = hashlib.sha256(f"{self.fingerprint}:{key}".encode()).hexdigest()[:16]
+        safe = re.sub(r'[^\w.-]+', '_', str(category))[:60]
+        return self.cache_dir / f"{safe}-{key}.parquet"
+
+    def nearest_category(self, category, points, maxdist=10_000, num_pois=1):
+        """
+        Distances from every node to its `num_pois` nearest points of one category
+        Columns 1..num_pois; NaN where fewer POIs are within `maxdist`
+        """
+        x, y = poi_coordinates(points)
+        path = self.result_path(category, x, y, maxdist, num_pois) if self.cache_dir else None
+        if path is not None and path.exists():
+            result = pd.read_parquet(path)
+            result.columns = result.columns.astype(int)
+            return result
+
+        self.network.set_pois(str(category), maxdist=maxdist, maxitems=num_pois, x_col=x, y_col=y)
+        result = self.network.nearest_pois(maxdist, str(category), num_pois=num_pois,
+                                           max_distance=np.nan, include_poi_ids=False)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            result.set_axis(result.columns.astype(str), axis=1).to_parquet(path)
+        return result
+
+    def nearest(self, pois, maxdist=10_000, num_pois=1):
+        """
+        Nearest-POI distances for any number of categories in one call
+
+        pois - {category: points}, see poi_coordinates() and group_pois()
+        Returns a frame indexed by node id with one column per category, or
+        (category, k) columns when num_pois > 1
+        """
+        results = {
+            category: self.nearest_category(category, points, maxdist, num_pois)
+            for category, points in pois.items()
+        }
+        if num_pois == 1:
+            return pd.DataFrame({category: result[1] for category, result in results.items()})
+        return pd.concat(results, axis=1)
+
+
+def geometry_hash(geoseries):
+    """Hash of a GeoSeries' CRS and vertices, without serializing each geometry"""
+    import shapely
+
+    geometries = geoseries.values
+    digest = hash_arrays(shapely.get_coordinates(geometries), shapely.get_num_coordinates(geometries))
+    return hashlib.sha256(f"{geoseries.crs}:{digest}".encode()).hexdigest()
+
+
+class BlockAssignment:
+    """
+    Which census block each network node falls in, as parallel position arrays
+    Built once with an STRtree; a node on a shared edge belongs to no block and
+    a node in overlapping blocks to all of them, as with sjoin(predicate='within')
+
+    nodes     - node positions (rows of the node table), one per (node, block) pair
+    blocks    - block positions, same length
+    block_ids - block labels, in block-table order
+    """
+
+    def __init__(self, nodes, blocks, block_ids, n_nodes, fingerprint=None):
+        self.nodes = np.asarray(nodes, dtype=np.int64)
+        self.blocks = np.asarray(blocks, dtype=np.int64)
+        self.block_ids = pd.Index(block_ids)
+        self.n_nodes = n_nodes
+        self.fingerprint = fingerprint
+        self.node_counts = np.bincount(self.blocks, minlength=len(self.block_ids))
+
+    @classmethod
+    def build(cls, node_points, block_gdf, crs=None, fingerprint=None):
+        """
+        node_points - GeoSeries / GeoDataFrame of node points
+        block_gdf   - blocks, indexed by block id
+        crs         - project both to this CRS first (e.g. 'EPSG:32118')
+        """
+        import shapely
+
+        node_points = node_points.geometry
+        blocks = block_gdf.geometry
+        if crs is not None:
+            node_points, blocks = node_points.to_crs(crs), blocks.to_crs(crs)
+        tree = shapely.STRtree(blocks.values)
+        nodes, hits = tree.query(node_points.values, predicate='within')
+        return cls(nodes, hits, block_gdf.index, len(node_points), fingerprint)
+
+    @classmethod
+    def open(cls, path, node_points, block_gdf, crs=None):
+        """
+        Load the assignment saved at `path` if it matches these nodes and blocks, else build and save it
+        Only positions are stored; block ids always come from block_gdf.index, so they keep its dtype
+        """
+        path = Path(path)
+        fingerprint = hashlib.sha256(
+            f"{geometry_hash(node_points.geometry)}:{geometry_hash(block_gdf.geometry)}:{crs}".encode()
+        ).hexdigest()
+        if path.exists():
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    if str(data['fingerprint']) == fingerprint:
+                        return cls(data['nodes'], data['blocks'], block_gdf.index,
+                                   int(data['n_nodes']), fingerprint)
+            except (OSError, KeyError, ValueError):
+                pass
+
+        assignment = cls.build(node_points, block_gdf, crs, fingerprint)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, nodes=assignment.nodes, blocks=assignment.blocks,
+                     n_nodes=assignment.n_nodes, fingerprint=np.array(fingerprint))
+        tmp_path.replace(path)
+        return assignment
+
+    def mean(self, values):
+        """
+        Per-block mean of one node-level array, skipping NaN like groupby().mean()
+        Blocks with nodes but only NaN values get NaN; blocks without nodes get NaN too
+        """
+        values = np.asarray(values, dtype=float)
+        if len(values) != self.n_nodes:
+            raise ValueError(f"Expected {self.n_nodes} node values, got {len(values)}")
+        pair_values = values[self.nodes]
+        valid = ~np.isnan(pair_values)
+        sums = np.bincount(self.blocks[valid], pair_values[valid], minlength=len(self.block_ids))
+        counts = np.bincount(self.blocks[valid], minlength=len(self.block_ids))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def aggregate(self, node_metrics, block_gdf=None):
+        """
+        Per-block means of every column of `node_metrics` (rows in node order),
+        for the blocks that contain at least one node. With `block_gdf` the
+        result is a GeoDataFrame carrying each block's geometry
+        """
+        occupied = np.flatnonzero(self.node_counts)
+        result = pd.DataFrame(
+            {col: self.mean(node_metrics[col])[occupied] for col in node_metrics.columns},
+            index=self.block_ids[occupied],
+        )
+        if block_gdf is None:
+            return result
+        import geopandas as gpd
+
+        return gpd.GeoDataFrame(result, geometry=block_gdf.geometry.values[occupied], crs=block_gdf.crs)
+
+
+def distance_ratio(mta, subway):
+    """
+    MTA / SUBWAY distance ratio per block: 1 where the two are equal (both 0
+    included), NaN where either is missing, inf where only SUBWAY is 0 and 0
+    where only MTA is 0
+    """
+    mta = np.asarray(mta, dtype=float)
+    subway = np.asarray(subway, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        quotient = mta / subway
+    return np.select(
+        [mta == subway, np.isnan(mta) | np.isnan(subway), subway == 0, mta == 0],
+        [1., np.nan, np.inf, 0.],
+        default=quotient,
+    )
@@ -0,0 +1,178 @@
+"""
+VIIRS night-lights mosaic, reduced and cropped window by window
+
+The output grid is the one rasterio.merge.merge() would build from the
+tiles, downsampled by `factor` with nanmax and cropped to a lon/lat box,
+but only the tile windows that intersect the box are ever read. Each tile's
+share of the crop is split into row strips; worker threads read a strip,
+mask / scale it and reduce it to the output blocks, and the main thread
+folds the blocks in with fmax, so a block straddling two tiles comes out as
+the max of both. Peak memory is a few full-resolution strips plus the
+(small) output array.
+
+    tiles = sorted(Path(".").rglob("*avg_rade9h.tif"))
+    us_radiance, us_transform = reduce_mosaic(tiles, US_BOUNDS, factor=8)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.transform import Affine
+from rasterio.windows import Window
+
+US_BOUNDS = (-130, 20, -60, 55)  # left, bottom, right, top
+FACTOR = 8
+STRIP_ROWS = 64  # output rows per task, i.e. STRIP_ROWS * factor source rows
+
+
+def tile_info(paths):
+    """Per-tile metadata (bounds, size, res, nodata, scale, overviews), headers only"""
+    tiles = []
+    for path in paths:
+        with rasterio.open(path) as src:
+            if not src.transform.is_rectilinear or src.transform.a < 0 or src.transform.e > 0:
+                raise RuntimeError(f"{path}: only north-up, non-rotated rasters can be mosaicked")
+            tiles.append({
+                "path": path,
+                "crs": src.crs.to_string(),
+                "bounds": src.bounds,
+                "height": src.height,
+                "width": src.width,
+                "res": src.res,
+                "nodata": src.nodata,
+                "scale": float(src.tags().get("SCALE_FACTOR", 1.0)),
+                "overviews": src.overviews(1),
+            })
+    crs = {tile["crs"] for tile in tiles}
+    if len(crs) > 1:
+        raise RuntimeError(f"Multiple CRSs detected ({crs}); reproject before merging.")
+    # Tiles are placed on the first tile's pixel grid; merge() would resample the others
+    res = {tile["res"] for tile in tiles}
+    if len(res) > 1:
+        raise RuntimeError(f"Multiple resolutions detected ({res}); resample before merging.")
+    return tiles
+
+
+def mosaic_grid(tiles):
+    """(transform, height, width) of the mosaic merge() would allocate"""
+    res_x, res_y = tiles[0]["res"]
+    west = min(tile["bounds"].left for tile in tiles)
+    east = max(tile["bounds"].right for tile in tiles)
+    south = min(tile["bounds"].bottom for tile in tiles)
+    north = max(tile["bounds"].top for tile in tiles)
+    transform = Affine.translation(west, north) * Affine.scale(res_x, -res_y)
+    return transform, int(round((north - south) / res_y)), int(round((east - west) / res_x))
+
+
+def crop_window(transform, height, width, bounds):
+    """Pixel window of a lon/lat box, widened to whole pixels and clipped to the grid"""
+    left, bottom, right, top = bounds
+    col_min, row_min = ~transform * (left, top)
+    col_max, row_max = ~transform * (right, bottom)
+    row_min = int(max(0, np.floor(row_min)))
+    row_max = int(min(height, np.ceil(row_max)))
+    col_min = int(max(0, np.floor(col_min)))
+    col_max = int(min(width, np.ceil(col_max)))
+    return Window.from_slices((row_min, row_max), (col_min, col_max))
+
+
+def overview_decimation(overviews, factor, *extents):
+    """
+    Largest overview level that divides `factor` and every one of `extents`
+    (the tile's offset in the mosaic and its size), so overview pixels line up
+    with the output blocks; 1 if none does
+    """
+    usable = [d for d in overviews if factor % d == 0 and all(n % d == 0 for n in extents)]
+    return max(usable, default=1)
+
+
+def block_nanmax(values, factor):
+    """nanmax over factor x factor blocks of an array whose shape is a multiple of factor"""
+    rows, cols = values.shape
+    blocks = values.reshape(rows // factor, factor, cols // factor, factor)
+    # fmax skips NaN and leaves all-NaN blocks NaN, without nanmax's warning
+    return np.fmax.reduce(np.fmax.reduce(blocks, axis=3), axis=1)
+
+
+def _reduce_strip(task):
+    """Read one tile window, mask and scale it, and nanmax it to output blocks"""
+    tile, d, window, out_shape, pad, factor, slot = task
+    with rasterio.open(tile["path"]) as src:
+        if d > 1:
+            values = src.read(1, window=window, out_shape=out_shape, resampling=Resampling.nearest)
+        else:
+            values = src.read(1, window=window)
+    values = values.astype("float32")
+    if tile["nodata"] is not None:
+        values[values == tile["nodata"]] = np.nan
+    values *= tile["scale"]
+    values[values <= 0] = np.nan
+
+    # Pad with NaN so the strip starts and ends on output block edges
+    (top, bottom), (left, right) = pad
+    values = np.pad(values, ((top, bottom), (left, right)), constant_values=np.nan)
+    return slot, block_nanmax(values, factor // d)
+
+
+def _tile_tasks(tile, mosaic_transform, crop, factor, use_overviews, strip_rows):
+    """Strip tasks covering the tile's part of the crop (crop in output pixels)"""
+    res_x, res_y = tile["res"]
+    row_off = int(round((mosaic_transform.f - tile["bounds"].top) / res_y))
+    col_off = int(round((tile["bounds"].left - mosaic_transform.c) / res_x))
+    d = 1
+    if use_overviews:
+        d = overview_decimation(tile["overviews"], factor, row_off, col_off, tile["height"], tile["width"])
+    f = factor // d
+
+    # Everything below is in units of the (possibly decimated) source grid
+    row_off, col_off = row_off // d, col_off // d
+    height, width = tile["height"] // d, tile["width"] // d
+    r0 = max(crop.row_off * f, row_off)
+    r1 = min((crop.row_off + crop.height) * f, row_off + height)
+    c0 = max(crop.col_off * f, col_off)
+    c1 = min((crop.col_off + crop.width) * f, col_off + width)
+    if r0 >= r1 or c0 >= c1:
+        return
+
+    out_c0, out_c1 = c0 // f, -(-c1 // f)
+    for out_r0 in range(r0 // f, -(-r1 // f), strip_rows):
+        out_r1 = min(out_r0 + strip_rows, -(-r1 // f))
+        s0, s1 = max(out_r0 * f, r0), min(out_r1 * f, r1)
+        pad = ((s0 - out_r0 * f, out_r1 * f - s1), (c0 - out_c0 * f, out_c1 * f - c1))
+        # Source window in full-resolution tile pixels
+        window = Window.from_slices(((s0 - row_off) * d, (s1 - row_off) * d),
+                                    ((c0 - col_off) * d, (c1 - col_off) * d))
+        slot = (slice(out_r0 - crop.row_off, out_r1 - crop.row_off),
+                slice(out_c0 - crop.col_off, out_c1 - crop.col_off))
+        yield tile, d, window, (s1 - s0, c1 - c0), pad, factor, slot
+
+
+def reduce_mosaic(paths, bounds=US_BOUNDS, factor=FACTOR, use_overviews=False,
+                  max_workers=None, strip_rows=STRIP_ROWS):
+    """
+    (radiance, transform): the nanmax-downsampled mosaic of `paths` cropped to
+    `bounds` (left, bottom, right, top in the tiles' CRS), as float32 with NaN
+    for nodata, non-positive and uncovered pixels
+
+    use_overviews - read from the tiles' overviews where one lines up with the
+                    output blocks. Much less I/O, but the max is then taken over
+                    overview pixels (resampled when they were built), so small
+                    bright spots can dim; leave off for the final render
+    """
+    tiles = tile_info(paths)
+    if not tiles:
+        raise RuntimeError("No tiles to mosaic.")
+    mosaic_transform, height, width = mosaic_grid(tiles)
+    ds_transform = mosaic_transform * Affine.scale(factor, factor)
+    crop = crop_window(ds_transform, -(-height // factor), -(-width // factor), bounds)
+
+    radiance = np.full((crop.height, crop.width), np.nan, dtype="float32")
+    tasks = [task for tile in tiles
+             for task in _tile_tasks(tile, mosaic_transform, crop, factor, use_overviews, strip_rows)]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for slot, block in pool.map(_reduce_strip, tasks):
+            np.fmax(radiance[slot], block, out=radiance[slot])
+
+    return radiance, ds_transform * Affine.translation(crop.col_off, crop.row_off)
@@ -0,0 +1,780 @@
+import argparse
+import io
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import build_manifest
+import generate_challenges
+import normalize
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def print_table(headers: List[str], rows: List[List[str]]) -> None:
+    widths = [max(len(str(c)) for c in col) for col in zip(headers, *rows)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
+
+
+API_PREFIX = "/api/contents"
+
+
+class CountingHandler(SimpleHTTPRequestHandler):
+    """Static file server that also emulates the GitHub contents API."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self) -> None:
+        with self.server.lock:
+            self.server.request_count += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+    def _serve_contents_api(self) -> None:
+        if self.server.rate_limited:
+            self.send_error(403, "API rate limit exceeded")
+            return
+        rel_path = urllib.parse.unquote(self.path[len(API_PREFIX):]).strip("/")
+        target = REPO_ROOT / rel_path
+        if not target.is_dir():
+            self.send_error(404)
+            return
+        entries = build_manifest.list_directory(target, rel_path) if rel_path else [
+            {"type": "dir" if p.is_dir() else "file", "name": p.name, "path": p.name}
+            for p in sorted(target.iterdir())
+        ]
+        body = json.dumps(entries).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._count()
+        if self.path.startswith(API_PREFIX):
+            self._serve_contents_api()
+        else:
+            super().do_GET()
+
+    def do_HEAD(self):
+        self._count()
+        super().do_HEAD()
+
+
+class StaticServer:
+    def __init__(self, root: Path, latency_ms: float):
+        handler = partial(CountingHandler, directory=str(root))
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.lock = threading.Lock()
+        self.httpd.request_count = 0
+        self.httpd.latency = latency_ms / 1000.0
+        self.httpd.rate_limited = False
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "StaticServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset(self, rate_limited: bool = False) -> None:
+        with self.httpd.lock:
+            self.httpd.request_count = 0
+            self.httpd.rate_limited = rate_limited
+
+    @property
+    def request_count(self) -> int:
+        return self.httpd.request_count
+
+    def url(self, path: str) -> str:
+        return self.base + "/" + urllib.parse.quote(path)
+
+    def api_url(self, path: str = "") -> str:
+        return self.base + API_PREFIX + ("/" + urllib.parse.quote(path) if path else "")
+
+
+def fetch(url: str, headers: Optional[Dict[str, str]] = None) -> Optional[bytes]:
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as resp:
+            return resp.read()
+    except urllib.error.HTTPError:
+        return None
+
+
+def content_length(url: str) -> Optional[int]:
+    # getContentLengthForUrl(): HEAD first, then a one-byte range GET
+    for method, headers in (("HEAD", {}), ("GET", {"Range": "bytes=0-0"})):
+        try:
+            request = urllib.request.Request(url, method=method, headers=headers)
+            with urllib.request.urlopen(request) as resp:
+                return int(resp.headers.get("Content-Length", ""))
+        except urllib.error.HTTPError:
+            continue
+        except ValueError:
+            return None
+    return None
+
+
+def fetch_listing(server: StaticServer, path: str) -> Optional[List[dict]]:
+    body = fetch(server.api_url(path))
+    return json.loads(body) if body is not None else None
+
+
+def probe_map_file_without_api(server: StaticServer, dir_name: str) -> Optional[dict]:
+    candidates = []
+    for ext in build_manifest.MAP_EXTENSION_PRIORITY:
+        candidates.append(f"{dir_name}/map.{ext}")
+        candidates.append(f"{dir_name}/MAP.{ext}")
+    for name in ["map.png", "maps.png", "maps.svg", "gif.gif", "gif_sm.gif", "map.pdf"]:
+        candidates.append(f"{dir_name}/{build_manifest.MAP_SUBDIR}/{name}")
+
+    for path in candidates:
+        size = content_length(server.url(path))
+        if size is not None and size > build_manifest.MIN_MAP_SIZE:
+            return {"path": path, "size": size}
+    return None
+
+
+def find_map_file(server: StaticServer, dir_name: str) -> Optional[dict]:
+    # Same decision order as findMapFile() in index.html on GitHub Pages
+    forced = build_manifest.FORCED_MAP_FILES.get(dir_name)
+    if forced:
+        # Forced files carry no size, so the page accepts them without a request
+        return {"path": forced}
+
+    entries = fetch_listing(server, dir_name)
+    if entries is None:
+        return probe_map_file_without_api(server, dir_name)
+
+    top_level = build_manifest.select_best_file(entries)
+    if top_level and top_level["exact"]:
+        return top_level["file"]
+
+    subdir = next(
+        (e for e in entries if e["type"] == "dir" and e["name"].lower() == build_manifest.MAP_SUBDIR),
+        None,
+    )
+    if subdir:
+        sub_entries = fetch_listing(server, subdir["path"]) or []
+        sub_choice = build_manifest.select_best_file(sub_entries)
+        if sub_choice:
+            return sub_choice["file"]
+
+    if top_level:
+        return top_level["file"]
+    return probe_map_file_without_api(server, dir_name)
+
+
+def probe_description(server: StaticServer, dir_name: str) -> Optional[bytes]:
+    for source in build_manifest.DESCRIPTION_SOURCES:
+        body = fetch(server.url(f"{dir_name}/{source}"))
+        if body is not None:
+            return body
+    return None
+
+
+def signup_dir_names(signup_csv: Optional[bytes]) -> List[str]:
+    # toDirectoryListFromSignup(): folder names rebuilt from signup.csv
+    text = signup_csv.decode("utf-8") if signup_csv else ""
+    names = []
+    for date, info in build_manifest.parse_signup_challenges(io.StringIO(text)).items():
+        names.append(f"{date} - {(info['name'] or 'Map').replace(':', '-')}")
+    return sorted(names)
+
+
+def run_probing_client(server: StaticServer) -> Dict[str, float]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        signup_csv, _ = pool.map(fetch, [server.url("signup.csv"), server.url("introduction.md")])
+
+    root = fetch_listing(server, "")
+    if root is None:
+        dirs = signup_dir_names(signup_csv)
+    else:
+        dirs = sorted(
+            e["name"]
+            for e in root
+            if e["type"] == "dir" and build_manifest.CHALLENGE_DIR_PATTERN.match(e["name"])
+        )
+
+    first_render = None
+    rendered = []
+    for dir_name in dirs:
+        if find_map_file(server, dir_name):
+            rendered.append(dir_name)
+            if first_render is None:
+                first_render = time.perf_counter() - start
+    all_render = time.perf_counter() - start
+    gallery_requests = server.request_count
+
+    # Opening every card's modal pulls its description on demand
+    for dir_name in rendered:
+        probe_description(server, dir_name)
+    return {
+        "first_render": first_render or all_render,
+        "all_render": all_render,
+        "gallery_requests": gallery_requests,
+        "modal_requests": server.request_count - gallery_requests,
+        "cards": len(rendered),
+    }
+
+
+def run_manifest_client(server: StaticServer) -> Dict[str, float]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        manifest_future = pool.submit(fetch, server.url("manifest.json"))
+        pool.submit(fetch, server.url("introduction.md"))
+        manifest = json.loads(manifest_future.result())
+        cards = [m for m in manifest["maps"] if m["map"]]
+        first_render = time.perf_counter() - start
+    all_render = time.perf_counter() - start
+    return {
+        "first_render": first_render,
+        "all_render": all_render,
+        "gallery_requests": server.request_count,
+        # Descriptions are embedded in the manifest
+        "modal_requests": 0,
+        "cards": len(cards),
+    }
+
+
+def bench_manifest(args: argparse.Namespace) -> int:
+    build_manifest.main()
+
+    # (label, client, whether the contents API answers 403 like a rate-limited visitor)
+    clients: List[Tuple[str, Callable[[StaticServer], Dict[str, float]], bool]] = [
+        ("contents API", run_probing_client, False),
+        ("rate-limited probing", run_probing_client, True),
+        ("manifest", run_manifest_client, False),
+    ]
+    rows = []
+    with StaticServer(REPO_ROOT, args.latency_ms) as server:
+        for name, client, rate_limited in clients:
+            runs = []
+            for _ in range(args.rounds):
+                server.reset(rate_limited=rate_limited)
+                runs.append(client(server))
+            rows.append(
+                [
+                    name,
+                    f"{runs[0]['cards']:.0f}",
+                    f"{runs[0]['gallery_requests']:.0f}",
+                    f"{runs[0]['modal_requests']:.0f}",
+                    f"{statistics.median(r['first_render'] for r in runs) * 1000:.1f}",
+                    f"{statistics.median(r['all_render'] for r in runs) * 1000:.1f}",
+                ]
+            )
+
+    print(f"\nGallery load against a local static server (latency {args.latency_ms:g} ms/request, "
+          f"median of {args.rounds} rounds)\n")
+    print_table(
+        ["path", "cards", "requests", "modal requests", "first render ms", "all cards ms"],
+        rows,
+    )
+    return 0
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def write_synthetic_workbook(path: Path, n_rows: int) -> None:
+    import openpyxl
+    from datetime import datetime, timedelta
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([None, None, None, "Sign up here!"])
+    ws.append(["Date", "Challenge Name", "Description", "Member 1", "Member 2 (optional)", "Member 3 (optional)"])
+    start = datetime(2025, 11, 1)
+    for i in range(n_rows):
+        ws.append(
+            [
+                start + timedelta(days=i % 3650),
+                f"Challenge {i}: theme/{i % 30}",
+                f"Synthetic description for challenge number {i}. " * 3,
+                f"@member-{i % 997}",
+                f"Person {i % 101}; @other-{i % 53}" if i % 2 else None,
+                "n/a" if i % 5 == 0 else None,
+            ]
+        )
+    wb.save(path)
+
+
+def synthetic_workbook(n_rows: int) -> Path:
+    workbook = Path(tempfile.gettempdir()) / f"30dom_signup_{n_rows}.xlsx"
+    if not workbook.exists():
+        print(f"Writing synthetic {n_rows}-row workbook to {workbook} ...")
+        write_synthetic_workbook(workbook, n_rows)
+    return workbook
+
+
+def ingest_rows(path: Path, streaming: bool) -> int:
+    # Everything main() does per row short of touching the output folders
+    rows = generate_challenges.iter_signup_rows(path, streaming=streaming)
+    headers = generate_challenges.get_headers(next(rows, []))
+    member_cols = list(range(3, len(headers)))
+    processed = 0
+    for values in rows:
+        members = generate_challenges.extract_members(values, member_cols)
+        date_text = generate_challenges.try_format_date(values[0])
+        title = generate_challenges.safe_filename_component(str(values[1] or ""))
+        generate_challenges.generate_readme_content(title, date_text, values[2], members)
+        processed += 1
+    return processed
+
+
+def ingest_worker(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    processed = ingest_rows(Path(args.path), streaming=args.mode == "streaming")
+    print(
+        json.dumps(
+            {"rows": processed, "seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()}
+        )
+    )
+    return 0
+
+
+def bench_ingest(args: argparse.Namespace) -> int:
+    workbook = synthetic_workbook(args.rows)
+
+    rows = []
+    # Each mode runs in a fresh interpreter so peak RSS is not shared between them
+    for mode in ["in-memory", "streaming"]:
+        result = subprocess.run(
+            [sys.executable, __file__, "_ingest-worker", mode, str(workbook)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        peak = stats["peak_rss_mb"]
+        rows.append(
+            [mode, f"{stats['rows']}", f"{stats['seconds']:.2f}", "n/a" if peak is None else f"{peak:.0f}"]
+        )
+
+    print(f"\nSignup ingestion, {args.rows} rows ({workbook.stat().st_size / 1e6:.1f} MB xlsx)\n")
+    print_table(["mode", "rows", "wall s", "peak RSS MB"], rows)
+    return 0
+
+
+def export_text_sources(workbook: Path) -> Dict[str, Path]:
+    import csv
+
+    csv_path = workbook.with_suffix(".csv")
+    jsonl_path = workbook.with_suffix(".jsonl")
+    if csv_path.exists() and jsonl_path.exists():
+        return {".csv": csv_path, ".jsonl": jsonl_path}
+
+    rows = generate_challenges.iter_signup_rows(workbook)
+    headers = generate_challenges.get_headers(next(rows))
+    with csv_path.open("w", newline="", encoding="utf-8") as csv_file, jsonl_path.open(
+        "w", encoding="utf-8"
+    ) as jsonl_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(headers)
+        for values in rows:
+            values = [v.strftime("%m-%d-%Y") if hasattr(v, "strftime") else v for v in values]
+            writer.writerow(["" if v is None else v for v in values])
+            jsonl_file.write(json.dumps(dict(zip(headers, values)), ensure_ascii=False) + "\n")
+    return {".csv": csv_path, ".jsonl": jsonl_path}
+
+
+def bench_sources(args: argparse.Namespace) -> int:
+    workbook = synthetic_workbook(args.rows)
+    sources = {".xlsx": workbook, **export_text_sources(workbook)}
+
+    timings: Dict[str, List[float]] = {}
+    for suffix, path in sources.items():
+        timings[suffix] = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            for _ in generate_challenges.iter_signup_rows(path):
+                pass
+            timings[suffix].append(time.perf_counter() - start)
+
+    xlsx_time = statistics.median(timings[".xlsx"])
+    rows = []
+    for suffix, path in sources.items():
+        median = statistics.median(timings[suffix])
+        rows.append(
+            [
+                suffix,
+                f"{path.stat().st_size / 1e6:.1f}",
+                f"{median:.3f}",
+                f"{args.rows / median:,.0f}",
+                f"{xlsx_time / median:.1f}x",
+            ]
+        )
+
+    print(f"\nSignup source readers, {args.rows} rows (median of {args.rounds} rounds)\n")
+    print_table(["source", "MB", "read s", "rows/s", "vs xlsx"], rows)
+    return 0
+
+
+def synthetic_outputs(root: Path, n_folders: int, revision: int, changed_every: int) -> List[dict]:
+    targets = []
+    for i in range(n_folders):
+        folder = root / f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} - Challenge {i}"
+        # Every changed_every-th folder gets a new member list in this revision
+        bump = revision if changed_every and i % changed_every == 0 else 0
+        members = [f"@member-{i}", f"@member-{i + bump}"]
+        contents = {
+            "README.md": generate_challenges.generate_readme_content(
+                f"Challenge {i}", "2025-11-01", f"Description {i}", members
+            ),
+            "requirements.txt": generate_challenges.REQUIREMENTS_CONTENT,
+            "ENVIRONMENT.md": generate_challenges.generate_environment_md(),
+        }
+        for name in generate_challenges.GENERATED_FILES:
+            targets.append({"path": folder / name, "content": contents[name], "hash_matches": False})
+    return targets
+
+
+def write_serial(targets: List[dict], latency: float) -> None:
+    # The original per-row loop: mkdir, then read-compare-write each file in turn
+    current_folder = None
+    for target in targets:
+        path = target["path"]
+        if path.parent != current_folder:
+            current_folder = path.parent
+            time.sleep(latency)
+            current_folder.mkdir(parents=True, exist_ok=True)
+        time.sleep(latency)
+        existing = None
+        if path.exists():
+            time.sleep(latency)
+            existing = path.read_text(encoding="utf-8")
+        if existing != target["content"]:
+            path.write_text(target["content"], encoding="utf-8")
+            time.sleep(latency)
+
+
+def write_bulk(targets: List[dict], latency: float, jobs: int) -> None:
+    inspect_target = generate_challenges.inspect_target
+    write_atomic = generate_challenges.write_atomic
+
+    def slow_inspect(target: dict) -> None:
+        time.sleep(latency)
+        inspect_target(target)
+
+    def slow_write(path: Path, content: str) -> None:
+        # Temp file create plus rename
+        time.sleep(2 * latency)
+        write_atomic(path, content)
+
+    generate_challenges.inspect_target = slow_inspect
+    generate_challenges.write_atomic = slow_write
+    try:
+        generate_challenges.write_generated_files(targets, jobs=jobs)
+    finally:
+        generate_challenges.inspect_target = inspect_target
+        generate_challenges.write_atomic = write_atomic
+
+
+def snapshot_tree(root: Path) -> Dict[str, bytes]:
+    return {str(p.relative_to(root)): p.read_bytes() for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def bench_writer(args: argparse.Namespace) -> int:
+    base = Path(tempfile.mkdtemp(prefix="30dom_writer_", dir=args.root))
+    latency = args.latency_ms / 1000.0
+    scenarios = [
+        # (label, revision, every n-th folder changed)
+        ("cold (all new)", 0, 0),
+        ("warm (unchanged)", 0, 0),
+        ("warm (10% changed)", 1, 10),
+    ]
+    rows = []
+    try:
+        roots = {"serial": base / "serial", "bulk": base / "bulk"}
+        for label, revision, changed_every in scenarios:
+            timings = {}
+            for mode, root in roots.items():
+                targets = synthetic_outputs(root, args.folders, revision, changed_every)
+                start = time.perf_counter()
+                if mode == "serial":
+                    write_serial(targets, latency)
+                else:
+                    write_bulk(targets, latency, args.jobs)
+                timings[mode] = time.perf_counter() - start
+            if snapshot_tree(roots["serial"]) != snapshot_tree(roots["bulk"]):
+                print(f"Output mismatch between serial and bulk writers in scenario '{label}'")
+                return 1
+            rows.append(
+                [
+                    label,
+                    f"{timings['serial'] * 1000:.0f}",
+                    f"{timings['bulk'] * 1000:.0f}",
+                    f"{timings['serial'] / timings['bulk']:.1f}x",
+                ]
+            )
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    print(
+        f"\nWriting {args.folders} folders x {len(generate_challenges.GENERATED_FILES)} files under {base.parent} "
+        f"(simulated latency {args.latency_ms:g} ms/op, {args.jobs} jobs); outputs identical\n"
+    )
+    print_table(["scenario", "serial ms", "bulk ms", "speedup"], rows)
+    if latency:
+        print(
+            "\nThe latency is injected with time.sleep and overlaps in the thread pool, so these "
+            "speedups are synthetic; point --root at a real network or overlay mount to measure one."
+        )
+    return 0
+
+
+def legacy_try_format_date(value: object) -> Optional[str]:
+    # Pre-normalize.py implementation, kept as the regression baseline
+    import re
+    from datetime import date, datetime
+
+    if isinstance(value, datetime):
+        return value.date().strftime("%Y-%m-%d")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, str):
+        text = value.strip()
+        m = re.match(r"^(\d{1,2})[-/](\d{1,2})[-/](\d{4})$", text)
+        if m:
+            mm, dd, yyyy = m.groups()
+            try:
+                dt = datetime(int(yyyy), int(mm), int(dd))
+                return dt.strftime("%Y-%m-%d")
+            except ValueError:
+                return None
+        return None
+    return None
+
+
+def legacy_safe_filename_component(text: str, max_length: int = 80) -> str:
+    import re
+
+    if not text:
+        return "unknown"
+    cleaned = re.sub(r"[\\/\0\n\r\t]+", "-", text)
+    cleaned = re.sub(r"[:*?\"<>|]+", "-", cleaned)
+    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    if len(cleaned) > max_length:
+        cleaned = cleaned[:max_length].rstrip()
+    return cleaned
+
+
+def legacy_extract_members(values: List[object], member_cols: List[int]) -> List[str]:
+    import re
+
+    members: List[str] = []
+    for col in member_cols:
+        if col >= len(values):
+            continue
+        cell_val = values[col]
+        if cell_val is None:
+            continue
+        text = str(cell_val).strip()
+        if not text:
+            continue
+        parts = re.split(r"[,;\n]+", text)
+        for p in parts:
+            name = p.strip()
+            if name and name.lower() not in {"n/a", "na", "none", "-"}:
+                members.append(name)
+    seen = set()
+    deduped: List[str] = []
+    for m in members:
+        if m.lower() in seen:
+            continue
+        seen.add(m.lower())
+        deduped.append(m)
+    return deduped
+
+
+def synthetic_cells(n_cells: int, n_distinct: int) -> Dict[str, List[object]]:
+    import random
+    from datetime import datetime, timedelta
+
+    rng = random.Random(30)
+    start = datetime(2025, 11, 1)
+    date_pool: List[object] = []
+    for i in range(n_distinct):
+        day = start + timedelta(days=i % 730)
+        kind = i % 4
+        if kind == 0:
+            date_pool.append(day)
+        elif kind == 1:
+            date_pool.append(f"{day.month}-{day.day}-{day.year}")
+        elif kind == 2:
+            date_pool.append(f" {day.month:02d}/{day.day:02d}/{day.year} ")
+        else:
+            date_pool.append(f"{day:%B} {day.day}")
+    title_pool = [
+        f"Challenge {i}: Lines / Polygons <{i % 7}>\tdraft?  " + "x" * (i % 90) for i in range(n_distinct)
+    ]
+    member_pool: List[object] = []
+    for i in range(n_distinct):
+        names = [f"@member-{(i * k) % n_distinct}" for k in range(1, 1 + i % 4)]
+        if i % 5 == 0:
+            names.append("N/A")
+        if i % 3 == 0 and names:
+            names.append(names[0].upper())
+        member_pool.append(";\n".join(names) if i % 2 else ", ".join(names))
+    member_pool[0] = None
+
+    def column(pool: List[object]) -> List[object]:
+        return [rng.choice(pool) for _ in range(n_cells)]
+
+    return {"date": column(date_pool), "title": column(title_pool), "member": column(member_pool)}
+
+
+def benchmark_stats(func: Callable[[], object], rounds: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(rounds):
+        # Every round starts cold, like a fresh generator run
+        normalize.clear_caches()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.mean(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "median": statistics.median(timings),
+        "rounds": rounds,
+    }
+
+
+def bench_normalize(args: argparse.Namespace) -> int:
+    cells = synthetic_cells(args.cells, args.distinct)
+    dates = cells["date"]
+    titles = [str(v or "").strip() for v in cells["title"]]
+    member_rows = [[v] for v in cells["member"]]
+
+    cases: List[Tuple[str, str, Callable[[], List[object]]]] = [
+        ("dates", "legacy", lambda: [legacy_try_format_date(v) for v in dates]),
+        ("dates", "per-cell", lambda: [normalize.format_date(v) for v in dates]),
+        ("dates", "column", lambda: normalize.format_date_column(dates)),
+        ("folders", "legacy", lambda: [legacy_safe_filename_component(v) for v in titles]),
+        ("folders", "per-cell", lambda: [normalize.folder_component(v) for v in titles]),
+        ("folders", "column", lambda: normalize.folder_component_column(cells["title"])),
+        ("members", "legacy", lambda: [legacy_extract_members(r, [0]) for r in member_rows]),
+        ("members", "per-cell", lambda: [normalize.extract_members(r, [0]) for r in member_rows]),
+        ("members", "column", lambda: normalize.member_column(cells["member"])),
+    ]
+
+    # Every implementation must agree with the legacy output before timings mean anything
+    expected: Dict[str, List[object]] = {}
+    for group, label, func in cases:
+        normalize.clear_caches()
+        result = func()
+        if label == "legacy":
+            expected[group] = result
+        elif result != expected[group]:
+            print(f"Output mismatch for {group} ({label}) against the legacy implementation")
+            return 1
+
+    rows = []
+    for group, label, func in cases:
+        stats = benchmark_stats(func, args.rounds)
+        rows.append(
+            [
+                f"{group}[{label}]",
+                *(f"{stats[k] * 1000:.2f}" for k in ["min", "max", "mean", "stddev", "median"]),
+                str(stats["rounds"]),
+                f"{args.cells / stats['mean'] / 1000:,.1f}",
+            ]
+        )
+
+    print(
+        f"\nNormalization, {args.cells:,} cells per column drawn from {args.distinct:,} distinct values "
+        f"({args.rounds} cold-cache rounds); outputs identical to legacy\n"
+    )
+    print_table(["name", "min ms", "max ms", "mean ms", "stddev ms", "median ms", "rounds", "Kcells/s"], rows)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks for the repository tooling.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    p = subparsers.add_parser("manifest", help="Gallery load: manifest.json vs per-visitor probing")
+    p.add_argument("--rounds", type=int, default=5)
+    p.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="Artificial per-request latency to emulate a remote host",
+    )
+    p.set_defaults(func=bench_manifest)
+
+    p = subparsers.add_parser("ingest", help="Workbook ingestion: streaming vs in-memory")
+    p.add_argument("--rows", type=int, default=50_000)
+    p.set_defaults(func=bench_ingest)
+
+    p = subparsers.add_parser("sources", help="Signup readers: xlsx vs CSV vs JSONL")
+    p.add_argument("--rows", type=int, default=50_000)
+    p.add_argument("--rounds", type=int, default=3)
+    p.set_defaults(func=bench_sources)
+
+    p = subparsers.add_parser("writer", help="Folder writer: serial per-row vs bulk thread pool")
+    p.add_argument("--folders", type=int, default=300)
+    p.add_argument("--jobs", type=int, default=generate_challenges.DEFAULT_JOBS)
+    p.add_argument(
+        "--root",
+        help="Directory to write under, e.g. a network or overlay mount (default: system temp)",
+    )
+    p.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="Artificial latency per filesystem operation to emulate a remote filesystem",
+    )
+    p.set_defaults(func=bench_writer)
+
+    p = subparsers.add_parser("normalize", help="Cell normalization: legacy regexes vs compiled + memoized")
+    p.add_argument("--cells", type=int, default=100_000)
+    p.add_argument("--distinct", type=int, default=2_000)
+    p.add_argument("--rounds", type=int, default=10)
+    p.set_defaults(func=bench_normalize)
+
+    p = subparsers.add_parser("_ingest-worker")
+    p.add_argument("mode", choices=["in-memory", "streaming"])
+    p.add_argument("path")
+    p.set_defaults(func=ingest_worker)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+import csv
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# Keep in sync with CONFIG.mapExtensionPriority in index.html
+MAP_EXTENSION_PRIORITY = ["html", "mp4", "m4v", "webm", "png", "jpg", "jpeg", "gif", "svg", "pdf"]
+DESCRIPTION_SOURCES = ["DESCRIPTION.md", "BLUESKY.md", "README.md"]
+MAP_SUBDIR = "map"
+# Files at or below this size are empty or truncated placeholders
+MIN_MAP_SIZE = 50
+
+# Keep in sync with FORCED_MAP_FILES / CARD_PREVIEW_IMAGES in index.html
+FORCED_MAP_FILES: Dict[str, str] = {
+    "2025-11-03 - Polygons": "2025-11-03 - Polygons/map/maps.png",
+}
+CARD_PREVIEW_IMAGES: Dict[str, str] = {
+    "2025-11-14 - Data challenge- OpenStreetMap": "2025-11-14 - Data challenge- OpenStreetMap/osm.png",
+    "2025-11-15 - Fire": "2025-11-15 - Fire/fire.png",
+    "2025-11-10 - Air": "2025-11-10 - Air/air.png",
+}
+
+CHALLENGE_DIR_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}")
+SIGNUP_MEMBER_COLUMNS = [
+    ("Member 1", "Member 1 website"),
+    ("Member 2 (optional)", "Member 2 website"),
+]
+
+MANIFEST_VERSION = 1
+
+
+def get_extension(name: str) -> str:
+    parts = name.lower().split(".")
+    return parts[-1] if len(parts) > 1 else ""
+
+
+def list_directory(path: Path, rel_path: str) -> List[dict]:
+    entries: List[dict] = []
+    with os.scandir(path) as it:
+        for entry in it:
+            is_dir = entry.is_dir()
+            entries.append(
+                {
+                    "type": "dir" if is_dir else "file",
+                    "name": entry.name,
+                    "path": f"{rel_path}/{entry.name}",
+                    "size": None if is_dir else entry.stat().st_size,
+                }
+            )
+    return sorted(entries, key=lambda e: e["name"])
+
+
+def is_renderable_file(entry: dict) -> bool:
+    if entry.get("type") != "file":
+        return False
+    if get_extension(entry["name"]) not in MAP_EXTENSION_PRIORITY:
+        return False
+    size = entry.get("size")
+    return size is None or size > MIN_MAP_SIZE
+
+
+def select_best_file(entries: List[dict]) -> Optional[dict]:
+    # Mirrors selectBestFile() in index.html so both paths pick the same asset
+    # 1) Prefer explicit map.<ext> files in extension priority
+    for ext in MAP_EXTENSION_PRIORITY:
+        for entry in entries:
+            if is_renderable_file(entry) and entry["name"].lower() == f"map.{ext}":
+                return {"file": entry, "extension": ext, "exact": True}
+
+    # 2) Fall back to the best available renderable file
+    candidates = []
+    for entry in entries:
+        if not is_renderable_file(entry):
+            continue
+        ext = get_extension(entry["name"])
+        size = entry.get("size")
+        candidates.append(
+            (
+                MAP_EXTENSION_PRIORITY.index(ext),
+                0 if "map" in entry["name"].lower() else 1,
+                -size if size is not None else 0,
+                entry,
+                ext,
+            )
+        )
+    if not candidates:
+        return None
+    candidates.sort(key=lambda c: c[:3])
+    best = candidates[0]
+    return {"file": best[3], "extension": best[4], "exact": False}
+
+
+def to_map_record(entry: dict, extension: str) -> dict:
+    return {"path": entry["path"], "extension": extension, "size": entry["size"]}
+
+
+def resolve_map_file(repo_root: Path, dir_name: str) -> Optional[dict]:
+    forced = FORCED_MAP_FILES.get(dir_name)
+    if forced:
+        forced_path = repo_root / forced
+        if forced_path.is_file() and forced_path.stat().st_size > MIN_MAP_SIZE:
+            return {
+                "path": forced,
+                "extension": get_extension(forced),
+                "size": forced_path.stat().st_size,
+            }
+
+    entries = list_directory(repo_root / dir_name, dir_name)
+    top_level = select_best_file(entries)
+    if top_level and top_level["exact"]:
+        return to_map_record(top_level["file"], top_level["extension"])
+
+    # Some challenge folders keep their final map in a map/ subdirectory
+    subdir = next(
+        (e for e in entries if e["type"] == "dir" and e["name"].lower() == MAP_SUBDIR),
+        None,
+    )
+    if subdir:
+        sub_choice = select_best_file(list_directory(repo_root / subdir["path"], subdir["path"]))
+        if sub_choice:
+            return to_map_record(sub_choice["file"], sub_choice["extension"])
+
+    if top_level:
+        return to_map_record(top_level["file"], top_level["extension"])
+    return None
+
+
+def resolve_description(repo_root: Path, dir_name: str) -> Optional[dict]:
+    for source in DESCRIPTION_SOURCES:
+        path = repo_root / dir_name / source
+        if path.is_file():
+            return {"source": source, "text": path.read_text(encoding="utf-8")}
+    return None
+
+
+def normalize_url(url: str) -> Optional[str]:
+    url = url.strip()
+    if not url:
+        return None
+    return url if url.startswith("http") else f"https://{url}"
+
+
+def parse_signup_challenges(lines: Iterable[str]) -> Dict[str, dict]:
+    challenges: Dict[str, dict] = {}
+    for row in csv.DictReader(lines):
+        date_parts = (row.get("Date") or "").strip().split("-")
+        if len(date_parts) != 3:
+            continue
+        # signup.csv stores MM-DD-YYYY; folders are keyed by YYYY-MM-DD
+        mm, dd, yyyy = date_parts
+        members = []
+        for name_col, url_col in SIGNUP_MEMBER_COLUMNS:
+            name = (row.get(name_col) or "").strip()
+            if name:
+                members.append({"name": name, "url": normalize_url(row.get(url_col) or "")})
+        challenges[f"{yyyy}-{mm}-{dd}"] = {
+            "name": (row.get("Challenge Name") or "").strip(),
+            "description": (row.get("Description") or "").strip(),
+            "members": members,
+        }
+    return challenges
+
+
+def load_signup_challenges(signup_csv: Path) -> Dict[str, dict]:
+    if not signup_csv.exists():
+        return {}
+    with signup_csv.open(newline="", encoding="utf-8") as f:
+        return parse_signup_challenges(f)
+
+
+def list_challenge_dirs(repo_root: Path) -> List[str]:
+    return sorted(
+        entry.name
+        for entry in os.scandir(repo_root)
+        if entry.is_dir() and CHALLENGE_DIR_PATTERN.match(entry.name)
+    )
+
+
+def build_manifest(repo_root: Path) -> dict:
+    maps: List[dict] = []
+    for dir_name in list_challenge_dirs(repo_root):
+        maps.append(
+            {
+                "dir": dir_name,
+                "map": resolve_map_file(repo_root, dir_name),
+                "preview": CARD_PREVIEW_IMAGES.get(dir_name),
+                "description": resolve_description(repo_root, dir_name),
+            }
+        )
+    return {
+        "version": MANIFEST_VERSION,
+        "challenges": load_signup_challenges(repo_root / "signup.csv"),
+        "maps": maps,
+    }
+
+
+def main() -> int:
+    repo_root = Path(__file__).resolve().parent.parent
+    manifest_path = repo_root / "manifest.json"
+
+    manifest = build_manifest(repo_root)
+    content = json.dumps(manifest, indent=2, ensure_ascii=False) + "\n"
+    existing = manifest_path.read_text(encoding="utf-8") if manifest_path.exists() else None
+    if existing != content:
+        manifest_path.write_text(content, encoding="utf-8")
+
+    with_maps = sum(1 for m in manifest["maps"] if m["map"])
+    print(
+        f"Manifest complete. {len(manifest['maps'])} challenge folder(s), {with_maps} with a map file."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,87 +1,124 @@
-import re
+import argparse
+import csv
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 
-import openpyxl
+from normalize import extract_members, parse_date_text
+from normalize import folder_component as safe_filename_component
+from normalize import format_date as try_format_date
 
 
 def is_date_like(value: object) -> bool:
     return isinstance(value, (datetime, date))
 
 
-def try_format_date(value: object) -> Optional[str]:
-    if isinstance(value, datetime):
-        return value.date().strftime("%Y-%m-%d")
-    if isinstance(value, date):
-        return value.strftime("%Y-%m-%d")
-    if isinstance(value, str):
-        text = value.strip()
-        # Accept common formats like MM-DD-YYYY or M-D-YYYY
-        m = re.match(r"^(\d{1,2})[-/](\d{1,2})[-/](\d{4})$", text)
-        if m:
-            mm, dd, yyyy = m.groups()
-            try:
-                dt = datetime(int(yyyy), int(mm), int(dd))
-                return dt.strftime("%Y-%m-%d")
-            except ValueError:
-                return None
-        return None
-    # Fall back to None for non-datetime; the README will still show raw text
-    return None
-
-
-def safe_filename_component(text: str, max_length: int = 80) -> str:
-    if not text:
-        return "unknown"
-    # Replace path separators and control characters
-    cleaned = re.sub(r"[\\/\0\n\r\t]+", "-", text)
-    # Replace characters that are problematic on common filesystems
-    cleaned = re.sub(r"[:*?\"<>|]+", "-", cleaned)
-    # Collapse spaces
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
-    # Trim length
-    if len(cleaned) > max_length:
-        cleaned = cleaned[:max_length].rstrip()
-    return cleaned
-
-
 DATE_HEADER = "Date"
 TITLE_HEADER = "Challenge Name"
 DESCRIPTION_HEADER = "Description"
+# Columns that sit next to the member names but are not names (e.g. "Member 1 website" in signup.csv)
+NON_MEMBER_HEADER_WORDS = ("website",)
+
+
+# Row 1 = title, row 2 = headers, data from row 3
+HEADER_ROW = 2
 
 
-def get_headers(ws) -> List[str]:
+def get_headers(header_values: List[object]) -> List[str]:
     # Headers are on the second row per provided sheet format
-    return [str(c.value).strip() if c.value is not None else "" for c in ws[2]]
+    return [str(v).strip() if v is not None else "" for v in header_values]
 
 
-def extract_members(values: List[object], member_cols: List[int]) -> List[str]:
-    members: List[str] = []
-    for col in member_cols:
-        if col >= len(values):
-            continue
-        cell_val = values[col]
-        if cell_val is None:
-            continue
-        text = str(cell_val).strip()
-        if not text:
-            continue
-        # Split common separators
-        parts = re.split(r"[,;\n]+", text)
-        for p in parts:
-            name = p.strip()
-            if name and name.lower() not in {"n/a", "na", "none", "-"}:
-                members.append(name)
-    # De-duplicate while preserving order
-    seen = set()
-    deduped: List[str] = []
-    for m in members:
-        if m.lower() in seen:
-            continue
-        seen.add(m.lower())
-        deduped.append(m)
-    return deduped
+def is_member_header(header: str) -> bool:
+    normalized = header.strip().lower()
+    return not any(word in normalized for word in NON_MEMBER_HEADER_WORDS)
+
+
+# Signup sources: each reader yields the header row first, then every data row, as lists of
+# cell values where blank cells are None and the Date column holds datetimes when parseable.
+
+
+def iter_workbook_rows(signup_path: Path, streaming: bool = True) -> Iterator[List[object]]:
+    # openpyxl is only needed for xlsx sources, and is by far the slowest import here
+    import openpyxl
+
+    if streaming:
+        # Read-only mode parses the sheet lazily, so memory stays flat however long it gets
+        wb = openpyxl.load_workbook(signup_path, read_only=True, data_only=True)
+        try:
+            for values in wb.active.iter_rows(min_row=HEADER_ROW, values_only=True):
+                yield list(values)
+        finally:
+            wb.close()
+    else:
+        wb = openpyxl.load_workbook(signup_path, data_only=True)
+        ws = wb.active
+        for r in range(HEADER_ROW, ws.max_row + 1):
+            yield [c.value for c in ws[r]]
+
+
+def normalize_text_rows(rows: Iterator[List[object]]) -> Iterator[List[object]]:
+    headers = next(rows, None)
+    if headers is None:
+        return
+    yield headers
+    normalized_headers = [str(h).strip().lower() if h is not None else "" for h in headers]
+    date_col = (
+        normalized_headers.index(DATE_HEADER.lower())
+        if DATE_HEADER.lower() in normalized_headers
+        else None
+    )
+    for values in rows:
+        # Empty cells come back as None from openpyxl
+        values = [None if v == "" else v for v in values]
+        if date_col is not None and date_col < len(values) and isinstance(values[date_col], str):
+            values[date_col] = parse_date_text(values[date_col])
+        yield values
+
+
+def iter_csv_rows(signup_path: Path, streaming: bool = True) -> Iterator[List[object]]:
+    # Same columns as the workbook, with the headers on the first line (e.g. signup.csv)
+    with signup_path.open(newline="", encoding="utf-8-sig") as f:
+        yield from normalize_text_rows(iter(csv.reader(f)))
+
+
+def iter_jsonl_rows(signup_path: Path, streaming: bool = True) -> Iterator[List[object]]:
+    # One object per line keyed by header; the first record fixes the column order
+    def records() -> Iterator[List[object]]:
+        headers: Optional[List[str]] = None
+        with signup_path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if headers is None:
+                    headers = list(record)
+                    yield list(headers)
+                else:
+                    headers.extend(k for k in record if k not in headers)
+                yield [record.get(h) for h in headers]
+
+    yield from normalize_text_rows(records())
+
+
+SIGNUP_READERS: Dict[str, Callable[..., Iterator[List[object]]]] = {
+    ".xlsx": iter_workbook_rows,
+    ".csv": iter_csv_rows,
+    ".jsonl": iter_jsonl_rows,
+}
+
+
+def iter_signup_rows(signup_path: Path, streaming: bool = True) -> Iterator[List[object]]:
+    reader = SIGNUP_READERS.get(signup_path.suffix.lower())
+    if reader is None:
+        supported = ", ".join(sorted(SIGNUP_READERS))
+        raise ValueError(f"Unsupported signup source '{signup_path.name}' (expected {supported})")
+    return reader(signup_path, streaming=streaming)
 
 
 def generate_readme_content(
@@ -136,9 +173,134 @@ def generate_environment_md() -> str:
     return "\n".join(lines)
 
 
-def main() -> int:
+REQUIREMENTS_CONTENT = "python>3.12\n"
+GENERATED_FILES = ["README.md", "requirements.txt", "ENVIRONMENT.md"]
+
+# Bump to invalidate every row in the state file, e.g. after a format change there
+STATE_VERSION = 1
+# Concurrent file operations; mostly helps on network and overlay filesystems
+DEFAULT_JOBS = 8
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def generator_fingerprint() -> str:
+    # Any edit to the generator or its templates changes every rendered file
+    digest = hashlib.sha256(f"state-v{STATE_VERSION}".encode("utf-8"))
+    scripts_dir = Path(__file__).resolve().parent
+    for name in ["generate_challenges.py", "normalize.py"]:
+        digest.update((scripts_dir / name).read_bytes())
+    return digest.hexdigest()
+
+
+def row_fingerprint(
+    folder_name: str,
+    title: str,
+    date_text: Optional[str],
+    description: Optional[str],
+    members: List[str],
+) -> str:
+    payload = json.dumps([folder_name, title, date_text, description, members], ensure_ascii=False)
+    return sha256_text(payload)
+
+
+def load_state(state_path: Path) -> dict:
+    if not state_path.exists():
+        return {}
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def save_state(state_path: Path, state: dict) -> None:
+    content = json.dumps(state, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+    existing = state_path.read_text(encoding="utf-8") if state_path.exists() else None
+    if existing != content:
+        state_path.write_text(content, encoding="utf-8")
+
+
+def outputs_present(folder_path: Path, row_state: dict) -> bool:
+    return all((folder_path / name).is_file() for name in row_state.get("files", {}))
+
+
+def inspect_target(target: dict) -> None:
+    # One stat or read per file: unchanged-hash files only need to exist, the rest are compared
+    path = target["path"]
+    if target["hash_matches"]:
+        target["existing"] = target["content"] if path.is_file() else None
+    else:
+        try:
+            target["existing"] = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            target["existing"] = None
+    target["written"] = False
+
+
+def write_atomic(path: Path, content: str) -> None:
+    # Readers never see a half-written file; the temp file sits next to the target so the
+    # rename stays on one filesystem
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp_path.open("x", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_generated_files(targets: List[dict], jobs: int = DEFAULT_JOBS) -> None:
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        list(pool.map(inspect_target, targets))
+        pending = [t for t in targets if t["existing"] != t["content"]]
+        for folder in sorted({t["path"].parent for t in pending}):
+            folder.mkdir(parents=True, exist_ok=True)
+        list(pool.map(lambda t: write_atomic(t["path"], t["content"]), pending))
+    for target in pending:
+        target["written"] = True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate challenge folders from the signup sheet.")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the state file and re-render every row",
+    )
+    parser.add_argument(
+        "--source",
+        type=Path,
+        help="Signup source (.xlsx, .csv or .jsonl); defaults to the sheet in _signup_sheet/",
+    )
+    parser.add_argument(
+        "--no-streaming",
+        dest="streaming",
+        action="store_false",
+        help="Load the whole workbook into memory instead of streaming it row by row",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Concurrent file reads/writes (default: {DEFAULT_JOBS})",
+    )
+    args = parser.parse_args(argv)
+
     repo_root = Path(__file__).resolve().parent.parent
-    signup_path = repo_root / "_signup_sheet" / "30 Days of Mapping Sign-up.xlsx"
+    signup_path = args.source or repo_root / "_signup_sheet" / "30 Days of Mapping Sign-up.xlsx"
+    state_path = repo_root / "_signup_sheet" / "generate_state.json"
     output_root = repo_root
 
     if not signup_path.exists():
@@ -147,19 +309,40 @@ def main() -> int:
 
     output_root.mkdir(parents=True, exist_ok=True)
 
-    wb = openpyxl.load_workbook(signup_path, data_only=True)
-    ws = wb.active
+    previous_state = {} if args.force else load_state(state_path)
+    generator_hash = generator_fingerprint()
+    source_hash = sha256_file(signup_path)
+    previous_rows: Dict[str, dict] = (
+        previous_state.get("rows", {}) if previous_state.get("generator") == generator_hash else {}
+    )
+
+    # Same sheet, same generator and nothing deleted on disk: skip loading the workbook
+    if (
+        previous_rows
+        and previous_state.get("source") == source_hash
+        and all(outputs_present(output_root / name, row) for name, row in previous_rows.items())
+    ):
+        print(f"Generation complete. Signup sheet unchanged; {len(previous_rows)} row(s) unchanged.")
+        return 0
+
+    try:
+        rows = iter_signup_rows(signup_path, streaming=args.streaming)
+    except ValueError as e:
+        print(e)
+        return 1
 
-    headers = get_headers(ws)
+    headers = get_headers(next(rows, []))
     normalized_headers = [h.strip().lower() for h in headers]
     try:
         date_col = normalized_headers.index(DATE_HEADER.lower())
     except ValueError:
+        rows.close()
         print(f"Missing required header: '{DATE_HEADER}' in row 1")
         return 1
     try:
         title_col = normalized_headers.index(TITLE_HEADER.lower())
     except ValueError:
+        rows.close()
         print(f"Missing required header: '{TITLE_HEADER}' in row 1")
         return 1
     description_col = (
@@ -167,20 +350,32 @@ def main() -> int:
         if DESCRIPTION_HEADER.lower() in normalized_headers
         else None
     )
-    # All other columns (except the three above) are member columns
+    # All other columns (except the three above and website columns) are member columns
     member_cols = [
         i
-        for i, _ in enumerate(headers)
-        if i not in {date_col, title_col} and (description_col is None or i != description_col)
+        for i, header in enumerate(headers)
+        if i not in {date_col, title_col}
+        and (description_col is None or i != description_col)
+        and is_member_header(header)
     ]
 
     created_count = 0
     updated_count = 0
-
-    # Data starts from row 3 (row 1 = title, row 2 = headers)
-    for r in range(3, ws.max_row + 1):
-        row_cells = ws[r]
-        values = [c.value for c in row_cells]
+    skipped_count = 0
+    # State per folder, in the order the folders last appear; a repeated title keeps only its
+    # last row, as it did when every row was written in turn
+    rows_state: Dict[str, dict] = {}
+    # Rendered files of the folders whose last row differs from the stored state. Unchanged
+    # rows are reduced to their hash, so memory grows with the changed rows only
+    pending_rows: Dict[str, dict] = {}
+
+    # Each row is hashed (and rendered if changed) as it is read; nothing holds on to the sheet
+    for values in rows:
+        if len(values) > len(headers):
+            # Streamed rows are not padded to the sheet width; extra columns count as members,
+            # as they do when the whole sheet is loaded
+            member_cols.extend(range(len(headers), len(values)))
+            headers.extend([""] * (len(values) - len(headers)))
 
         # Skip completely empty rows
         if not any(v is not None and str(v).strip() for v in values):
@@ -190,6 +385,7 @@ def main() -> int:
         title_text = str(title_val or "").strip()
         if not title_text:
             # No challenge title → skip row
+            skipped_count += 1
             continue
 
         date_val = values[date_col] if date_col is not None and date_col < len(values) else None
@@ -210,47 +406,72 @@ def main() -> int:
         else:
             folder_name = title_component
 
-        folder_path = output_root / folder_name
-        folder_path.mkdir(parents=True, exist_ok=True)
-
-        # README content
         date_text = (
             try_format_date(date_val)
             if is_date_like(date_val)
             else (str(date_val).strip() if date_val is not None else None)
         )
-        readme_content = generate_readme_content(
-            title=title_text,
-            date_text=date_text,
-            description=description_text,
-            members=members,
-        )
+        folder_path = output_root / folder_name
+        row_hash = row_fingerprint(folder_name, title_text, date_text, description_text, members)
+        # A later row for the same folder replaces whatever an earlier one queued
+        rows_state.pop(folder_name, None)
+        pending_rows.pop(folder_name, None)
+
+        previous_row = previous_rows.get(folder_name)
+        if previous_row and previous_row.get("row") == row_hash and outputs_present(folder_path, previous_row):
+            rows_state[folder_name] = previous_row
+            continue
 
-        readme_path = folder_path / "README.md"
-        existing = readme_path.read_text(encoding="utf-8") if readme_path.exists() else None
-        if existing != readme_content:
-            readme_path.write_text(readme_content, encoding="utf-8")
-            if existing is None:
-                created_count += 1
-            else:
-                updated_count += 1
-
-        # Per-challenge requirements.txt
-        requirements_path = folder_path / "requirements.txt"
-        requirements_content = "python>3.12\n"
-        existing_req = requirements_path.read_text(encoding="utf-8") if requirements_path.exists() else None
-        if existing_req != requirements_content:
-            requirements_path.write_text(requirements_content, encoding="utf-8")
-
-        # Per-challenge ENVIRONMENT.md
-        environment_md_path = folder_path / "ENVIRONMENT.md"
-        environment_md_content = generate_environment_md()
-        existing_env = environment_md_path.read_text(encoding="utf-8") if environment_md_path.exists() else None
-        if existing_env != environment_md_content:
-            environment_md_path.write_text(environment_md_content, encoding="utf-8")
+        contents = {
+            "README.md": generate_readme_content(
+                title=title_text,
+                date_text=date_text,
+                description=description_text,
+                members=members,
+            ),
+            "requirements.txt": REQUIREMENTS_CONTENT,
+            "ENVIRONMENT.md": generate_environment_md(),
+        }
+
+        file_hashes = {name: sha256_text(contents[name]) for name in GENERATED_FILES}
+        previous_files = previous_row.get("files", {}) if previous_row else {}
+
+        rows_state[folder_name] = {"row": row_hash, "files": file_hashes}
+        pending_rows[folder_name] = {
+            "targets": [
+                {
+                    "path": folder_path / name,
+                    "content": contents[name],
+                    # Files whose rendered hash did not move since the last run are left alone
+                    "hash_matches": previous_files.get(name) == file_hashes[name],
+                }
+                for name in GENERATED_FILES
+            ],
+        }
+
+    # Everything is rendered before any file is touched, so disk I/O can run in bulk
+    write_generated_files(
+        [t for row in pending_rows.values() for t in row["targets"]],
+        jobs=args.jobs,
+    )
+    unchanged_count = len(rows_state) - len(pending_rows)
+    for row in pending_rows.values():
+        readme = row["targets"][GENERATED_FILES.index("README.md")]
+        if readme["existing"] is None:
+            created_count += 1
+        elif any(t["written"] for t in row["targets"]):
+            updated_count += 1
+        else:
+            unchanged_count += 1
+
+    save_state(
+        state_path,
+        {"generator": generator_hash, "source": source_hash, "rows": rows_state},
+    )
 
     print(
-        f"Generation complete. Created {created_count} new README(s), updated {updated_count} README(s)."
+        f"Generation complete. Created {created_count}, updated {updated_count}, "
+        f"unchanged {unchanged_count}, skipped {skipped_count} row(s)."
     )
     return 0
 
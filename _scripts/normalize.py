@@ -0,0 +1,136 @@
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Sheets repeat the same handful of dates, member handles and titles across many rows,
+# so every canonicalizer below is memoized on the raw text.
+CACHE_SIZE = 65536
+
+MEMBER_SEPARATOR_PATTERN = re.compile(r"[,;\n]+")
+MEMBER_PLACEHOLDERS = frozenset({"n/a", "na", "none", "-"})
+# Accept common formats like MM-DD-YYYY or M-D-YYYY
+DATE_TEXT_PATTERN = re.compile(r"^(\d{1,2})[-/](\d{1,2})[-/](\d{4})$")
+PATH_SEPARATOR_PATTERN = re.compile(r"[\\/\0\n\r\t]+")
+RESERVED_CHAR_PATTERN = re.compile(r"[:*?\"<>|]+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _format_date_text(text: str) -> Optional[str]:
+    m = DATE_TEXT_PATTERN.match(text.strip())
+    if not m:
+        return None
+    mm, dd, yyyy = m.groups()
+    try:
+        return date(int(yyyy), int(mm), int(dd)).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def format_date(value: object) -> Optional[str]:
+    if isinstance(value, datetime):
+        return value.date().strftime("%Y-%m-%d")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, str):
+        return _format_date_text(value)
+    # Fall back to None for non-datetime; the README will still show raw text
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_date_text(text: str) -> object:
+    # Text sources carry dates as strings; the workbook gives datetimes
+    stripped = text.strip()
+    m = DATE_TEXT_PATTERN.match(stripped)
+    try:
+        if m:
+            mm, dd, yyyy = m.groups()
+            return datetime(int(yyyy), int(mm), int(dd))
+        return datetime.fromisoformat(stripped)
+    except ValueError:
+        return text
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def folder_component(text: str, max_length: int = 80) -> str:
+    if not text:
+        return "unknown"
+    # Replace path separators and control characters
+    cleaned = PATH_SEPARATOR_PATTERN.sub("-", text)
+    # Replace characters that are problematic on common filesystems
+    cleaned = RESERVED_CHAR_PATTERN.sub("-", cleaned)
+    # Collapse spaces
+    cleaned = WHITESPACE_PATTERN.sub(" ", cleaned).strip()
+    # Trim length
+    if len(cleaned) > max_length:
+        cleaned = cleaned[:max_length].rstrip()
+    return cleaned
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def split_member_cell(text: str) -> Tuple[Tuple[str, str], ...]:
+    # (name, dedup key) pairs, so each name is lowercased once per distinct cell
+    names = []
+    for part in MEMBER_SEPARATOR_PATTERN.split(text.strip()):
+        name = part.strip()
+        if not name:
+            continue
+        key = name.lower()
+        if key not in MEMBER_PLACEHOLDERS:
+            names.append((name, key))
+    return tuple(names)
+
+
+def member_cell_names(cell_val: object) -> Tuple[Tuple[str, str], ...]:
+    if cell_val is None:
+        return ()
+    return split_member_cell(cell_val if isinstance(cell_val, str) else str(cell_val))
+
+
+def extract_members(values: List[object], member_cols: List[int]) -> List[str]:
+    seen = set()
+    members: List[str] = []
+    n_values = len(values)
+    for col in member_cols:
+        if col >= n_values:
+            continue
+        # De-duplicate case-insensitively while preserving order
+        for name, key in member_cell_names(values[col]):
+            if key not in seen:
+                seen.add(key)
+                members.append(name)
+    return members
+
+
+def _map_unique(func, cells: Iterable[object]) -> List:
+    # Each distinct hashable cell is canonicalized once for the whole column
+    results: Dict[Tuple[type, object], object] = {}
+    out = []
+    for cell in cells:
+        key = (type(cell), cell)
+        if key not in results:
+            results[key] = func(cell)
+        out.append(results[key])
+    return out
+
+
+def format_date_column(cells: Iterable[object]) -> List[Optional[str]]:
+    return _map_unique(format_date, cells)
+
+
+def folder_component_column(cells: Iterable[object], max_length: int = 80) -> List[str]:
+    return _map_unique(
+        lambda cell: folder_component(str(cell or "").strip(), max_length=max_length), cells
+    )
+
+
+def member_column(cells: Iterable[object]) -> List[List[str]]:
+    # One member list per cell, de-duplicated within the cell
+    return [list(m) for m in _map_unique(lambda cell: extract_members([cell], [0]), cells)]
+
+
+def clear_caches() -> None:
+    for func in (_format_date_text, parse_date_text, folder_component, split_member_cell):
+        func.cache_clear()
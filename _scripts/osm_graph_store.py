@@ -0,0 +1,316 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import geopandas as gpd
+import networkx as nx
+import pandas as pd
+
+# Shared on-disk store of OSMnx street networks, so notebooks download and convert a
+# network once and then replay it from Parquet:
+#
+#     import sys; sys.path.append("../_scripts")
+#     from osm_graph_store import GraphStore
+#     nodes, edges = GraphStore().polygon_gdfs(boundary, network_type="all")
+#
+# Each entry holds the simplified graph's node and edge GeoDataFrames (the output of
+# ox.graph_to_gdfs) plus a meta.json with the query and graph attributes. Entries are
+# keyed by the place query or polygon hash, network type and download options.
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_STORE_DIR = REPO_ROOT / ".osm_cache" / "graphs"
+STORE_DIR_ENV = "OSM_GRAPH_STORE"
+# Set to 1 to replay stored networks only and fail instead of downloading
+OFFLINE_ENV = "OSM_GRAPH_OFFLINE"
+
+# Bump when the entry layout changes; older entries are then ignored and refetched
+STORE_VERSION = 1
+META_FILE = "meta.json"
+NODES_FILE = "nodes.parquet"
+EDGES_FILE = "edges.parquet"
+# Coordinates are rounded to ~1 cm before hashing so a re-projected boundary keeps its key
+POLYGON_KEY_PRECISION = 1e-7
+
+
+class GraphNotStored(LookupError):
+    pass
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def polygon_hash(polygon: Any) -> str:
+    import shapely
+
+    geometry = shapely.normalize(shapely.set_precision(polygon, POLYGON_KEY_PRECISION))
+    return hashlib.sha256(shapely.to_wkb(geometry)).hexdigest()
+
+
+def entry_key(source: Dict[str, Any], network_type: str, options: Dict[str, Any]) -> str:
+    payload = canonical_json({"source": source, "network_type": network_type, "options": options})
+    return sha256_text(payload)[:20]
+
+
+def is_list_cell(value: Any) -> bool:
+    return isinstance(value, (list, tuple, set))
+
+
+def encode_list_columns(gdf: gpd.GeoDataFrame) -> Tuple[gpd.GeoDataFrame, List[str]]:
+    # Simplified edges merge OSM ways, so osmid, name, highway, lanes, ... hold a mix of
+    # scalars and lists that Parquet cannot type; those columns are stored as JSON text
+    encoded = []
+    gdf = gdf.copy()
+    for col in gdf.columns:
+        if col == gdf.geometry.name or gdf[col].dtype != object:
+            continue
+        if gdf[col].map(is_list_cell).any():
+            gdf[col] = [
+                json.dumps(list(v) if isinstance(v, set) else v, default=str)
+                if is_list_cell(v) or not pd.isna(v)
+                else None
+                for v in gdf[col]
+            ]
+            encoded.append(col)
+    return gdf, encoded
+
+
+def decode_list_columns(gdf: gpd.GeoDataFrame, encoded: List[str]) -> gpd.GeoDataFrame:
+    # Missing cells come back from Parquet as None or NaN depending on the string dtype
+    for col in encoded:
+        gdf[col] = [json.loads(v) if isinstance(v, str) else float("nan") for v in gdf[col]]
+    return gdf
+
+
+def same_cell(a: Any, b: Any) -> bool:
+    if is_list_cell(a) or is_list_cell(b):
+        return list(a) == list(b) if is_list_cell(a) and is_list_cell(b) else False
+    return (pd.isna(a) and pd.isna(b)) or a == b
+
+
+def check_roundtrip(tmp_dir: Path) -> List[str]:
+    # Mixed list / scalar / missing columns through encode -> Parquet -> decode; returns
+    # the mismatches (an empty list means the store reproduces the frame)
+    from shapely.geometry import Point
+
+    original = gpd.GeoDataFrame(
+        {
+            "osmid": [[1, 2], 3, [4, 5, 6], 7],
+            "name": ["Main St", None, ["A Ave", "B Ave"], float("nan")],
+            "lanes": [None, ["2", "3"], "1", None],
+            "length": [10.5, 20.0, float("nan"), 4.25],
+        },
+        geometry=[Point(0, 0), Point(1, 1), Point(2, 2), None],
+        crs="EPSG:4326",
+    )
+    encoded, columns = encode_list_columns(original)
+    path = tmp_dir / EDGES_FILE
+    encoded.to_parquet(path)
+    decoded = decode_list_columns(gpd.read_parquet(path), columns)
+    return [
+        f"{col}[{i}]: {a!r} -> {b!r}"
+        for col in original.columns if col != original.geometry.name
+        for i, (a, b) in enumerate(zip(original[col], decoded[col]))
+        if not same_cell(a, b)
+    ]
+
+
+def graph_from_gdfs(
+    nodes: gpd.GeoDataFrame, edges: gpd.GeoDataFrame, graph_attrs: Dict[str, Any]
+) -> nx.MultiDiGraph:
+    # Same graph as ox.graph_from_gdfs, built without importing osmnx: node geometry is
+    # dropped (x / y carry it), edge geometry is kept, missing attributes are left out
+    graph = nx.MultiDiGraph(**graph_attrs)
+    node_attrs = nodes.drop(columns=nodes.geometry.name)
+    graph.add_nodes_from(
+        (osmid, {k: v for k, v in row.items() if is_list_cell(v) or not pd.isna(v)})
+        for osmid, row in zip(node_attrs.index, node_attrs.to_dict("records"))
+    )
+    graph.add_edges_from(
+        (u, v, key, {k: val for k, val in row.items() if is_list_cell(val) or not pd.isna(val)})
+        for (u, v, key), row in zip(edges.index, edges.to_dict("records"))
+    )
+    return graph
+
+
+class GraphStore:
+    def __init__(self, root: Optional[Path] = None, offline: Optional[bool] = None) -> None:
+        self.root = Path(root or os.environ.get(STORE_DIR_ENV) or DEFAULT_STORE_DIR)
+        if offline is None:
+            offline = os.environ.get(OFFLINE_ENV, "") not in ("", "0")
+        self.offline = offline
+
+    def entry_dir(self, key: str) -> Path:
+        return self.root / key
+
+    def read_meta(self, key: str) -> Optional[dict]:
+        try:
+            meta = json.loads((self.entry_dir(key) / META_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("version") == STORE_VERSION else None
+
+    def has(self, key: str) -> bool:
+        return self.read_meta(key) is not None
+
+    def entries(self) -> List[dict]:
+        if not self.root.is_dir():
+            return []
+        metas = [dict(meta, key=path.name) for path in sorted(self.root.iterdir())
+                 if (meta := self.read_meta(path.name)) is not None]
+        return sorted(metas, key=lambda m: m["saved_at"])
+
+    def save(self, key: str, graph: nx.MultiDiGraph, source: Dict[str, Any],
+             network_type: str, options: Dict[str, Any]) -> None:
+        import osmnx as ox
+
+        nodes, edges = ox.graph_to_gdfs(graph)
+        nodes, node_json = encode_list_columns(nodes)
+        edges, edge_json = encode_list_columns(edges)
+
+        # Written to a sibling temp dir and swapped in, so readers never see half an entry
+        self.root.mkdir(parents=True, exist_ok=True)
+        final_dir = self.entry_dir(key)
+        tmp_dir = final_dir.with_name(f".{key}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        try:
+            nodes.to_parquet(tmp_dir / NODES_FILE)
+            edges.to_parquet(tmp_dir / EDGES_FILE)
+            meta = {
+                "version": STORE_VERSION,
+                "source": source,
+                "network_type": network_type,
+                "options": options,
+                "graph_attrs": json.loads(canonical_json(graph.graph)),
+                "json_columns": {"nodes": node_json, "edges": edge_json},
+                "n_nodes": len(nodes),
+                "n_edges": len(edges),
+                "osmnx_version": ox.__version__,
+                "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            (tmp_dir / META_FILE).write_text(json.dumps(meta, indent=2, ensure_ascii=False) + "\n",
+                                             encoding="utf-8")
+            shutil.rmtree(final_dir, ignore_errors=True)
+            os.replace(tmp_dir, final_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def load_gdfs(self, key: str, nodes: bool = True, edges: bool = True):
+        meta = self.read_meta(key)
+        if meta is None:
+            raise GraphNotStored(f"No stored graph {key} in {self.root}")
+        entry = self.entry_dir(key)
+        frames = []
+        if nodes:
+            frames.append(decode_list_columns(gpd.read_parquet(entry / NODES_FILE),
+                                              meta["json_columns"]["nodes"]))
+        if edges:
+            frames.append(decode_list_columns(gpd.read_parquet(entry / EDGES_FILE),
+                                              meta["json_columns"]["edges"]))
+        # Same shapes as ox.graph_to_gdfs(G, nodes=..., edges=...)
+        return tuple(frames) if len(frames) > 1 else frames[0]
+
+    def load_graph(self, key: str) -> nx.MultiDiGraph:
+        nodes, edges = self.load_gdfs(key)
+        return graph_from_gdfs(nodes, edges, self.read_meta(key)["graph_attrs"])
+
+    def fetch(self, key: str, source: Dict[str, Any], network_type: str,
+              options: Dict[str, Any], download: Callable[[], nx.MultiDiGraph]) -> str:
+        # Key of the stored entry, calling download() and storing its graph on first use
+        if self.has(key):
+            return key
+        if self.offline:
+            raise GraphNotStored(
+                f"{source['kind']} network ({network_type}) is not in {self.root} "
+                f"and {OFFLINE_ENV} is set"
+            )
+        self.save(key, download(), source, network_type, options)
+        return key
+
+    # Notebook entry points: same arguments as the osmnx functions they replace
+
+    def place_key(self, query: Any, network_type: str = "drive", **options: Any) -> str:
+        def download() -> nx.MultiDiGraph:
+            import osmnx as ox
+
+            return ox.graph_from_place(query, network_type=network_type, **options)
+
+        source = {"kind": "place", "query": query}
+        return self.fetch(entry_key(source, network_type, options), source, network_type, options, download)
+
+    def polygon_key(self, polygon: Any, network_type: str = "all", **options: Any) -> str:
+        def download() -> nx.MultiDiGraph:
+            import osmnx as ox
+
+            return ox.graph_from_polygon(polygon, network_type=network_type, **options)
+
+        # Only osmnx sees the polygon itself; the key and meta keep its hash
+        source = {"kind": "polygon", "hash": polygon_hash(polygon)}
+        return self.fetch(entry_key(source, network_type, options), source, network_type, options, download)
+
+    def place_graph(self, query: Any, network_type: str = "drive", **options: Any) -> nx.MultiDiGraph:
+        return self.load_graph(self.place_key(query, network_type, **options))
+
+    def polygon_graph(self, polygon: Any, network_type: str = "all", **options: Any) -> nx.MultiDiGraph:
+        return self.load_graph(self.polygon_key(polygon, network_type, **options))
+
+    def place_gdfs(self, query: Any, network_type: str = "drive", nodes: bool = True,
+                   edges: bool = True, **options: Any):
+        return self.load_gdfs(self.place_key(query, network_type, **options), nodes, edges)
+
+    def polygon_gdfs(self, polygon: Any, network_type: str = "all", nodes: bool = True,
+                     edges: bool = True, **options: Any):
+        return self.load_gdfs(self.polygon_key(polygon, network_type, **options), nodes, edges)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="List or remove stored OSMnx street networks.")
+    parser.add_argument("--root", type=Path, help=f"store directory (default: ${STORE_DIR_ENV} or {DEFAULT_STORE_DIR})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="show stored networks")
+    remove = subparsers.add_parser("remove", help="delete stored networks by key")
+    remove.add_argument("keys", nargs="+")
+    subparsers.add_parser("check", help="round-trip list columns with missing values through Parquet")
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp:
+            mismatches = check_roundtrip(Path(tmp))
+        for line in mismatches:
+            print(line)
+        print("Round trip OK" if not mismatches else f"{len(mismatches)} mismatched cells")
+        return 1 if mismatches else 0
+
+    store = GraphStore(args.root)
+    if args.command == "list":
+        for meta in store.entries():
+            source = meta["source"]
+            label = source.get("query") if source["kind"] == "place" else f"polygon {source['hash'][:12]}"
+            print(f"{meta['key']}  {meta['network_type']:<8} {meta['n_nodes']:>9,} nodes "
+                  f"{meta['n_edges']:>9,} edges  {meta['saved_at']}  {label}")
+        return 0
+
+    for key in args.keys:
+        if not store.entry_dir(key).is_dir():
+            print(f"No stored graph {key}")
+            continue
+        shutil.rmtree(store.entry_dir(key))
+        print(f"Removed {key}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())